@@ -3,6 +3,9 @@ import boto3
 from datetime import datetime
 from botocore.exceptions import ClientError
 
+import certreport
+import reports
+
 # Configuration for multiple AWS accounts using credentials
 accounts = {
     "dev": {
@@ -95,55 +98,8 @@ def fetch_secrets_data(session, region, secret_prefix):
     return secrets_data
 
 def generate_html_report(all_data):
-    html = """<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>ACM Certificates & Secrets Dashboard</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 20px; }
-        h2 { background-color: #f57c00; color: white; padding: 10px; }
-        table { width: 100%; border-collapse: collapse; margin-bottom: 30px; }
-        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-        th { background-color: #333; color: white; }
-        details summary { cursor: pointer; font-weight: bold; }
-        .section { margin-bottom: 50px; }
-    </style>
-</head>
-<body>
-    <h1>Multi-Account Dashboard: ACM Certificates & Secrets</h1>
-"""
-    for account, data in all_data.items():
-        html += f"""<div class="section">
-    <h2>{account.upper()} Account - ACM Certificates for {accounts[account]['domain_filter']}</h2>
-    <table>
-        <tr>
-            <th>Domain Name</th><th>Status</th><th>Type</th><th>Requested At</th><th>Imported At</th>
-            <th>Issued At</th><th>Expires At</th><th>Renewal Eligibility</th><th>In Use By</th>
-        </tr>"""
-        for cert in data['certs']:
-            html += f"""<tr>
-            <td>{cert['DomainName']}</td><td>{cert['Status']}</td><td>{cert['Type']}</td>
-            <td>{cert['RequestedAt']}</td><td>{cert['ImportedAt']}</td><td>{cert['IssuedAt']}</td>
-            <td>{cert['NotAfter']}</td><td>{cert['RenewalEligibility']}</td>
-            <td>
-                <details>
-                    <summary>{len(cert['InUseBy'])} resources</summary>
-                    <ul>"""
-            for item in cert['InUseBy']:
-                html += f"<li>{item}</li>"
-            html += "</ul></details></td></tr>"
-
-        html += "</table><h2>Secrets: " + accounts[account]['secret_prefix'] + "*</h2><table>"
-        html += "<tr><th>Name</th><th>Rotation Enabled</th><th>Versions</th><th>Replication Regions</th></tr>"
-        for secret in data['secrets']:
-            html += f"<tr><td>{secret['Name']}</td><td>{secret['RotationEnabled']}</td><td>{secret['Versions']}</td><td>{secret['ReplicationRegions']}</td></tr>"
-        html += "</table></div>"
-    html += "</body></html>"
-
     output_path = "acm_secrets_multi_account_dashboard.html"
-    with open(output_path, "w") as f:
-        f.write(html)
+    reports.write_file(certreport.stream_dashboard(all_data, accounts), output_path)
 
     print(f"Report saved to {output_path}")
 
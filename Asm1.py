@@ -1,6 +1,9 @@
 import boto3
 from datetime import datetime
 
+import certreport
+import reports
+
 REGION = 'us-east-1'  # Change to your region
 CERT_DOMAIN_FILTER = '*.dev.vapps.net'
 SECRET_NAME_PREFIX = 'bas-chain'
@@ -63,113 +66,16 @@ def fetch_secrets_manager_details():
 
     return secrets_data
 
-def generate_acm_table(cert_data):
-    table_html = """
-    <h3>ACM Certificates for '*.dev.vapps.net'</h3>
-    <table>
-        <thead>
-            <tr>
-                <th>Domain Name</th>
-                <th>Status</th>
-                <th>Type</th>
-                <th>Requested At</th>
-                <th>Imported At</th>
-                <th>Issued At</th>
-                <th>Expires At</th>
-                <th>Renewal Eligibility</th>
-            </tr>
-        </thead>
-        <tbody>
-    """
-    for cert in cert_data:
-        table_html += f"""
-        <tr>
-            <td>{cert['DomainName']}</td>
-            <td>{cert['Status']}</td>
-            <td>{cert['Type']}</td>
-            <td>{cert['RequestedAt']}</td>
-            <td>{cert['ImportedAt'] or '-'}</td>
-            <td>{cert['IssuedAt'] or '-'}</td>
-            <td>{cert['NotAfter']}</td>
-            <td>{cert['RenewalEligibility']}</td>
-        </tr>
-        """
-
-        # Nested table for "In Use By"
-        if cert.get("InUseBy"):
-            table_html += """
-            <tr><td colspan="8">
-                <b>In Use By:</b>
-                <table style="margin-left:20px; background:#f9f9f9;">
-                    <thead><tr><th>ARN</th></tr></thead>
-                    <tbody>
-            """
-            for arn in cert["InUseBy"]:
-                table_html += f"<tr><td>{arn}</td></tr>"
-            table_html += "</tbody></table></td></tr>"
-
-    table_html += "</tbody></table><br>"
-    return table_html
-
-def generate_secrets_table(secret_data):
-    table_html = """
-    <h3>Secrets: bas-chain*</h3>
-    <table>
-        <thead>
-            <tr>
-                <th>Name</th>
-                <th>Rotation Enabled</th>
-                <th>Versions</th>
-                <th>Replication Regions</th>
-            </tr>
-        </thead>
-        <tbody>
-    """
-    for secret in secret_data:
-        table_html += f"""
-        <tr>
-            <td>{secret['Name']}</td>
-            <td>{secret['RotationEnabled']}</td>
-            <td>{secret['Versions']}</td>
-            <td>{secret['ReplicationRegions']}</td>
-        </tr>
-        """
-    table_html += "</tbody></table><br>"
-    return table_html
-
 def generate_dashboard_html(acm_data, secret_data):
-    html = f"""
-    <html>
-    <head>
-        <title>Dev Account Dashboard</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; padding: 20px; }}
-            h2 {{ color: #333; }}
-            h3 {{ color: #f57c00; }}
-            table {{ width: 100%; border-collapse: collapse; margin-bottom: 20px; }}
-            th, td {{ border: 1px solid #ccc; padding: 8px; text-align: left; font-size: 14px; }}
-            th {{ background-color: #f57c00; color: white; }}
-            table table {{ border: 1px solid #999; }}
-            table table th {{ background-color: #ddd; color: #000; }}
-            table table td {{ font-size: 13px; }}
-        </style>
-    </head>
-    <body>
-        <h2>Dev Account Dashboard: ACM Certificates & Secrets</h2>
-        {generate_acm_table(acm_data)}
-        {generate_secrets_table(secret_data)}
-    </body>
-    </html>
-    """
-    return html
+    return certreport.render_account(acm_data, secret_data, CERT_DOMAIN_FILTER, SECRET_NAME_PREFIX)
 
 if __name__ == "__main__":
     acm_data = fetch_acm_certificates()
     secret_data = fetch_secrets_manager_details()
-    html_output = generate_dashboard_html(acm_data, secret_data)
-
     output_file = "asm_dashboard.html"
-    with open(output_file, "w") as f:
-        f.write(html_output)
+    # Streamed to the file rather than built as one string
+    reports.write_file(
+        certreport.stream_account(acm_data, secret_data, CERT_DOMAIN_FILTER, SECRET_NAME_PREFIX), output_file
+    )
 
     print(f"HTML dashboard written to: {output_file}")
@@ -5,6 +5,8 @@ from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+import certreport
+
 # --- CONFIGURATION ---
 
 accounts = {
@@ -114,27 +116,7 @@ def fetch_secrets_data(session, region, secret_prefix):
     return secrets_data
 
 def generate_html_report(all_data):
-    html = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>ACM & Secrets Dashboard</title>
-    <style>body{font-family:sans-serif;}h2{background:#444;color:#fff;padding:10px;}
-    table{width:100%;border-collapse:collapse;margin-bottom:30px;}
-    th,td{border:1px solid #ccc;padding:8px;}th{background:#222;color:#fff;}
-    details summary{cursor:pointer;font-weight:bold;}</style></head><body>
-    <h1>ACM Certificates & Secrets Dashboard</h1>"""
-    for env, data in all_data.items():
-        html += f"""<h2>{env.upper()} - Certificates</h2><table>
-        <tr><th>Domain</th><th>Status</th><th>Type</th><th>Expires At</th><th>Days Left</th><th>In Use By</th></tr>"""
-        for cert in data['certs']:
-            html += f"""<tr><td>{cert['DomainName']}</td><td>{cert['Status']}</td>
-            <td>{cert['Type']}</td><td>{cert['NotAfter']}</td><td>{cert['DaysRemaining']}</td>
-            <td><details><summary>{len(cert['InUseBy'])} resources</summary><ul>"""
-            for r in cert['InUseBy']:
-                html += f"<li>{r}</li>"
-            html += "</ul></details></td></tr>"
-        html += "</table><h2>{env.upper()} - Secrets</h2><table><tr><th>Name</th><th>Rotation</th><th>Versions</th><th>Replication</th></tr>"
-        for secret in data['secrets']:
-            html += f"<tr><td>{secret['Name']}</td><td>{secret['RotationEnabled']}</td><td>{secret['Versions']}</td><td>{secret['ReplicationRegions']}</td></tr>"
-        html += "</table>"
-    html += "</body></html>"
+    html = certreport.render_email(all_data)
     with open("acm_secrets_multi_account_dashboard.html", "w") as f:
         f.write(html)
     return html
@@ -184,88 +166,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-########################################################################################
-
-
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>ACM Certificate Expiry Report</title>
-    <style>
-        body { font-family: Arial, sans-serif; padding: 20px; background-color: #f9f9f9; }
-        h1 { color: #2c3e50; }
-        h2 { margin-top: 30px; color: #1f3c88; }
-        table { border-collapse: collapse; width: 100%; margin-top: 10px; }
-        th, td { border: 1px solid #ccc; padding: 10px; text-align: left; font-size: 14px; }
-        th { background-color: #34495e; color: white; }
-        tr:hover { background-color: #f1f1f1; }
-        .expired { background-color: #f8d7da; }
-        .warning { background-color: #fff3cd; }
-        .ok { background-color: #d4edda; }
-    </style>
-</head>
-<body>
-    <h1>AWS ACM Certificate Expiry Report</h1>
-
-    <h2>DEV Environment</h2>
-    <table>
-        <tr>
-            <th>Domain Name</th>
-            <th>Expires At</th>
-            <th>Days Left</th>
-        </tr>
-        <tr class="ok">
-            <td>*.dev.vapps.net</td>
-            <td>2025-08-15</td>
-            <td>59 days</td>
-        </tr>
-        
-    </table>
-
-    <h2>INTG Environment</h2>
-    <table>
-        <tr>
-            <th>Domain Name</th>
-            <th>Expires At</th>
-            <th>Days Left</th>
-        </tr>
-        <tr class="ok">
-            <td>*.intg.vapps.net</td>
-            <td>2024-12-10</td>
-            <td>189 days</td>
-        </tr>
-    </table>
-
-    <h2>ACCP Environment</h2>
-    <table>
-        <tr>
-            <th>Domain Name</th>
-            <th>Expires At</th>
-            <th>Days Left</th>
-        </tr>
-        <tr class="ok">
-            <td>*.accp.vapps.net</td>
-            <td>2024-08-25</td>
-            <td>296 days</td>
-        </tr>
-    </table>
-
-    <h2>PROD Environment</h2>
-    <table>
-        <tr>
-            <th>Domain Name</th>
-            <th>Expires At</th>
-            <th>Days Left</th>
-        </tr>
-        <tr class="ok">
-            <td>*.prod.vapps.net</td>
-            <td>2025-01-20</td>
-            <td>230 days</td>
-        </tr>
-
-    </table>
-</body>
-</html>
-
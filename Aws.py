@@ -32,6 +32,8 @@ import subprocess
 from jinja2 import Template
 from datetime import datetime
 
+import eksauth
+
 # Define the different AWS accounts/clusters
 accounts = [
     {
@@ -103,6 +105,19 @@ def set_aws_credentials(account):
 def get_aws_session(region):
     return boto3.Session(region_name=region)
 
+def update_kubeconfig(cluster_name, aws_session):
+    """
+    Prepare kubectl access to the cluster through a private kubeconfig with
+    an in-process EKS token, instead of `aws eks update-kubeconfig`. Returns
+    the env to pass to the cluster's kubectl calls, or None on failure;
+    os.environ is left alone so clusters don't overwrite each other's.
+    """
+    try:
+        return eksauth.kubectl_env(aws_session, cluster_name)
+    except Exception as e:
+        print(f"Error preparing kubeconfig for cluster {cluster_name}: {e}")
+        return None
+
 # (Assuming the rest of your functions remain the same)
 # Make sure to use the updated set_aws_credentials function
 
@@ -121,11 +136,12 @@ def lambda_handler(event, context):
 
         for cluster in clusters:
             # Update kubeconfig for the cluster
-            if not update_kubeconfig(cluster, session):
+            env = update_kubeconfig(cluster, session)
+            if env is None:
                 continue
 
-            nodes = get_nodes_and_metrics(cluster, session)
-            pods_info, namespace_counts, group_counts, group_order = get_pods_and_metrics(cluster, session, account['name'])
+            nodes = get_nodes_and_metrics(cluster, session, env)
+            pods_info, namespace_counts, group_counts, group_order = get_pods_and_metrics(cluster, session, account['name'], env)
 
             clusters_info.append({
                 'name': cluster,
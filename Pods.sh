@@ -1,136 +1,16 @@
-def detect_pod_colocation(cluster_name, aws_session):
-    alerts = []
-
-    ctx = _kubectl_ctx(aws_session, cluster_name)
-
-    cmd = f"""
-    kubectl get pods -A --context={ctx} -o json
-    """
-
-    try:
-        import json
-        import subprocess
-        output = subprocess.check_output(cmd, shell=True)
-        data = json.loads(output)
-    except Exception as e:
-        print("Error fetching pods:", e)
-        return alerts
-
-    # 🚫 Exclude these namespaces
-    EXCLUDED_PREFIXES = ["envoy", "qualys", "appdynamics", "basic-datalore"]
-
-    # structure: {(namespace, app, node): [pods]}
-    tracker = {}
-
-    for item in data.get("items", []):
-        try:
-            ns = item["metadata"]["namespace"]
-
-            # 🔥 Skip unwanted namespaces (prefix-based for flexibility)
-            if any(ns.startswith(prefix) for prefix in EXCLUDED_PREFIXES):
-                continue
-
-            pod = item["metadata"]["name"]
-            node = item["spec"].get("nodeName")
-
-            # Skip pods not yet scheduled
-            if not node:
-                continue
-
-            labels = item["metadata"].get("labels", {})
-
-            # ✅ Better app identification
-            app = (
-                labels.get("app.kubernetes.io/name") or
-                labels.get("app") or
-                labels.get("k8s-app") or
-                pod.rsplit("-", 2)[0]  # better fallback
-            )
-
-            key = (ns, app, node)
-
-            if key not in tracker:
-                tracker[key] = []
-
-            tracker[key].append(pod)
-
-        except Exception:
-            continue
-
-    # detect co-location
-    for (ns, app, node), pods in tracker.items():
-        if len(pods) > 1:
-            alerts.append({
-                "namespace": ns,
-                "app": app,
-                "node": node,
-                "count": len(pods),
-                "pods": pods
-            })
-
-    return alerts
-
-+++++++++++++++++++++++++++++++++++++++++++++++++++
-
-def detect_pod_colocation(cluster_name, aws_session):
-    alerts = []
-
-    ctx = _kubectl_ctx(aws_session, cluster_name)
-
-    cmd = f"""
-    kubectl get pods -A --context={ctx} -o json
-    """
-
+def detect_pod_colocation(cluster_name, aws_session, environment=None):
+    # Workload keys (ownerReferences, then labels), excluded namespaces and
+    # the incremental per-cluster state live in colocation.py. Rows keep the
+    # namespace/app/node/count/pods fields and add kind, replicas and
+    # blast_radius (share of the replicas on that node), worst first.
+    # For every cluster of every account in parallel use
+    # colocation.rank(colocation.scan(accounts)) as global_alerts.
+    import colocation
     try:
-        import json
-        output = subprocess.check_output(cmd, shell=True)
-        data = json.loads(output)
+        return colocation.analyze_cluster(aws_session, cluster_name, environment)
     except Exception as e:
         print("Error fetching pods:", e)
-        return alerts
-
-    # structure: {(namespace, app, node): [pods]}
-    tracker = {}
-
-    for item in data.get("items", []):
-        try:
-            ns = item["metadata"]["namespace"]
-            pod = item["metadata"]["name"]
-            node = item["spec"].get("nodeName", "NA")
-
-            labels = item["metadata"].get("labels", {})
-
-            # 🔥 BEST PRACTICE: use labels
-            app = (
-                labels.get("app") or
-                labels.get("app.kubernetes.io/name") or
-                labels.get("k8s-app") or
-                pod.split("-")[0]  # fallback
-            )
-
-            key = (ns, app, node)
-
-            if key not in tracker:
-                tracker[key] = []
-
-            tracker[key].append(pod)
-
-        except Exception:
-            continue
-
-    # detect co-location
-    for (ns, app, node), pods in tracker.items():
-        if len(pods) > 1:
-            alerts.append({
-                "namespace": ns,
-                "app": app,
-                "node": node,
-                "count": len(pods),
-                "pods": pods
-            })
-
-    return alerts
-
+        return []
 
 <div style="background:#ff4d4d;color:white;padding:15px;border-radius:8px;margin-bottom:20px;">
 
@@ -142,7 +22,7 @@ def detect_pod_colocation(cluster_name, aws_session):
 <ul>
 {% for a in global_alerts %}
 <li>
-⚠️ {{ a.app }} ({{ a.namespace }}) → {{ a.count }} pods on same node {{ a.node }}
+⚠️ {{ a.app }} ({{ a.namespace }}) → {{ a.count }}/{{ a.replicas }} pods on same node {{ a.node }} ({{ (a.blast_radius * 100) | round | int }}% blast radius)
 
 <a href="#env-{{ a.env }}" style="color:white;font-weight:bold;">
 👉 Go to {{ a.env }}
@@ -163,6 +43,7 @@ def detect_pod_colocation(cluster_name, aws_session):
 <th>Application</th>
 <th>Node</th>
 <th>Pods Count</th>
+<th>Blast Radius</th>
 </tr>
 
 {% for a in c.alerts %}
@@ -170,7 +51,8 @@ def detect_pod_colocation(cluster_name, aws_session):
 <td>{{ a.namespace }}</td>
 <td>{{ a.app }}</td>
 <td>{{ a.node }}</td>
-<td>{{ a.count }}</td>
+<td>{{ a.count }} / {{ a.replicas }}</td>
+<td>{{ (a.blast_radius * 100) | round | int }}%</td>
 </tr>
 {% endfor %}
 </table>
@@ -267,6 +149,11 @@ END {
 
 
 
+# Same deployment on same node, ranked by blast radius (owner references
+# with pod-template-hash stripped, label fallback, DaemonSets/Jobs skipped):
+kubectl get pods -A -o json | python3 colocation.py
+
+
 kubectl get pods -A -o json | jq -r '
 .items[] |
 [
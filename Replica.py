@@ -1,9 +1,24 @@
+import multiprocessing
 import os
-import sys
-import boto3
-import subprocess
-from jinja2 import Template
+import time
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import credentials
+import kubebackend
+import kubequantity
+import kubetop
+import lambdaresponse
+import nodeindex
+import nsgroups
+import replicahealth
+import reports
+import rollups
+import snapshots
+import topk
+import usagetables
+import virtualtable
 
 # Define the different AWS accounts/clusters
 accounts = [
@@ -13,28 +28,22 @@ accounts = [
     # Add more accounts as needed
 ]
 
-# Define suffixes for each environment
-suffixes_map = {
-    'dev':  ['dev', 'devb', 'devc'],
-    'intg': ['intg', 'intgb', 'intgc'],
-    'prod': ['proda', 'prodb'],
-    'accp': ['accp', 'accpb', 'accpc'],
-    'idev': []  # idev is treated as a single bucket
-}
-
-def set_aws_credentials(environment):
-    os.environ['AWS_ACCESS_KEY_ID'] = os.getenv(f'{environment}_AWS_ACCESS_KEY_ID')
-    os.environ['AWS_SECRET_ACCESS_KEY'] = os.getenv(f'{environment}_AWS_SECRET_ACCESS_KEY')
-    os.environ['AWS_SESSION_TOKEN'] = os.getenv(f'{environment}_AWS_SESSION_TOKEN')  # Optional
-
-    if not os.environ['AWS_ACCESS_KEY_ID'] or not os.environ['AWS_SECRET_ACCESS_KEY']:
-        print(f"Error: AWS credentials for {environment} are not set correctly.")
-        sys.exit(1)
-
-    print(f"Using credentials for environment: {environment}")
-
-def get_aws_session(region):
-    return boto3.Session(region_name=region)
+# Upper bound on concurrent kubectl / API fetches across all clusters
+COLLECTOR_WORKERS = int(os.getenv('COLLECTOR_WORKERS', '8'))
+# Pods per page of the paged pod view (?view=pods)
+REPORT_PAGE_SIZE = int(os.getenv('REPORT_PAGE_SIZE', '500'))
+# Table modes from fullest to smallest page; 'paged' leaves the pod tables out
+TABLE_LADDER = ('html', 'virtual', 'paged')
+# Processes rendering changed cluster sections; 0 or 1 renders them in this
+# process. Leave unset on Lambda, which has no /dev/shm for a process pool.
+# Workers are started with forkserver/spawn and import this module, which
+# costs several hundred ms per report; it only pays off with many changed
+# sections on a multi-core host.
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', '0'))
+SECTION_TEMPLATE = 'replica_cluster.html'
+
+def get_aws_session(environment, region):
+    return credentials.get_session(environment, region)
 
 def get_clusters(aws_session):
     eks_client = aws_session.client('eks')
@@ -45,527 +54,200 @@ def get_clusters(aws_session):
         print(f"Error fetching clusters for region {aws_session.region_name}: {e}")
         return []
 
-def _kubectl_ctx(aws_session, cluster_name):
-    account_id = aws_session.client('sts').get_caller_identity()['Account']
-    return f"arn:aws:eks:{aws_session.region_name}:{account_id}:cluster/{cluster_name}"
+def get_backend(cluster_name, aws_session):
+    return kubebackend.get_backend(aws_session, cluster_name)
 
-def get_nodes_and_metrics(cluster_name, aws_session):
-    nodes = []
-    ctx = _kubectl_ctx(aws_session, cluster_name)
-    cmd = (
-        f"kubectl get nodes --context={ctx} "
-        "-o jsonpath='{range .items[*]}{.metadata.name}|{.status.capacity.cpu}|{.status.capacity.memory} {end}'"
-    )
+def get_nodes_and_metrics(cluster_name, aws_session, backend=None):
+    nodes = usagetables.NodeTable()
+    if backend is None:
+        backend = get_backend(cluster_name, aws_session)
     try:
-        node_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing kubectl command: {e}")
+        node_info = backend.list_nodes()
+    except Exception as e:
+        print(f"Error listing nodes: {e}")
         return nodes
 
-    for node in node_info:
-        node_details = node.split('|')
-        if len(node_details) != 3:
-            print(f"Unexpected node data format: {node_details}")
-            continue
-
-        node_name, cpu_capacity, memory_capacity = node_details
-        # memory capacity is usually Mi: e.g. "163840Mi"
-        try:
-            mem_val = int(memory_capacity[:-2])  # drop "Mi"
-        except Exception:
-            mem_val = 0
-        memory_capacity_gb = mem_val / 1024.0
-
-        cpu_cmd = (
-            f"kubectl top node {node_name} --context={ctx} --no-headers | awk '{{print $2}}'"
-        )
-        cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
+    # One bulk node usage call per cluster, joined by node name below
+    node_usage = backend.node_usage()
 
-        if cpu_utilization_raw.endswith('m'):
-            try:
-                cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000.0  # millicores->cores
-            except Exception:
-                cpu_utilization = 0.0
-        else:
-            cpu_utilization = float(cpu_utilization_raw) if cpu_utilization_raw else 0.0
-
-        memory_cmd = (
-            f"kubectl top node {node_name} --context={ctx} --no-headers | awk '{{print $4}}'"
-        )
-        memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
-        # "XXXXMi"
-        try:
-            memory_utilization_gb = (int(memory_utilization[:-2]) / 1024.0) if memory_utilization.endswith('Mi') else 0.0
-        except Exception:
-            memory_utilization_gb = 0.0
+    usage = [node_usage.get(node_name, ('', '')) for node_name, _, _ in node_info]
 
-        memory_utilization_percentage = (memory_utilization_gb / memory_capacity_gb * 100.0) if memory_capacity_gb > 0 else 0.0
+    # Quantities are parsed a column at a time, in any unit the API reports
+    cpu_capacity = kubequantity.parse_column([cpu for _, cpu, _ in node_info])
+    memory_capacity = kubequantity.parse_column([memory for _, _, memory in node_info])
+    cpu_utilization = kubequantity.parse_column([cpu for cpu, _ in usage])
+    memory_utilization = kubequantity.parse_column([memory for _, memory in usage])
 
-        nodes.append({
-            'name': node_name,
-            'cpu_capacity': int(cpu_capacity) if cpu_capacity.isdigit() else cpu_capacity,
-            'memory_capacity_gb': f"{int(memory_capacity_gb)} GB",
-            'cpu_utilization': f"{cpu_utilization:.2f}",
-            'memory_utilization_gb': f"{memory_utilization_gb:.2f} GB",
-            'memory_utilization_percentage': f"{memory_utilization_percentage:.2f}"
-        })
+    for i, (node_name, _, _) in enumerate(node_info):
+        nodes.append(node_name, cpu_capacity[i], memory_capacity[i], cpu_utilization[i], memory_utilization[i])
 
     return nodes
 
-def get_pods_and_metrics(cluster_name, aws_session, environment):
-    pods = []
+def get_pods_and_metrics(cluster_name, aws_session, environment, backend=None):
+    pods = usagetables.PodTable()
     namespace_counts = {}
-    suffixes = suffixes_map.get(environment, [])
-    if environment == 'idev':
-        group_counts = {'total': 0}
-        group_order = ['total']
-    else:
-        group_counts = {suffix: 0 for suffix in suffixes}
-        group_counts['others'] = 0
-        group_order = suffixes.copy()
-        group_order.append('others')
-
-    ctx = _kubectl_ctx(aws_session, cluster_name)
-    cmd = (
-        f"kubectl get pods --all-namespaces --context={ctx} "
-        "-o jsonpath='{range .items[*]}{.metadata.namespace}|{.metadata.name}|{.spec.nodeName} {end}'"
-    )
+    phase_counts = {}  # {namespace: {phase: count}}, including pods without metrics
+    node_pod_counts = {}  # {node: count}, likewise; pods without metrics are not in the PodTable
+    classifier = nsgroups.get_classifier(environment)
+    group_counts = dict.fromkeys(classifier.group_order, 0)
+    group_order = list(classifier.group_order)
+
+    if backend is None:
+        backend = get_backend(cluster_name, aws_session)
     try:
-        pod_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing kubectl command: {e}")
-        return pods, namespace_counts, group_counts, group_order
-
-    for pod in pod_info:
-        try:
-            namespace, pod_name, node_name = pod.split('|')
-            namespace_counts[namespace] = namespace_counts.get(namespace, 0) + 1
-
-            if environment == 'idev':
-                group_counts['total'] += 1
-            else:
-                matched = False
-                for suffix in suffixes:
-                    if namespace.endswith(suffix):
-                        group_counts[suffix] += 1
-                        matched = True
-                        break
-                if not matched:
-                    group_counts['others'] += 1
-
-            cpu_cmd = (
-                f"kubectl top pod {pod_name} --namespace={namespace} --context={ctx} --no-headers | awk '{{print $2}}'"
-            )
-            cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
-            if not cpu_utilization_raw:
-                # skip pods that have no metrics yet
-                continue
-
-            if cpu_utilization_raw.endswith('m'):
-                cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000.0
-            else:
-                cpu_utilization = float(cpu_utilization_raw) if cpu_utilization_raw else 0.0
-
-            memory_cmd = (
-                f"kubectl top pod {pod_name} --namespace={namespace} --context={ctx} --no-headers | awk '{{print $3}}'"
-            )
-            memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
-            mem_gb = (int(memory_utilization[:-2]) / 1024.0) if memory_utilization.endswith('Mi') and memory_utilization[:-2].isdigit() else 0.0
-
-            pods.append({
-                'namespace': namespace,
-                'name': pod_name,
-                'node_name': node_name,
-                'cpu_utilization': f"{cpu_utilization:.2f}",
-                'memory_utilization_gb': f"{mem_gb:.2f} GB",
-            })
-
-        except ValueError as e:
-            print(f"Error processing pod row '{pod}': {e}")
+        pod_info = backend.list_pods()
+    except Exception as e:
+        print(f"Error listing pods: {e}")
+        return pods, namespace_counts, group_counts, group_order, phase_counts, node_pod_counts
+
+    # One bulk pod usage call per cluster, joined by (namespace, pod) below
+    pod_usage = backend.pod_usage()
+
+    with_metrics = []
+    for namespace, pod_name, node_name, phase in pod_info:
+        namespace_counts[namespace] = namespace_counts.get(namespace, 0) + 1
+        phases = phase_counts.setdefault(namespace, {})
+        phases[phase or 'Unknown'] = phases.get(phase or 'Unknown', 0) + 1
+        if node_name:
+            node_pod_counts[node_name] = node_pod_counts.get(node_name, 0) + 1
+        group = classifier.classify(namespace)
+        group_counts[group] += 1
+
+        cpu_utilization_raw, memory_utilization = pod_usage.get((namespace, pod_name), ('', ''))
+        if not cpu_utilization_raw:
+            # skip pods that have no metrics yet
             continue
+        with_metrics.append((namespace, pod_name, node_name, group, cpu_utilization_raw, memory_utilization))
+
+    cpu_utilization = kubequantity.parse_column([row[4] for row in with_metrics])
+    memory_utilization = kubequantity.parse_column([row[5] for row in with_metrics])
+    for (namespace, pod_name, node_name, group, _, _), cpu, memory in zip(with_metrics, cpu_utilization, memory_utilization):
+        pods.append(namespace, pod_name, node_name, group, cpu, memory)
 
-    return pods, namespace_counts, group_counts, group_order
+    return pods, namespace_counts, group_counts, group_order, phase_counts, node_pod_counts
 
-def get_deploy_replica_data(cluster_name, aws_session):
+def get_deploy_replica_data(cluster_name, aws_session, backend=None, environment=None):
     """
     Returns:
-      deployments_info: flat list of {namespace, deployment, desired, ready}
+      deployments_info: flat list of {namespace, deployment, desired, ready, group, last_fully_ready}
       deployments_by_ns: {namespace: [ ... rows ... ]}
-    """
-    deployments_info = []
-    deployments_by_ns = {}
+      degraded_by_group: {group: [ ... rows with ready < desired ... ]}
 
-    ctx = _kubectl_ctx(aws_session, cluster_name)
-    cmd = (
-        f"kubectl get deploy -A --context={ctx} "
-        "-o jsonpath='{range .items[*]}{.metadata.namespace}|{.metadata.name}|{.spec.replicas}|{.status.readyReplicas} {end}'"
-    )
+    Rows come from the cluster's replicahealth tracker, which only rebuilds
+    the deployments whose counts changed since the previous collection.
+    """
+    if backend is None:
+        backend = get_backend(cluster_name, aws_session)
     try:
-        items = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing kubectl for deployments: {e}")
-        return deployments_info, deployments_by_ns
-
-    for item in items:
-        parts = item.split('|')
-        if len(parts) != 4:
-            continue
-        ns, name, desired, ready = parts
-        # Normalize ints / handle None
-        try:
-            desired_i = int(desired) if desired and desired.isdigit() else 0
-        except Exception:
-            desired_i = 0
-        try:
-            ready_i = int(ready) if ready and ready.isdigit() else 0
-        except Exception:
-            ready_i = 0
-
-        row = {
-            'namespace': ns,
-            'deployment': name,
-            'desired': desired_i,
-            'ready': ready_i
-        }
-        deployments_info.append(row)
-        deployments_by_ns.setdefault(ns, []).append(row)
+        items = backend.list_deployments()
+    except Exception as e:
+        print(f"Error listing deployments: {e}")
+        return [], {}, {}
+
+    health = replicahealth.get_tracker(environment, cluster_name)
+    health.update(items)
+
+    return health.deployments_info(), health.deployments_by_ns(), health.degraded_by_group()
+
+def _section_context(cluster, table_mode):
+    """Context of one cluster's section, with the derived data it renders from."""
+    cluster['total_nodes'] = len(cluster['nodes'])
+    cluster['total_pods'] = len(cluster['pods_info'])
+    cluster['top'] = topk.top_pods(cluster['pods_info'])
+    cluster['top_by_group'] = topk.top_pods_by(cluster['pods_info'], 'group')
+    cluster['node_index'] = nodeindex.NodeIndex(cluster['pods_info'], cluster['nodes'], cluster.get('node_pod_counts'))
+    cluster['rollups'] = rollups.compute(
+        cluster['pods_info'], cluster.get('phase_counts'),
+        nsgroups.get_classifier(cluster['account']).classify,
+    )
+    return dict(cluster=cluster, table_mode=table_mode)
+
+def _section_hash(cluster):
+    """
+    Hash of the cluster data replica_cluster.html renders. Deployment rows
+    are cut down to the columns the section shows; last_fully_ready moves on
+    every collection but only appears in the degraded view.
+    """
+    shown = dict(cluster, deployments_info=[
+        (d['namespace'], d['deployment'], d['desired'], d['ready']) for d in cluster.get('deployments_info', ())
+    ])
+    return snapshots.content_hash(shown)
+
+def _render_section(data, table_mode):
+    """One cluster section from its snapshots.serialize() data; runs in a worker process."""
+    cluster = snapshots.deserialize(data)
+    return reports.render(SECTION_TEMPLATE, **_section_context(cluster, table_mode))
+
+def _load_section_template():
+    reports.env.get_template(SECTION_TEMPLATE)
+
+def _render_context():
+    # Not fork: the collector and inventory threads may hold locks (logging,
+    # urllib3 pools, the fragment cache) that a forked child would inherit held
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def _cluster_sections(clusters_info, table_mode, workers=None, cache=True):
+    """
+    Each cluster's section in order. A cluster whose rendered inputs
+    (_section_hash) are unchanged since an earlier report gets its cached
+    section back; only the changed ones are rendered, in up to `workers`
+    processes (RENDER_WORKERS by default) if more than one.
+
+    Sections don't depend on the selected environment, so switching
+    ?environment= reuses every section. Pod and node usage is rendered, so it
+    is part of the hash: a fresh collection with new usage samples re-renders
+    those clusters, and the cache pays off when the same snapshot is rendered
+    again (page loads within SNAPSHOT_MAX_AGE, environment switches, the
+    Lambda size ladder) or a cluster's data did not move.
+
+    With cache=False sections are neither looked up nor stored.
+    """
+    workers = RENDER_WORKERS if workers is None else workers
+    if workers <= 1:
+        for cluster in clusters_info:
+            if not cache:
+                yield reports.render(SECTION_TEMPLATE, **_section_context(cluster, table_mode))
+                continue
+            key = (_section_hash(cluster), table_mode)
+            yield reports.render_fragment(
+                SECTION_TEMPLATE, key,
+                lambda cluster=cluster: _section_context(cluster, table_mode),
+            )
+        return
 
-    return deployments_info, deployments_by_ns
+    keys = [(_section_hash(cluster), table_mode) if cache else None for cluster in clusters_info]
+    sections = [reports.cached_fragment(SECTION_TEMPLATE, key) if cache else None for key in keys]
+    missing = [i for i, section in enumerate(sections) if section is None]
+    if not missing:
+        yield from sections
+        return
 
-def generate_html_report(clusters_info, current_env):
+    # Compiled here first so the workers load it from the Jinja bytecode cache
+    _load_section_template()
+    try:
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(missing)), mp_context=_render_context(), initializer=_load_section_template,
+        )
+    except (OSError, ImportError) as e:
+        print(f"Process pool unavailable, rendering in this process: {e}")
+        yield from _cluster_sections(clusters_info, table_mode, workers=0, cache=cache)
+        return
+    with pool:
+        # Only the serialized cluster data goes to the workers, and only rendered HTML comes back
+        futures = {
+            i: pool.submit(_render_section, snapshots.serialize(clusters_info[i]), table_mode) for i in missing
+        }
+        for i, section in enumerate(sections):
+            if section is None:
+                section = futures.pop(i).result()
+                if cache:
+                    reports.store_fragment(SECTION_TEMPLATE, keys[i], section)
+            yield section
+
+def _report_context(clusters_info, current_env, collected_at=None, table_mode='html', workers=None, cache=True):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>EKS Cluster Dashboard</title>
-        <link rel="icon" type="image/x-icon" href="favicon.ico">
-        <style>
-            body { font-family: Arial, sans-serif; margin: 20px; background-color: white; color: black; transition: all 0.3s ease; }
-            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
-            th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-            th { background-color: #007BFF; color: white; }
-            h2 { margin-top: 50px; }
-            h1 { color: #007BFF; text-align: center; }
-            p { font-weight: bold; color: black; }
-            .download-link { margin-top: 20px; }
-            .gauge-container { width: 100px; height: 50px; background: #e6e6e6; border-radius: 5px; position: relative; }
-            .gauge-fill { height: 100%; border-radius: 5px; }
-            .gauge-label { position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); font-weight: bold; }
-            .dropdown { margin-bottom: 10px; display: flex; gap: 12px; align-items: center; flex-wrap: wrap; }
-            .env-selector { margin-bottom: 20px; text-align: center; font-weight: bold; color: black; }
-            #env-select { border: 2px solid black; font-weight: bold; padding: 5px; }
-            .footer { text-align: center; margin-top: 50px; font-size: 14px; font-weight: bold; }
-            .footer span { color: red; }
-            .timestamp { text-align: right; font-size: 14px; color: grey; font-weight: bold; margin-bottom: 20px; }
-            .muted { color: #555; font-weight: normal; font-size: 14px; }
-        </style>
-    </head>
-    <body>
-        <h1>Welcome to EKS Clusters Dashboard with VENERABLE</h1>
-        <div class="timestamp">Report generated on: {{ timestamp }}</div>
-
-        <div class="env-selector">
-            <label for="env-select">Select Environment: </label>
-            <select id="env-select" onchange="changeEnvironment()">
-                {% for account in accounts %}
-                <option value="{{ account.name }}" {% if account.name == current_env %}selected{% endif %}>{{ account.name }}</option>
-                {% endfor %}
-            </select>
-        </div>
-
-        <p>Total Clusters: {{ total_clusters }}</p>
-        <p>Total Nodes: {{ total_nodes }}</p>
-        <p>Total Pods: {{ total_pods }}</p>
-
-        <h3>Cluster Summary (Total Nodes & Pods per Cluster)</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Cluster Name</th>
-                    <th>Total Nodes</th>
-                    <th>Total Pods</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for cluster in clusters %}
-                <tr>
-                    <td>{{ cluster.name }} ({{ cluster.account }})</td>
-                    <td>{{ cluster.total_nodes }}</td>
-                    <td>{{ cluster.total_pods }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        {% for cluster in clusters %}
-        <div id="cluster-{{ cluster.account }}" style="display: {% if cluster.account == current_env %}block{% else %}none{% endif %};">
-        <h2>{{ cluster.name }} ({{ cluster.account }} - {{ cluster.region }})</h2>
-
-        <h3>Pods Count by Namespace Suffix</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Group</th>
-                    <th>Pod Count</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for group in cluster.group_order %}
-                <tr>
-                    <td>{{ group }}</td>
-                    <td>{{ cluster.group_counts.get(group, 0) }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        <h3>Nodes Information</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Node Name</th>
-                    <th>CPU Capacity (vCPU)</th>
-                    <th>Memory Capacity (GB)</th>
-                    <th>CPU Utilization (%)</th>
-                    <th>Memory Utilization (GB)</th>
-                    <th>Memory Utilization (%)</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for node in cluster.nodes %}
-                <tr>
-                    <td>{{ node.name }}</td>
-                    <td>{{ node.cpu_capacity }}</td>
-                    <td>{{ node.memory_capacity_gb }}</td>
-                    <td>{{ node.cpu_utilization }}%</td>
-                    <td>{{ node.memory_utilization_gb }}</td>
-                    <td>
-                        <div class="gauge-container">
-                            <div class="gauge-fill" style="width: {{ node.memory_utilization_percentage }}%; background: {% if node.memory_utilization_percentage|float < 75 %}green{% else %}orange{% endif %};"></div>
-                            <div class="gauge-label">{{ node.memory_utilization_percentage }}%</div>
-                        </div>
-                    </td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        <h3>Pods Information by Namespace</h3>
-        <div class="dropdown">
-            <div>
-                <label for="suffix-select-{{ cluster.name }}">Filter by Namespace Suffix:</label>
-                <select id="suffix-select-{{ cluster.name }}" onchange="filterBySuffix(this.value, '{{ cluster.name }}')">
-                    <option value="">All</option>
-                    {% for sfx in cluster.group_order %}
-                        {% if sfx != 'others' %}
-                        <option value="{{ sfx }}">{{ sfx }}</option>
-                        {% endif %}
-                    {% endfor %}
-                </select>
-                <span class="muted">(applies to Pods & Deployments below)</span>
-            </div>
-            <div>
-                <label for="namespace-select-{{ cluster.name }}">Select Namespace:</label>
-                <select id="namespace-select-{{ cluster.name }}" onchange="filterPodsAndDeploys(this.value, '{{ cluster.name }}')">
-                    <option value="">Show All</option>
-                    {% for ns in cluster.namespace_counts.keys() | sort %}
-                    <option value="{{ ns }}">{{ ns }} ({{ cluster.namespace_counts[ns] }} Pods)</option>
-                    {% endfor %}
-                </select>
-            </div>
-        </div>
-
-        <table id="pod-table-{{ cluster.name }}">
-            <thead>
-                <tr>
-                    <th>Namespace</th>
-                    <th>Pod Name</th>
-                    <th>Node Name</th>
-                    <th>CPU Utilization (vCPU)</th>
-                    <th>Memory Utilization (GB)</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for pod in cluster.pods_info %}
-                <tr class="pod-row" data-namespace="{{ pod.namespace }}">
-                    <td class="ns">{{ pod.namespace }}</td>
-                    <td>{{ pod.name }}</td>
-                    <td>{{ pod.node_name }}</td>
-                    <td>{{ pod.cpu_utilization }}</td>
-                    <td>{{ pod.memory_utilization_gb }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        <h3>Replica Count by Deployment (per Namespace)</h3>
-        <div class="dropdown">
-            <div>
-                <label for="replica-namespace-select-{{ cluster.name }}">Select Namespace:</label>
-                <select id="replica-namespace-select-{{ cluster.name }}" onchange="filterDeployments(this.value, '{{ cluster.name }}')">
-                    <option value="">Show All</option>
-                    {% for ns in cluster.deployments_by_ns.keys() | sort %}
-                    <option value="{{ ns }}">{{ ns }}</option>
-                    {% endfor %}
-                </select>
-            </div>
-        </div>
-
-        <table id="replica-table-{{ cluster.name }}">
-            <thead>
-                <tr>
-                    <th>Namespace</th>
-                    <th>Application (Deployment)</th>
-                    <th>Desired Replicas</th>
-                    <th>Ready Replicas</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for d in cluster.deployments_info %}
-                <tr class="deploy-row" data-namespace="{{ d.namespace }}">
-                    <td class="ns">{{ d.namespace }}</td>
-                    <td>{{ d.deployment }}</td>
-                    <td>{{ d.desired }}</td>
-                    <td>{{ d.ready }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        <h3>Maximum Utilization within Cluster</h3>
-        <div class="dropdown">
-            <label for="max-utilization-select-{{ cluster.name }}">Select Metric:</label>
-            <select id="max-utilization-select-{{ cluster.name }}" onchange="filterMaxUtilization(this.value, '{{ cluster.name }}')">
-                <option value="cpu">Max CPU Utilization</option>
-                <option value="memory">Max Memory Utilization</option>
-            </select>
-        </div>
-        <table id="max-utilization-table-{{ cluster.name }}">
-            <thead>
-                <tr>
-                    <th>Namespace</th>
-                    <th>Pod Name</th>
-                    <th>Node Name</th>
-                    <th>CPU Utilization (vCPU)</th>
-                    <th>Memory Utilization (GB)</th>
-                </tr>
-            </thead>
-            <tbody id="max-utilization-body-{{ cluster.name }}">
-            {% set max_cpu_pods = cluster.pods_info | sort(attribute='cpu_utilization', reverse=True)[:5] %}
-            {% set max_memory_pods = cluster.pods_info | sort(attribute='memory_utilization_gb', reverse=True)[:5] %}
-            {% for pod in max_cpu_pods %}
-            <tr class="max-cpu-row">
-                <td>{{ pod.namespace }}</td>
-                <td>{{ pod.name }}</td>
-                <td>{{ pod.node_name }}</td>
-                <td>{{ pod.cpu_utilization }}</td>
-                <td>{{ pod.memory_utilization_gb }}</td>
-            </tr>
-            {% endfor %}
-            {% for pod in max_memory_pods %}
-            <tr class="max-memory-row">
-                <td>{{ pod.namespace }}</td>
-                <td>{{ pod.name }}</td>
-                <td>{{ pod.node_name }}</td>
-                <td>{{ pod.cpu_utilization }}</td>
-                <td>{{ pod.memory_utilization_gb }}</td>
-            </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-        </div>
-        {% endfor %}
-
-        <a href="eks_report.html" download="eks_report.html" class="download-link">Download Report</a>
-
-        <div class="footer">
-            Build with <span>❤️</span> VENERABLE
-        </div>
-
-        <script>
-            function changeEnvironment() {
-                const envSelect = document.getElementById('env-select');
-                const selectedEnv = envSelect.value;
-                {% for account in accounts %}
-                document.getElementById('cluster-{{ account.name }}').style.display = 'none';
-                {% endfor %}
-                document.getElementById('cluster-' + selectedEnv).style.display = 'block';
-            }
-
-            function filterRowsByNamespace(rows, namespace) {
-                for (let i = 0; i < rows.length; i++) {
-                    const rowNs = rows[i].getAttribute('data-namespace');
-                    rows[i].style.display = (namespace === '' || namespace === rowNs) ? '' : 'none';
-                }
-            }
-
-            function filterPodsAndDeploys(namespace, clusterName) {
-                // Filter Pods
-                const podTable = document.getElementById('pod-table-' + clusterName);
-                const podRows = podTable.getElementsByClassName('pod-row');
-                filterRowsByNamespace(podRows, namespace);
-
-                // Filter Deployments
-                const depTable = document.getElementById('replica-table-' + clusterName);
-                const depRows = depTable.getElementsByClassName('deploy-row');
-                filterRowsByNamespace(depRows, namespace);
-            }
-
-            function filterDeployments(namespace, clusterName) {
-                const depTable = document.getElementById('replica-table-' + clusterName);
-                const depRows = depTable.getElementsByClassName('deploy-row');
-                filterRowsByNamespace(depRows, namespace);
-            }
-
-            function filterBySuffix(suffix, clusterName) {
-                // Applies to both Pods & Deployments (by namespace ending)
-                const podTable = document.getElementById('pod-table-' + clusterName);
-                const podRows = podTable.getElementsByClassName('pod-row');
-                const depTable = document.getElementById('replica-table-' + clusterName);
-                const depRows = depTable.getElementsByClassName('deploy-row');
-
-                const showBySuffix = (row) => {
-                    const nsCell = row.querySelector('.ns');
-                    if (!nsCell) return true;
-                    const ns = nsCell.textContent || '';
-                    if (!suffix) return true; // "All"
-                    return ns.endsWith(suffix);
-                };
-
-                for (let i = 0; i < podRows.length; i++) {
-                    podRows[i].style.display = showBySuffix(podRows[i]) ? '' : 'none';
-                }
-                for (let i = 0; i < depRows.length; i++) {
-                    depRows[i].style.display = showBySuffix(depRows[i]) ? '' : 'none';
-                }
-
-                // Clear specific-namespace filters when suffix changes
-                const nsSelPods = document.getElementById('namespace-select-' + clusterName);
-                if (nsSelPods) nsSelPods.value = '';
-                const nsSelDeploys = document.getElementById('replica-namespace-select-' + clusterName);
-                if (nsSelDeploys) nsSelDeploys.value = '';
-            }
-
-            function filterMaxUtilization(metric, clusterName) {
-                var maxCpuRows = document.querySelectorAll('#max-utilization-table-' + clusterName + ' .max-cpu-row');
-                var maxMemoryRows = document.querySelectorAll('#max-utilization-table-' + clusterName + ' .max-memory-row');
-
-                if (metric === 'cpu') {
-                    for (let i = 0; i < maxCpuRows.length; i++) maxCpuRows[i].style.display = '';
-                    for (let i = 0; i < maxMemoryRows.length; i++) maxMemoryRows[i].style.display = 'none';
-                } else if (metric === 'memory') {
-                    for (let i = 0; i < maxCpuRows.length; i++) maxCpuRows[i].style.display = 'none';
-                    for (let i = 0; i < maxMemoryRows.length; i++) maxMemoryRows[i].style.display = '';
-                }
-            }
-        </script>
-    </body>
-    </html>
-    """
+    collected = datetime.fromtimestamp(collected_at).strftime("%Y-%m-%d %H:%M:%S") if collected_at else None
 
     total_clusters = len(clusters_info)
     total_nodes = sum(len(cluster['nodes']) for cluster in clusters_info)
@@ -575,31 +257,132 @@ def generate_html_report(clusters_info, current_env):
         cluster['total_nodes'] = len(cluster['nodes'])
         cluster['total_pods'] = len(cluster['pods_info'])
 
-    html_template = Template(template)
-    html_content = html_template.render(
+    return dict(
         total_clusters=total_clusters,
         total_nodes=total_nodes,
         total_pods=total_pods,
         clusters=clusters_info,
+        cluster_sections=_cluster_sections(clusters_info, table_mode, workers, cache),
         accounts=accounts,
         current_env=current_env,
-        timestamp=timestamp
+        timestamp=timestamp,
+        collected=collected,
+        table_mode=table_mode
     )
-    return html_content
 
-def lambda_handler(event, context):
-    environment = event.get('queryStringParameters', {}).get('environment', 'dev')
+def generate_html_report(clusters_info, current_env, collected_at=None, table_mode='html', workers=None):
+    return reports.render('replica.html', **_report_context(clusters_info, current_env, collected_at, table_mode, workers))
 
-    clusters_info = []
-    for account in accounts:
-        set_aws_credentials(account['name'])
-        session = get_aws_session(account['region'])
-        clusters = get_clusters(session)
+def stream_html_report(clusters_info, current_env, collected_at=None, table_mode='html', workers=None, cache=False):
+    """
+    generate_html_report() as an iterator of chunks (see reports.stream).
+
+    Memory is bounded by the cluster section being rendered only while
+    sections are not kept afterwards, so the fragment cache is off here by
+    default. cache=True reuses and stores sections (faster repeat renders,
+    at up to FRAGMENT_CACHE_BYTES held for the life of the process). With
+    several workers, sections rendered ahead of the one being streamed are
+    held too.
+    """
+    return reports.stream(
+        'replica.html', **_report_context(clusters_info, current_env, collected_at, table_mode, workers, cache)
+    )
+
+def generate_degraded_report(clusters_info, current_env, collected_at=None):
+    """Degraded deployments only, straight from each cluster's degraded_by_group index."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    collected = datetime.fromtimestamp(collected_at).strftime("%Y-%m-%d %H:%M:%S") if collected_at else None
+
+    return reports.env.get_template('replica_degraded.html').render(
+        clusters=clusters_info,
+        current_env=current_env,
+        timestamp=timestamp,
+        collected=collected
+    )
+
+def generate_pods_page(clusters_info, current_env, cluster_name, page=0, namespace=None, collected_at=None):
+    """One page of REPORT_PAGE_SIZE pods of one cluster, optionally of one namespace."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    collected = datetime.fromtimestamp(collected_at).strftime("%Y-%m-%d %H:%M:%S") if collected_at else None
+
+    cluster = next((c for c in clusters_info if c['name'] == cluster_name and c['account'] == current_env), None)
+    pods, namespaces, rows = None, [], []
+    if cluster is not None:
+        table = cluster['pods_info']
+        namespaces = sorted(table.namespaces.values)
+        if not namespace:
+            rows = range(len(table))
+        elif namespace in table.namespaces.values:
+            code = table.namespaces.code(namespace)
+            rows = [i for i, ns in enumerate(table.namespace) if ns == code]
+
+    pages = max(1, -(-len(rows) // REPORT_PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+    first = page * REPORT_PAGE_SIZE
+    if cluster is not None:
+        pods = [table.row(i) for i in rows[first:first + REPORT_PAGE_SIZE]]
+
+    return reports.render(
+        'replica_pods.html',
+        cluster_name=cluster_name,
+        current_env=current_env,
+        namespace=namespace,
+        namespaces=namespaces,
+        pods=pods,
+        page=page,
+        pages=pages,
+        first=first,
+        total=len(rows),
+        timestamp=timestamp,
+        collected=collected
+    )
+
+def _prepare_account(account):
+    """Resolve one account's session, clusters and per-cluster backends."""
+    session = get_aws_session(account['name'], account['region'])
+    if session is None:
+        return session, []
+
+    prepared = []
+    for cluster in sorted(get_clusters(session)):
+        try:
+            prepared.append((cluster, get_backend(cluster, session)))
+        except Exception as e:
+            print(f"Error preparing collector for cluster {cluster}: {e}")
+    return session, prepared
 
-        for cluster in clusters:
-            nodes = get_nodes_and_metrics(cluster, session)
-            pods_info, namespace_counts, group_counts, group_order = get_pods_and_metrics(cluster, session, account['name'])
-            deployments_info, deployments_by_ns = get_deploy_replica_data(cluster, session)
+def collect_clusters(accounts, max_workers=COLLECTOR_WORKERS):
+    """
+    Collect every cluster of every account with a bounded thread pool.
+
+    Accounts are prepared concurrently, each with its own boto3 Session and
+    kubectl environment, then the nodes, pods and deployments of every
+    cluster are fetched as independent tasks. A failing account or cluster
+    is logged and left out; a cluster whose inventory watch is failing is
+    kept but carries the warning in 'sync'. Output is ordered by account (as in `accounts`)
+    then cluster name so the rendered HTML is stable between runs.
+    """
+    clusters_info = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        prepared = list(pool.map(_prepare_account, accounts))
+
+        jobs = []
+        for account, (session, clusters) in zip(accounts, prepared):
+            for cluster, backend in clusters:
+                jobs.append((account, cluster, [
+                    pool.submit(get_nodes_and_metrics, cluster, session, backend),
+                    pool.submit(get_pods_and_metrics, cluster, session, account['name'], backend),
+                    pool.submit(get_deploy_replica_data, cluster, session, backend, account['name']),
+                ]))
+
+        for account, cluster, futures in jobs:
+            try:
+                nodes, pod_data, deploy_data = [f.result() for f in futures]
+            except Exception as e:
+                print(f"Error collecting cluster {cluster}: {e}")
+                continue
+            pods_info, namespace_counts, group_counts, group_order, phase_counts, node_pod_counts = pod_data
+            deployments_info, deployments_by_ns, degraded_by_group = deploy_data
 
             clusters_info.append({
                 'name': cluster,
@@ -607,25 +390,75 @@ def lambda_handler(event, context):
                 'region': account['region'],
                 'nodes': nodes,
                 'pods_info': pods_info,
-                'pods': {pod['namespace']: 1 for pod in pods_info},  # kept same as your code
+                'pods': dict.fromkeys(pods_info.namespaces, 1),
                 'namespace_counts': namespace_counts,
                 'group_counts': group_counts,
                 'group_order': group_order,
+                'phase_counts': phase_counts,
+                'node_pod_counts': node_pod_counts,
                 'deployments_info': deployments_info,
-                'deployments_by_ns': deployments_by_ns
+                'deployments_by_ns': deployments_by_ns,
+                'degraded_by_group': degraded_by_group,
+                # Inventory backends report a failing watch here (see inventory.sync_warning)
+                'sync': backend.sync_warning() if hasattr(backend, 'sync_warning') else None,
             })
 
-    html_content = generate_html_report(clusters_info, environment)
-    return {
-        'statusCode': 200,
-        'headers': {'Content-Type': 'text/html'},
-        'body': html_content
-    }
+    return clusters_info
+
+def load_or_collect(refresh=False):
+    """
+    (clusters_info, collected_at) from the latest snapshot, or from a fresh
+    collection (saved as the new snapshot) if it is stale or refresh is set.
+    """
+    clusters_info, collected_at = [], None
+    if not refresh:
+        clusters_info, collected_at = snapshots.load_latest(max_age=snapshots.SNAPSHOT_MAX_AGE)
+
+    if not clusters_info:
+        if not replicahealth.tracking():
+            # Cold start: carry deployment health over from the last snapshot, however old
+            replicahealth.restore(*snapshots.load_latest())
+        kubetop.reset_call_count()
+        collected_at = time.time()
+        clusters_info = collect_clusters(accounts)
+        print(f"kubectl calls made: {kubetop.call_count()}")
+        try:
+            snapshots.save_snapshot(clusters_info, collected_at)
+        except Exception as e:
+            print(f"Error saving snapshot: {e}")
+    return clusters_info, collected_at
+
+def _page_number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def lambda_handler(event, context):
+    params = event.get('queryStringParameters') or {}
+    environment = params.get('environment', 'dev')
+
+    # Re-render from the latest snapshot unless it is stale or ?refresh=1
+    clusters_info, collected_at = load_or_collect(params.get('refresh') == '1')
+
+    if params.get('view') == 'degraded':
+        renders = [partial(generate_degraded_report, clusters_info, environment, collected_at)]
+    elif params.get('view') == 'pods':
+        renders = [partial(
+            generate_pods_page, clusters_info, environment, params.get('cluster', ''),
+            _page_number(params.get('page')), params.get('namespace') or None, collected_at,
+        )]
+    else:
+        # The requested table mode, falling back to smaller pages if the response is too large
+        mode = 'paged' if params.get('table') == 'paged' else virtualtable.table_mode(params)
+        renders = [
+            partial(generate_html_report, clusters_info, environment, collected_at, m)
+            for m in TABLE_LADDER[TABLE_LADDER.index(mode):]
+        ]
+    return lambdaresponse.respond(event, renders)
 
 if __name__ == '__main__':
-    # Simulate a request for local testing
-    event = {'queryStringParameters': {'environment': 'dev'}}
-    result = lambda_handler(event, None)
-    with open('eks_dashboard.html', 'w') as f:
-        f.write(result['body'])
+    # Render for local testing, streamed straight to the file
+    clusters_info, collected_at = load_or_collect()
+    reports.write_file(stream_html_report(clusters_info, 'dev', collected_at), 'eks_dashboard.html')
     print("Dashboard HTML generated.")
@@ -2,8 +2,11 @@
 
 import os
 import subprocess
+import boto3
 import openpyxl
 
+import eksauth
+
 # Define EKS cluster details for idev
 EKS_CLUSTER = {
     "cluster_name": "dev",
@@ -23,18 +26,13 @@ def set_aws_credentials(aws_access_key, aws_secret_key, aws_session_token):
     print("AWS credentials set successfully.")
 
 def switch_eks_cluster(cluster_name, region):
-    """Switch context to the given EKS cluster."""
-    command = ["aws", "eks", "update-kubeconfig", "--region", region, "--name", cluster_name]
-    
+    """Point kubectl at the given EKS cluster via a private kubeconfig with an in-process token."""
     try:
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if result.returncode == 0:
-            return True
-        else:
-            print(f"Failed to switch to {cluster_name}: {result.stderr.decode('utf-8')}")
-            return False
+        session = boto3.Session(region_name=region)
+        os.environ["KUBECONFIG"] = eksauth.write_kubeconfig(session, cluster_name)
+        return True
     except Exception as e:
-        print(f"Error switching cluster: {e}")
+        print(f"Failed to switch to {cluster_name}: {e}")
         return False
 
 def get_application_namespaces():
@@ -0,0 +1,61 @@
+"""
+Parallel render benchmark for the Replica dashboard.
+
+Renders a synthetic 20-cluster snapshot with every cluster section rendered
+from scratch (the fragment cache is cleared before each run), in this
+process and then with 2..N worker processes (Replica.RENDER_WORKERS).
+Output is checked against the single-process page. Run from the repository
+root:
+
+    python bench_parallel.py [max workers] [pods per cluster] [repeat]
+
+Results are printed and written to bench_parallel_output.txt. The pool's
+speed-up has not been measured yet: the only host these were run on has a
+single CPU, where extra processes are pure overhead. Run it on a
+multi-core machine before turning RENDER_WORKERS on.
+"""
+import os
+import sys
+
+# The repository's html.py shadows the standard library html package that
+# boto3 imports (via Replica -> credentials); load the real one first.
+_REPO = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or '.') != _REPO]
+import html.parser  # noqa: E402,F401
+sys.path.append(_REPO)
+
+import Replica
+import reports
+from bench_render import _median_ms, synthetic_clusters
+
+CLUSTERS = 20
+
+
+def main(max_workers=None, pods=3000, repeat=3):
+    max_workers = max_workers or os.cpu_count() or 1
+    snapshot = synthetic_clusters(clusters=CLUSTERS, pods=pods)
+
+    def report(workers):
+        reports.fragment_cache.clear()
+        return Replica.generate_html_report(snapshot, 'dev', workers=workers)
+
+    expected = report(0).split('Report generated on:')[1].split('\n', 1)[1]
+    lines = [f"Replica report, {CLUSTERS} clusters x {pods} pods, median of {repeat} runs ({os.cpu_count()} CPUs)"]
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        page = report(workers)
+        if page.split('Report generated on:')[1].split('\n', 1)[1] != expected:
+            raise SystemExit(f"{workers} workers rendered a different page")
+        elapsed = _median_ms(lambda: report(workers), repeat)
+        baseline = baseline or elapsed
+        label = "in process" if workers == 1 else f"{workers} processes"
+        lines.append(f"  {label:<14} {elapsed:9.1f} ms   {baseline / elapsed:5.2f}x")
+
+    output = '\n'.join(lines)
+    print(output)
+    with open('bench_parallel_output.txt', 'w') as f:
+        f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,182 @@
+"""
+Render benchmark for the Replica dashboard on a synthetic snapshot.
+
+Compares the old path (parse and compile the template source on every
+report) with the shared reports.env: a cold process without a bytecode
+cache, a cold process loading bytecode from the cache, and a warm process
+with the compiled template in memory. It then times a multi-cluster report
+with and without per-cluster fragments reused from reports.fragment_cache.
+Run from the repository root:
+
+    python bench_render.py [pods] [repeat]
+
+Results are printed and written to bench_output.txt.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# The repository's html.py shadows the standard library html package that
+# boto3 imports (via Replica -> credentials); load the real one first.
+_REPO = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or '.') != _REPO]
+import html.parser  # noqa: E402,F401
+sys.path.append(_REPO)
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+import Replica
+import nsgroups
+import replicahealth
+import reports
+import usagetables
+
+TEMPLATE = 'replica.html'
+
+
+def synthetic_clusters(clusters=1, pods=5000, account='dev'):
+    """collect_clusters()-shaped data for `clusters` clusters of `pods` pods each."""
+    classify = nsgroups.get_classifier(account).classify
+    result = []
+    for c in range(clusters):
+        node_count = max(1, pods // 30)
+        nodes = usagetables.NodeTable()
+        for n in range(node_count):
+            nodes.append(f"ip-10-{c}-{n // 250}-{n % 250}.ec2.internal", 8.0, 32 * 2 ** 30, (n % 9) * 0.7, (n % 13) * 2 ** 30)
+
+        table = usagetables.PodTable()
+        namespace_counts, phase_counts = {}, {}
+        for i in range(pods):
+            namespace = f"team{i % 120}-{('dev', 'intg', 'accp')[i % 3]}"
+            table.append(
+                namespace, f"svc{i % 700}-{i:06d}-x7k2q", nodes.row(i % node_count).name,
+                classify(namespace), (i % 17) * 0.031, (i % 29) * 48 * 2 ** 20,
+            )
+            namespace_counts[namespace] = namespace_counts.get(namespace, 0) + 1
+            phases = phase_counts.setdefault(namespace, {})
+            phases['Running'] = phases.get('Running', 0) + 1
+
+        health = replicahealth.ReplicaHealth(classify)
+        health.update([
+            (f"team{d % 120}-{('dev', 'intg', 'accp')[d % 3]}", f"svc{d}", 3, 3 if d % 25 else 1)
+            for d in range(pods // 7)
+        ])
+        group_counts = table.count_by('group')
+        result.append({
+            'name': f"cluster-{c:02d}",
+            'account': account,
+            'region': 'us-east-1',
+            'nodes': nodes,
+            'pods_info': table,
+            'pods': dict.fromkeys(table.namespaces, 1),
+            'namespace_counts': namespace_counts,
+            'group_counts': group_counts,
+            'group_order': list(group_counts),
+            'phase_counts': phase_counts,
+            'node_pod_counts': table.count_by('node'),
+            'deployments_info': health.deployments_info(),
+            'deployments_by_ns': health.deployments_by_ns(),
+            'degraded_by_group': health.degraded_by_group(),
+        })
+    return result
+
+
+def _environment(cache_dir=None):
+    env = Environment(
+        loader=FileSystemLoader(reports.TEMPLATE_DIR),
+        bytecode_cache=FileSystemBytecodeCache(cache_dir) if cache_dir else None,
+        auto_reload=False,
+    )
+    env.filters.update(reports.env.filters)
+    env.globals.update(reports.env.globals)
+    return env
+
+
+class _InlineEnvironment:
+    """The old behaviour: compile the template source on every report."""
+
+    def __init__(self):
+        self.env = _environment()
+        self.loader = self.env.loader
+
+    def get_template(self, name):
+        with open(os.path.join(reports.TEMPLATE_DIR, name)) as f:
+            return self.env.from_string(f.read())
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _fragment_lines(repeat, clusters=12, pods=2000):
+    """Report over `clusters` clusters: everything rendered, nothing changed, one cluster changed."""
+    snapshot = synthetic_clusters(clusters=clusters, pods=pods)
+    dirty = snapshot[0]['pods_info']
+
+    def full():
+        reports.fragment_cache.clear()
+        Replica.generate_html_report(snapshot, 'dev')
+
+    def unchanged():
+        Replica.generate_html_report(snapshot, 'dev')
+
+    def one_changed():
+        dirty.cpu[0] += 0.001  # a new usage sample in one cluster
+        Replica.generate_html_report(snapshot, 'dev')
+
+    lines = [f"generate_html_report, {clusters} clusters x {pods} pods:"]
+    for label, fn in (("no fragment cache", full), ("nothing changed", unchanged), ("one cluster changed", one_changed)):
+        unchanged()  # warm the cache from the current data
+        lines.append(f"  {label:<28} {_median_ms(fn, repeat):9.2f} ms")
+    return lines
+
+
+def main(pods=5000, repeat=5):
+    clusters = synthetic_clusters(pods=pods)
+    shared_env = reports.env
+    lines = [f"Replica report, {pods} pods, median of {repeat} runs"]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _environment(cache_dir).get_template(TEMPLATE)  # fill the bytecode cache
+        compile_rows = [
+            ("compile per call (before)", lambda: _InlineEnvironment().get_template(TEMPLATE)),
+            ("cold, no bytecode cache", lambda: _environment().get_template(TEMPLATE)),
+            ("cold, bytecode cache", lambda: _environment(cache_dir).get_template(TEMPLATE)),
+            ("warm, shared env", lambda: shared_env.get_template(TEMPLATE)),
+        ]
+        lines.append("template load:")
+        for label, fn in compile_rows:
+            lines.append(f"  {label:<28} {_median_ms(fn, repeat):9.2f} ms")
+
+    def report():
+        reports.fragment_cache.clear()  # time full renders, not cache hits
+        Replica.generate_html_report(clusters, 'dev')
+
+    lines.append("generate_html_report:")
+    try:
+        reports.env = _InlineEnvironment()
+        before = _median_ms(report, repeat)
+    finally:
+        reports.env = shared_env
+    report()  # load the shared template once
+    after = _median_ms(report, repeat)
+    lines.append(f"  {'before (compile per call)':<28} {before:9.2f} ms")
+    lines.append(f"  {'after (shared env)':<28} {after:9.2f} ms")
+
+    lines.extend(_fragment_lines(repeat))
+
+    output = '\n'.join(lines)
+    print(output)
+    with open('bench_output.txt', 'w') as f:
+        f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,50 @@
+"""
+ACM certificate and Secrets Manager inventory reports.
+
+The Asm scripts used to build their pages with `html +=` inside loops over
+certificates and their InUseBy resources, which copies the whole page on
+every append (quadratic in its size) and escapes nothing. They now render
+through the templates/certs_*.html templates on the shared reports.env:
+compiled once, rendered into a list that is joined once (or streamed), and
+autoescaped, so a domain, ARN or secret name can't break the markup.
+
+Every function takes the data shapes the scripts already collect:
+certificate dicts (DomainName, Status, ..., InUseBy) and secret dicts
+(Name, RotationEnabled, Versions, ReplicationRegions).
+"""
+import reports
+
+
+def render_dashboard(all_data, accounts):
+    """Multi-account page: {account: {'certs': [...], 'secrets': [...]}}, accounts as in Asm.py."""
+    return reports.render('certs_dashboard.html', all_data=all_data, accounts=accounts)
+
+
+def stream_dashboard(all_data, accounts):
+    """render_dashboard() as an iterator of chunks (see reports.stream)."""
+    return reports.stream('certs_dashboard.html', all_data=all_data, accounts=accounts)
+
+
+def render_email(all_data):
+    """Compact multi-account page with days to expiry, for the email report."""
+    return reports.render('certs_email.html', all_data=all_data)
+
+
+def _account_context(certs, secrets, domain_filter, secret_prefix, title):
+    return dict(
+        certs_data=certs,
+        secrets_data=secrets,
+        domain_filter=domain_filter,
+        secret_prefix=secret_prefix,
+        title=title,
+    )
+
+
+def render_account(certs, secrets, domain_filter, secret_prefix, title='Dev Account Dashboard'):
+    """Single-account page with the InUseBy resources of each certificate as a nested table."""
+    return reports.render('certs_account.html', **_account_context(certs, secrets, domain_filter, secret_prefix, title))
+
+
+def stream_account(certs, secrets, domain_filter, secret_prefix, title='Dev Account Dashboard'):
+    """render_account() as an iterator of chunks (see reports.stream)."""
+    return reports.stream('certs_account.html', **_account_context(certs, secrets, domain_filter, secret_prefix, title))
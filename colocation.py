@@ -0,0 +1,248 @@
+"""
+Pod co-location analysis: replicas of one workload packed onto one node.
+
+Pods are read as compact podstream.PodRecords (from any collector backend)
+and keyed by workload from their ownerReferences: a ReplicaSet owner is
+folded into its Deployment by dropping the pod-template-hash, StatefulSets
+and other controllers are used as-is, and pods without a controller fall
+back to their app labels. DaemonSet and Job pods are ignored.
+
+A ColocationTracker keeps the placement of every pod between scans. sync()
+only touches the pods that appeared, moved or went away, and offenders are
+re-ranked only for the workloads those pods belong to. Offenders are ranked
+by blast radius: the share of a workload's replicas that one node takes
+down with it.
+
+scan() runs every cluster of every account in parallel. As a filter:
+
+    kubectl get pods -A -o json | python3 colocation.py
+"""
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import credentials
+import kubebackend
+import podstream
+
+# Namespace prefixes left out of the analysis (agents that run everywhere)
+EXCLUDED_PREFIXES = tuple(
+    p for p in os.getenv('COLOCATION_EXCLUDED_PREFIXES', 'envoy,qualys,appdynamics,basic-datalore').split(',') if p
+)
+COLOCATION_WORKERS = int(os.getenv('COLOCATION_WORKERS', '8'))
+
+_IGNORED_KINDS = ('DaemonSet', 'Job', 'Node')
+_APP_LABELS = ('app.kubernetes.io/name', 'app', 'k8s-app')
+_FINISHED = ('Succeeded', 'Failed')
+
+
+def workload_key(record):
+    """(namespace, kind, name) of the workload a pod belongs to, or None to skip it."""
+    if record.namespace.startswith(EXCLUDED_PREFIXES) or record.phase in _FINISHED:
+        return None
+    if record.owners:
+        kind, name = record.owners[0]
+        if kind in _IGNORED_KINDS:
+            return None
+        if kind == 'ReplicaSet':
+            template_hash = record.labels.get('pod-template-hash')
+            if template_hash and name.endswith('-' + template_hash):
+                return record.namespace, 'Deployment', name[:-len(template_hash) - 1]
+            return record.namespace, 'Deployment', name.rsplit('-', 1)[0]
+        return record.namespace, kind, name
+    for label in _APP_LABELS:
+        if record.labels.get(label):
+            return record.namespace, 'app', record.labels[label]
+    return None
+
+
+class ColocationTracker:
+    def __init__(self):
+        self.generation = None
+        self._pods = {}       # (namespace, pod) -> (workload, node)
+        self._replicas = {}   # workload -> pod count, scheduled or not
+        self._placement = {}  # workload -> {node: {pod, ...}}
+        self._offenders = {}  # workload -> [offender row, ...]
+        self._dirty = set()
+
+    def sync(self, records, generation=None):
+        """
+        Bring the tracker in line with a full pod listing. Pass the source's
+        generation (see inventory.ClusterInventory) to skip unchanged scans.
+        """
+        if generation is not None and generation == self.generation:
+            return
+        seen = set()
+        for record in records:
+            key = (record.namespace, record.name)
+            seen.add(key)
+            self._place(key, record)
+        for key in [key for key in self._pods if key not in seen]:
+            self._remove(key)
+        self.generation = generation
+
+    def apply(self, event_type, record):
+        """Apply one watch event (ADDED / MODIFIED / DELETED)."""
+        key = (record.namespace, record.name)
+        if event_type == 'DELETED':
+            self._remove(key)
+        else:
+            self._place(key, record)
+
+    def offenders(self):
+        """
+        One row per (workload, node) with more than one replica on the node:
+        {namespace, kind, app, node, count, replicas, blast_radius, pods},
+        highest blast radius first.
+        """
+        for workload in self._dirty:
+            rows = self._rank(workload)
+            if rows:
+                self._offenders[workload] = rows
+            else:
+                self._offenders.pop(workload, None)
+        self._dirty.clear()
+        rows = [row for rows in self._offenders.values() for row in rows]
+        rows.sort(key=_rank_key)
+        return rows
+
+    def _place(self, key, record):
+        workload = workload_key(record)
+        entry = (workload, record.node_name) if workload is not None else None
+        old = self._pods.get(key)
+        if old == entry:
+            return
+        if old is not None:
+            self._remove(key)
+        if entry is None:
+            return
+        self._pods[key] = entry
+        self._replicas[workload] = self._replicas.get(workload, 0) + 1
+        if record.node_name:
+            self._placement.setdefault(workload, {}).setdefault(record.node_name, set()).add(record.name)
+        self._dirty.add(workload)
+
+    def _remove(self, key):
+        entry = self._pods.pop(key, None)
+        if entry is None:
+            return
+        workload, node = entry
+        self._replicas[workload] -= 1
+        if not self._replicas[workload]:
+            del self._replicas[workload]
+        if node:
+            nodes = self._placement[workload]
+            nodes[node].discard(key[1])
+            if not nodes[node]:
+                del nodes[node]
+            if not nodes:
+                del self._placement[workload]
+        self._dirty.add(workload)
+
+    def _rank(self, workload):
+        replicas = self._replicas.get(workload, 0)
+        namespace, kind, name = workload
+        return [
+            {
+                'namespace': namespace,
+                'kind': kind,
+                'app': name,
+                'node': node,
+                'count': len(pods),
+                'replicas': replicas,
+                'blast_radius': len(pods) / replicas,
+                'pods': sorted(pods),
+            }
+            for node, pods in self._placement.get(workload, {}).items()
+            if len(pods) > 1
+        ]
+
+
+def _rank_key(row):
+    return -row['blast_radius'], -row['count'], row['namespace'], row['app'], row['node']
+
+
+# One tracker per (environment, cluster), kept between scans in the process
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(environment, cluster_name):
+    with _trackers_lock:
+        tracker = _trackers.get((environment, cluster_name))
+        if tracker is None:
+            tracker = _trackers[(environment, cluster_name)] = ColocationTracker()
+        return tracker
+
+
+def analyze_cluster(aws_session, cluster_name, environment=None):
+    """Ranked offenders of one cluster, updating its tracker from a fresh pod listing."""
+    backend = kubebackend.get_backend(aws_session, cluster_name)
+    tracker = get_tracker(environment, cluster_name)
+    generation = getattr(backend, 'generation', None)
+    if generation is None or generation != tracker.generation:
+        tracker.sync(backend.pod_records(), generation)
+    return tracker.offenders()
+
+
+def _account_clusters(account):
+    session = credentials.get_session(account['name'], account['region'])
+    if session is None:
+        return session, []
+    try:
+        return session, sorted(session.client('eks').list_clusters()['clusters'])
+    except Exception as e:
+        print(f"Error fetching clusters for {account['name']}: {e}")
+        return session, []
+
+
+def scan(accounts, max_workers=COLOCATION_WORKERS):
+    """
+    Analyze every cluster of every account in parallel. Returns
+    [{env, region, cluster, offenders}, ...] in account then cluster order;
+    clusters that fail are logged and left out.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        prepared = list(pool.map(_account_clusters, accounts))
+        jobs = [
+            (account, cluster, pool.submit(analyze_cluster, session, cluster, account['name']))
+            for account, (session, clusters) in zip(accounts, prepared)
+            for cluster in clusters
+        ]
+        for account, cluster, future in jobs:
+            try:
+                offenders = future.result()
+            except Exception as e:
+                print(f"Error analyzing pod placement in {cluster}: {e}")
+                continue
+            results.append({
+                'env': account['name'],
+                'region': account['region'],
+                'cluster': cluster,
+                'offenders': offenders,
+            })
+    return results
+
+
+def rank(results):
+    """Every offender of a scan() in one list, tagged with env and cluster, worst first."""
+    rows = [
+        dict(row, env=result['env'], cluster=result['cluster'])
+        for result in results
+        for row in result['offenders']
+    ]
+    rows.sort(key=_rank_key)
+    return rows
+
+
+if __name__ == '__main__':
+    tracker = ColocationTracker()
+    tracker.sync(podstream.iter_pods(sys.stdin.buffer))
+    print("%-20s %-40s %-35s %-9s %s" % ("NAMESPACE", "WORKLOAD", "NODE", "REPLICAS", "BLAST RADIUS"))
+    for row in tracker.offenders():
+        print("%-20s %-40s %-35s %-9s %.0f%%" % (
+            row['namespace'], f"{row['kind']}/{row['app']}", row['node'],
+            f"{row['count']}/{row['replicas']}", row['blast_radius'] * 100,
+        ))
@@ -2,9 +2,14 @@ import os
 import sys
 import boto3
 import subprocess
-from jinja2 import Template
 from datetime import datetime
 
+import credentials
+import kubequantity
+import kubetop
+import reports
+import topk
+
 # Define the different AWS accounts/clusters
 accounts = [
     {
@@ -50,7 +55,8 @@ def get_clusters(aws_session):
 
 def get_nodes_and_metrics(cluster_name, aws_session):
     nodes = []
-    cmd = f"kubectl get nodes --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} -o jsonpath='{{range .items[*]}}{{.metadata.name}}|{{.status.capacity.cpu}}|{{.status.capacity.memory}}|{{.metadata.labels.type}} {{end}}'"
+    ctx = credentials.kube_context(aws_session, cluster_name)
+    cmd = f"kubectl get nodes --context={ctx} -o jsonpath='{{range .items[*]}}{{.metadata.name}}|{{.status.capacity.cpu}}|{{.status.capacity.memory}}|{{.metadata.labels.type}} {{end}}'"
     
     try:
         node_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
@@ -58,6 +64,8 @@ def get_nodes_and_metrics(cluster_name, aws_session):
         print(f"Error executing kubectl command: {e}")
         return nodes
 
+    node_usage = kubetop.get_node_usage(ctx)
+
     for node in node_info:
         node_details = node.split('|')
         if len(node_details) != 4:
@@ -65,19 +73,13 @@ def get_nodes_and_metrics(cluster_name, aws_session):
             continue
 
         node_name, cpu_capacity, memory_capacity, instance_type = node_details
-        memory_capacity_gb = int(memory_capacity[:-2]) / 1024  # Convert MiB to GB
+        memory_capacity_gb = kubequantity.to_gib(memory_capacity)
 
-        cpu_cmd = f"kubectl top node {node_name} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $2}}'"
-        cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
+        cpu_utilization_raw, memory_utilization = node_usage.get(node_name, ('', ''))
 
-        if cpu_utilization_raw.endswith('m'):
-            cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000  # Convert millicores to cores
-        else:
-            cpu_utilization = int(cpu_utilization_raw) if cpu_utilization_raw.isdigit() else 0
+        cpu_utilization = kubequantity.to_float(cpu_utilization_raw)
 
-        memory_cmd = f"kubectl top node {node_name} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $4}}'"
-        memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
-        memory_utilization_gb = int(memory_utilization[:-2]) / 1024 if memory_utilization[:-2].isdigit() else 0  # Convert MiB to GB
+        memory_utilization_gb = kubequantity.to_gib(memory_utilization)
 
         memory_utilization_percentage = (memory_utilization_gb / memory_capacity_gb) * 100 if memory_capacity_gb > 0 else 0
 
@@ -96,7 +98,7 @@ def get_nodes_and_metrics(cluster_name, aws_session):
 def get_pods_and_metrics(cluster_name, aws_session):
     pods = []
     namespace_counts = {}
-    cmd = f"kubectl get pods --all-namespaces --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
+    cmd = f"kubectl get pods --all-namespaces --context={credentials.kube_context(aws_session, cluster_name)} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
     
     try:
         pod_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
@@ -114,27 +116,24 @@ def get_pods_and_metrics(cluster_name, aws_session):
             namespace_counts[namespace] += 1
 
             # Get CPU utilization for the pod
-            cpu_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $2}}'"
+            cpu_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context={credentials.kube_context(aws_session, cluster_name)} --no-headers | awk '{{print $2}}'"
             cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
 
             if not cpu_utilization_raw:
                 print(f"Warning: No CPU utilization data for pod {pod_name} in namespace {namespace}. Skipping this pod.")
                 continue
 
-            if cpu_utilization_raw.endswith('m'):
-                cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000  # Convert millicores to cores
-            else:
-                cpu_utilization = int(cpu_utilization_raw) if cpu_utilization_raw.isdigit() else 0
+            cpu_utilization = kubequantity.to_float(cpu_utilization_raw)
 
             # Get memory utilization for the pod
-            memory_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $3}}'"
+            memory_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context={credentials.kube_context(aws_session, cluster_name)} --no-headers | awk '{{print $3}}'"
             memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
 
             if not memory_utilization:
                 print(f"Warning: No memory utilization data for pod {pod_name} in namespace {namespace}. Skipping this pod.")
                 continue
 
-            memory_utilization_gb = int(memory_utilization[:-2]) / 1024 if memory_utilization[:-2].isdigit() else 0  # Convert MiB to GB
+            memory_utilization_gb = kubequantity.to_gib(memory_utilization)
 
             pods.append({
                 'namespace': namespace,
@@ -154,269 +153,19 @@ def generate_html_report(clusters_info, current_env):
     # Generate a timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>EKS Cluster Dashboard</title>
-        <link rel="icon" type="image/x-icon" href="favicon.ico">
-        <style>
-            body {
-                font-family: Arial, sans-serif;
-                margin: 20px;
-                background-color: white;
-                color: black;
-                transition: all 0.3s ease;
-            }
-            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
-            th, td { border: 1px solid #ddd; padding: 4px; text-align: left; }  /* Adjusted padding for compactness */
-            th { background-color: #007BFF; color: white; }
-            h2 { margin-top: 20px; }
-            h1 { color: #007BFF; text-align: center; }
-            p { font-weight: bold; color: black; }
-            .download-link { margin-top: 10px; }
-            .gauge-container { width: 100px; height: 50px; background: #e6e6e6; border-radius: 5px; position: relative; }
-            .gauge-fill { height: 100%; border-radius: 5px; }
-            .gauge-label { position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); font-weight: bold; }
-            .dropdown { margin-bottom: 10px; }
-            .env-selector { margin-bottom: 10px; text-align: center; font-weight: bold; color: black; }
-            #env-select { border: 2px solid black; font-weight: bold; padding: 4px; }
-            .footer { text-align: center; margin-top: 30px; font-size: 12px; font-weight: bold; }
-            .footer span { color: red; }
-            .timestamp { text-align: right; font-size: 12px; color: grey; font-weight: bold; margin-bottom: 10px; }
-            .highlight-row { background-color: yellow; }  /* Highlighting style for selected environment */
-        </style>
-    </head>
-    <body>
-        <h1>Welcome to EKS Clusters Dashboard with VENERABLE</h1>
-
-        <div class="timestamp">Report generated on: {{ timestamp }}</div>
-
-        <div class="env-selector">
-            <label for="env-select">Select Environment: </label>
-            <select id="env-select" onchange="changeEnvironment()">
-                {% for account in accounts %}
-                <option value="{{ account.name }}" {% if account.name == current_env %}selected{% endif %}>{{ account.name }}</option>
-                {% endfor %}
-            </select>
-        </div>
-
-        <table>
-            <tr>
-                <td><strong>Total Clusters:</strong> {{ total_clusters }}</td>
-                <td><strong>Total Nodes:</strong> {{ total_nodes }}</td>
-            </tr>
-            <tr>
-                <td><strong>Total Pods:</strong> {{ total_pods }}</td>
-            </tr>
-        </table>
-
-        <h3>Cluster Summary (Total Nodes & Pods per Cluster)</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Cluster Name</th>
-                    <th>Total Nodes</th>
-                    <th>Total Pods</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for cluster in clusters %}
-                <tr class="{% if cluster.account == current_env %}highlight-row{% endif %}">
-                    <td>{{ cluster.name }} ({{ cluster.account }})</td>
-                    <td>{{ cluster.total_nodes }}</td>
-                    <td>{{ cluster.total_pods }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        {% for cluster in clusters %}
-        <div id="cluster-{{ cluster.account }}" style="display: {% if cluster.account == current_env %}block{% else %}none{% endif %};">
-        <h2>{{ cluster.name }} ({{ cluster.account }} - {{ cluster.region }})</h2>
-
-        <h3>Nodes Information</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Node Name</th>
-                    <th>Instance Type</th>  <!-- Added Instance Type column -->
-                    <th>CPU Capacity (vCPU)</th>
-                    <th>Memory Capacity (GB)</th>
-                    <th>CPU Utilization (%)</th>
-                    <th>Memory Utilization (GB)</th>
-                    <th>Memory Utilization (%)</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for node in cluster.nodes %}
-                <tr>
-                    <td>{{ node.name }}</td>
-                    <td>{{ node.instance_type }}</td>  <!-- Display instance type -->
-                    <td>{{ node.cpu_capacity }}</td>
-                    <td>{{ node.memory_capacity_gb }}</td>
-                    <td>{{ node.cpu_utilization }}%</td>
-                    <td>{{ node.memory_utilization_gb }}</td>
-                    <td>
-                        <div class="gauge-container">
-                            <div class="gauge-fill" style="width: {{ node.memory_utilization_percentage }}%; background: {% if node.memory_utilization_percentage|float < 75 %}green{% else %}orange{% endif %};"></div>
-                            <div class="gauge-label">{{ node.memory_utilization_percentage }}%</div>
-                        </div>
-                    </td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        <h3>Pods Information by Namespace</h3>
-        <div class="dropdown">
-            <label for="namespace-select-{{ cluster.name }}">Select Namespace:</label>
-            <select id="namespace-select-{{ cluster.name }}" onchange="filterPods(this.value, '{{ cluster.name }}')">
-                <option value="">Show All</option>
-                {% for namespace in cluster.pods %}
-                <option value="{{ namespace }}">{{ namespace }} ({{ cluster.namespace_counts[namespace] }} Pods)</option>
-                {% endfor %}
-            </select>
-        </div>
-        <table id="pod-table-{{ cluster.name }}">
-            <thead>
-                <tr>
-                    <th>Namespace</th>
-                    <th>Pod Name</th>
-                    <th>Node Name</th>
-                    <th>CPU Utilization (vCPU)</th>
-                    <th>Memory Utilization (GB)</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for pod in cluster.pods_info %}
-                <tr class="pod-row" data-namespace="{{ pod.namespace }}">
-                    <td>{{ pod.namespace }}</td>
-                    <td>{{ pod.name }}</td>
-                    <td>{{ pod.node_name }}</td>
-                    <td>{{ pod.cpu_utilization }}</td>
-                    <td>{{ pod.memory_utilization_gb }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        <h3>Maximum Utilization within Cluster</h3>
-        <div class="dropdown">
-            <label for="max-utilization-select-{{ cluster.name }}">Select Metric:</label>
-            <select id="max-utilization-select-{{ cluster.name }}" onchange="filterMaxUtilization(this.value, '{{ cluster.name }}')">
-                <option value="cpu">Max CPU Utilization</option>
-                <option value="memory">Max Memory Utilization</option>
-            </select>
-        </div>
-        <table id="max-utilization-table-{{ cluster.name }}">
-            <thead>
-                <tr>
-                    <th>Namespace</th>
-                    <th>Pod Name</th>
-                    <th>Node Name</th>
-                    <th>CPU Utilization (vCPU)</th>
-                    <th>Memory Utilization (GB)</th>
-                </tr>
-            </thead>
-            <tbody id="max-utilization-body-{{ cluster.name }}">
-            {% set max_cpu_pods = cluster.pods_info | sort(attribute='cpu_utilization', reverse=True)[:5] %}
-            {% set max_memory_pods = cluster.pods_info | sort(attribute='memory_utilization_gb', reverse=True)[:5] %}
-            {% for pod in max_cpu_pods %}
-            <tr class="max-cpu-row">
-                <td>{{ pod.namespace }}</td>
-                <td>{{ pod.name }}</td>
-                <td>{{ pod.node_name }}</td>
-                <td>{{ pod.cpu_utilization }}</td>
-                <td>{{ pod.memory_utilization_gb }}</td>
-            </tr>
-            {% endfor %}
-            {% for pod in max_memory_pods %}
-            <tr class="max-memory-row">
-                <td>{{ pod.namespace }}</td>
-                <td>{{ pod.name }}</td>
-                <td>{{ pod.node_name }}</td>
-                <td>{{ pod.cpu_utilization }}</td>
-                <td>{{ pod.memory_utilization_gb }}</td>
-            </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-        </div>
-        {% endfor %}
-
-        <a href="eks_report.html" download="eks_report.html" class="download-link">Download Report</a>
-
-        <div class="footer">
-            Build with <span>❤️</span> VENERABLE
-        </div>
-
-        <script>
-            function changeEnvironment() {
-                const envSelect = document.getElementById('env-select');
-                const selectedEnv = envSelect.value;
-
-                // Hide all clusters
-                {% for account in accounts %}
-                document.getElementById('cluster-{{ account.name }}').style.display = 'none';
-                {% endfor %}
-                
-                // Show the selected cluster
-                document.getElementById('cluster-' + selectedEnv).style.display = 'block';
-            }
-
-            function filterPods(namespace, clusterName) {
-                var table = document.getElementById('pod-table-' + clusterName);
-                var rows = table.getElementsByClassName('pod-row');
-                for (var i = 0; i < rows.length; i++) {
-                    var rowNamespace = rows[i].getAttribute('data-namespace');
-                    if (namespace === '' || namespace === rowNamespace) {
-                        rows[i].style.display = '';
-                    } else {
-                        rows[i].style.display = 'none';
-                    }
-                }
-            }
-
-            function filterMaxUtilization(metric, clusterName) {
-                var maxCpuRows = document.querySelectorAll('#max-utilization-table-' + clusterName + ' .max-cpu-row');
-                var maxMemoryRows = document.querySelectorAll('#max-utilization-table-' + clusterName + ' .max-memory-row');
-
-                if (metric === 'cpu') {
-                    showMaxCpuRows(maxCpuRows);
-                } else if (metric === 'memory') {
-                    showMaxMemoryRows(maxMemoryRows);
-                }
-            }
-
-            function showMaxCpuRows(rows) {
-                for (let i = 0; i < rows.length; i++) {
-                    rows[i].style.display = '';
-                }
-            }
-
-            function showMaxMemoryRows(rows) {
-                for (let i = 0; i < rows.length; i++) {
-                    rows[i].style.display = '';
-                }
-            }
-        </script>
-    </body>
-    </html>
-    """
-
     total_clusters = len(clusters_info)
     total_nodes = sum(len(cluster['nodes']) for cluster in clusters_info)
     total_pods = sum(len(cluster['pods_info']) for cluster in clusters_info)
 
+    for cluster in clusters_info:
+        cluster['top'] = topk.top_pods(cluster['pods_info'])
+
     # Add per-cluster total nodes and total pods
     for cluster in clusters_info:
         cluster['total_nodes'] = len(cluster['nodes'])
         cluster['total_pods'] = len(cluster['pods_info'])
 
-    html_template = Template(template)
+    html_template = reports.env.get_template('compact.html')
     html_content = html_template.render(
         total_clusters=total_clusters,
         total_nodes=total_nodes,
@@ -0,0 +1,100 @@
+"""
+Per-environment AWS credentials without touching os.environ.
+
+Each environment's keys live in {env}_AWS_ACCESS_KEY_ID,
+{env}_AWS_SECRET_ACCESS_KEY and (optionally) {env}_AWS_SESSION_TOKEN.
+get_session() turns them into an isolated boto3 Session, and kube_env()
+builds the environment a kubectl subprocess needs so its
+`aws eks get-token` exec plugin authenticates as that same account. Several
+accounts can therefore be collected concurrently in one process.
+"""
+import os
+import threading
+import time
+
+import boto3
+
+
+def get_credentials(environment):
+    access_key = os.getenv(f'{environment}_AWS_ACCESS_KEY_ID')
+    secret_key = os.getenv(f'{environment}_AWS_SECRET_ACCESS_KEY')
+    if not access_key or not secret_key:
+        return None
+    return {
+        'aws_access_key_id': access_key,
+        'aws_secret_access_key': secret_key,
+        'aws_session_token': os.getenv(f'{environment}_AWS_SESSION_TOKEN'),  # Optional
+    }
+
+
+def get_session(environment, region):
+    """Return a boto3 Session for the environment, or None if its credentials are missing."""
+    creds = get_credentials(environment)
+    if creds is None:
+        print(f"Error: AWS credentials for {environment} are not set correctly.")
+        return None
+    print(f"Using credentials for environment: {environment}")
+    return boto3.Session(region_name=region, **creds)
+
+
+def kube_env(aws_session):
+    """Environment for kubectl / aws CLI subprocesses bound to this session's credentials."""
+    creds = aws_session.get_credentials().get_frozen_credentials()
+    env = os.environ.copy()
+    env.pop('AWS_PROFILE', None)
+    env['AWS_ACCESS_KEY_ID'] = creds.access_key
+    env['AWS_SECRET_ACCESS_KEY'] = creds.secret_key
+    if creds.token:
+        env['AWS_SESSION_TOKEN'] = creds.token
+    else:
+        env.pop('AWS_SESSION_TOKEN', None)
+    env['AWS_REGION'] = env['AWS_DEFAULT_REGION'] = aws_session.region_name
+    return env
+
+
+# Account IDs resolved via STS, keyed by (access key, region). Module level so
+# warm Lambda invocations reuse them; a rotated key simply misses the cache.
+IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', '3600'))
+_identity_cache = {}
+_identity_lock = threading.Lock()
+
+
+def _identity_key(aws_session):
+    creds = aws_session.get_credentials().get_frozen_credentials()
+    return (creds.access_key, aws_session.region_name)
+
+
+def get_account_id(aws_session):
+    key = _identity_key(aws_session)
+    with _identity_lock:
+        cached = _identity_cache.get(key)
+        if cached and time.monotonic() - cached[1] < IDENTITY_CACHE_TTL:
+            return cached[0]
+
+    account_id = aws_session.client('sts').get_caller_identity()['Account']
+    with _identity_lock:
+        _identity_cache[key] = (account_id, time.monotonic())
+    return account_id
+
+
+def kube_context(aws_session, cluster_name):
+    """kubectl context name (cluster ARN) as written by `aws eks update-kubeconfig`."""
+    return f"arn:aws:eks:{aws_session.region_name}:{get_account_id(aws_session)}:cluster/{cluster_name}"
+
+
+def cluster_key(aws_session, cluster_name):
+    """
+    Key for per-cluster caches (eksauth tokens and kubeconfigs, pooled API
+    clients, inventories): the credential identity plus the kube context, so
+    a rotated or different key never gets a client built on the old one.
+    """
+    return _identity_key(aws_session) + (kube_context(aws_session, cluster_name),)
+
+
+def invalidate_identity(aws_session=None):
+    """Forget the cached identity for one session, or for all sessions."""
+    with _identity_lock:
+        if aws_session is None:
+            _identity_cache.clear()
+        else:
+            _identity_cache.pop(_identity_key(aws_session), None)
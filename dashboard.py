@@ -1,6 +1,8 @@
 import boto3
-import subprocess
-from flask import Flask, render_template_string, request
+from flask import Flask, Response, request, stream_with_context
+
+import inventory
+import reports
 
 app = Flask(__name__)
 
@@ -34,13 +36,19 @@ def get_clusters(aws_session):
     return clusters
 
 def get_nodes_and_pods(cluster_name, aws_session):
-    cmd = f"kubectl get nodes --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | wc -l"
-    nodes = int(subprocess.check_output(cmd, shell=True).decode('utf-8').strip())
-    
-    cmd = f"kubectl get pods --all-namespaces --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | wc -l"
-    pods = int(subprocess.check_output(cmd, shell=True).decode('utf-8').strip())
-    
-    return nodes, pods
+    # Counts come from the watch-maintained inventory, so page loads don't
+    # re-list the cluster; the first request for a cluster starts its watches.
+    # The third value is None, or the inventory's sync warning (see
+    # inventory.ClusterInventory.sync_warning) for the page to show.
+    cluster_inventory = None
+    try:
+        cluster_inventory = inventory.get_inventory(aws_session, cluster_name)
+        nodes, pods = cluster_inventory.counts()
+        return nodes, pods, cluster_inventory.sync_warning()
+    except Exception as e:
+        print(f"Error reading inventory for {cluster_name}: {e}")
+        sync = cluster_inventory.sync_warning() if cluster_inventory is not None else None
+        return 0, 0, sync or {'synced_at': None, 'error': str(e), 'stale': True}
 
 @app.route('/')
 def index():
@@ -55,7 +63,7 @@ def index():
         total_clusters += len(clusters)
 
         for cluster in clusters:
-            nodes, pods = get_nodes_and_pods(cluster, session)
+            nodes, pods, sync = get_nodes_and_pods(cluster, session)
             total_nodes += nodes
             total_pods += pods
             cluster_data.append({
@@ -63,40 +71,14 @@ def index():
                 'region': account['region'],
                 'name': cluster,
                 'nodes': nodes,
-                'pods': pods
+                'pods': pods,
+                'sync': sync
             })
 
-    html = """
-    <html>
-    <head>
-        <title>EKS Cluster Dashboard</title>
-        <style>
-            body { font-family: Arial, sans-serif; }
-            table { width: 100%; border-collapse: collapse; }
-            table, th, td { border: 1px solid black; }
-            th, td { padding: 10px; text-align: left; }
-        </style>
-    </head>
-    <body>
-        <h1>EKS Cluster Dashboard</h1>
-        <p>Total EKS Clusters: {{ total_clusters }}</p>
-        <p>Total Nodes across all clusters: {{ total_nodes }}</p>
-        <p>Total Pods across all clusters: {{ total_pods }}</p>
-
-        <form action="/cluster" method="post">
-            <label for="cluster">Select a cluster:</label>
-            <select name="cluster" id="cluster">
-                {% for cluster in cluster_data %}
-                <option value="{{ cluster.name }}|{{ cluster.account }}|{{ cluster.region }}">{{ cluster.name }} ({{ cluster.account }}, {{ cluster.region }})</option>
-                {% endfor %}
-            </select>
-            <input type="submit" value="View Details">
-        </form>
-    </body>
-    </html>
-    """
-
-    return render_template_string(html, total_clusters=total_clusters, total_nodes=total_nodes, total_pods=total_pods, cluster_data=cluster_data)
+    # Sent to the client chunk by chunk as the template renders
+    return Response(stream_with_context(reports.stream(
+        'dashboard.html', total_clusters=total_clusters, total_nodes=total_nodes, total_pods=total_pods, cluster_data=cluster_data
+    )), mimetype='text/html')
 
 @app.route('/cluster', methods=['POST'])
 def cluster_details():
@@ -106,30 +88,13 @@ def cluster_details():
     for account in accounts:
         if account['name'] == account_name and account['region'] == region_name:
             session = get_aws_session(account)
-            nodes, pods = get_nodes_and_pods(cluster_name, session)
+            nodes, pods, sync = get_nodes_and_pods(cluster_name, session)
             break
 
-    html = f"""
-    <html>
-    <head>
-        <title>EKS Cluster Details</title>
-        <style>
-            body { font-family: Arial, sans-serif; }
-            table { width: 100%; border-collapse: collapse; }
-            table, th, td { border: 1px solid black; }
-            th, td { padding: 10px; text-align: left; }
-        </style>
-    </head>
-    <body>
-        <h1>Cluster: {cluster_name} ({account_name}, {region_name})</h1>
-        <p>Number of Nodes: {nodes}</p>
-        <p>Number of Pods: {pods}</p>
-        <a href="/">Back to Dashboard</a>
-    </body>
-    </html>
-    """
-
-    return html
+    return reports.render(
+        'dashboard_cluster.html',
+        cluster_name=cluster_name, account_name=account_name, region_name=region_name, nodes=nodes, pods=pods, sync=sync
+    )
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0')
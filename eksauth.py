@@ -0,0 +1,169 @@
+"""
+In-process access to EKS clusters, replacing `aws eks update-kubeconfig`
+and the `aws eks get-token` exec plugin.
+
+describe_cluster() results (endpoint + CA) are cached per cluster, and the
+presigned STS bearer token is minted locally and cached until shortly before
+it expires. Collectors get either an in-memory kubernetes client
+Configuration, or a private per-process kubeconfig file that embeds the
+token, so kubectl never execs the AWS CLI and nothing writes ~/.kube/config.
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from botocore.signers import RequestSigner
+
+import credentials
+
+try:
+    from kubernetes import client
+except ImportError:  # only needed for in-memory client configurations
+    client = None
+
+# EKS tokens are valid for 15 minutes; refresh a minute early
+TOKEN_TTL = 14 * 60
+
+_lock = threading.Lock()
+# Keyed by credentials.cluster_key(): a token or kubeconfig minted with one
+# access key is never handed to a session using another
+_clusters = {}      # cluster key -> {'endpoint': ..., 'ca_data': ..., 'ca_file': ...}
+_tokens = {}        # cluster key -> (token, expires_at)
+_kubeconfigs = {}   # cluster key -> (path, token)
+_kubeconfig_dir = None
+
+
+def describe_cluster(aws_session, cluster_name):
+    key = credentials.cluster_key(aws_session, cluster_name)
+    ctx = key[-1]
+    with _lock:
+        cached = _clusters.get(key)
+    if cached:
+        return cached
+
+    cluster = aws_session.client('eks').describe_cluster(name=cluster_name)['cluster']
+    info = {
+        'endpoint': cluster['endpoint'],
+        'ca_data': cluster['certificateAuthority']['data'],
+        'ca_file': _write_private_file(f"{_file_name(key)}.crt", base64.b64decode(cluster['certificateAuthority']['data'])),
+    }
+    with _lock:
+        _clusters[key] = info
+    return info
+
+
+def get_token(aws_session, cluster_name):
+    key = credentials.cluster_key(aws_session, cluster_name)
+    with _lock:
+        cached = _tokens.get(key)
+    if cached and cached[1] > time.time():
+        return cached[0]
+
+    token = _mint_token(aws_session, cluster_name)
+    with _lock:
+        _tokens[key] = (token, time.time() + TOKEN_TTL)
+    return token
+
+
+def _mint_token(aws_session, cluster_name):
+    """Same token `aws eks get-token` prints: a presigned sts:GetCallerIdentity URL."""
+    region = aws_session.region_name
+    sts = aws_session.client('sts', region_name=region)
+    signer = RequestSigner(
+        sts.meta.service_model.service_id, region, 'sts', 'v4',
+        aws_session.get_credentials(), aws_session.events,
+    )
+    url = signer.generate_presigned_url(
+        {
+            'method': 'GET',
+            'url': f"https://sts.{region}.amazonaws.com/?Action=GetCallerIdentity&Version=2011-06-15",
+            'body': {},
+            'headers': {'x-k8s-aws-id': cluster_name},
+            'context': {},
+        },
+        region_name=region,
+        expires_in=60,
+        operation_name='',
+    )
+    return 'k8s-aws-v1.' + base64.urlsafe_b64encode(url.encode('utf-8')).decode('utf-8').rstrip('=')
+
+
+def client_configuration(aws_session, cluster_name):
+    """In-memory kubernetes client Configuration that re-mints its token on expiry."""
+    if client is None:
+        raise RuntimeError("client_configuration requires the 'kubernetes' package")
+    info = describe_cluster(aws_session, cluster_name)
+
+    configuration = client.Configuration()
+    configuration.host = info['endpoint']
+    configuration.ssl_ca_cert = info['ca_file']
+    configuration.api_key_prefix['authorization'] = 'Bearer'
+
+    def refresh(conf):
+        conf.api_key['authorization'] = get_token(aws_session, cluster_name)
+
+    refresh(configuration)
+    configuration.refresh_api_key_hook = refresh
+    return configuration
+
+
+def write_kubeconfig(aws_session, cluster_name):
+    """
+    Write (or reuse) a private kubeconfig for the cluster and return its path.
+    The context is named after the cluster ARN, like update-kubeconfig does,
+    and is also the current-context.
+    """
+    key = credentials.cluster_key(aws_session, cluster_name)
+    ctx = key[-1]
+    info = describe_cluster(aws_session, cluster_name)
+    token = get_token(aws_session, cluster_name)
+    with _lock:
+        cached = _kubeconfigs.get(key)
+    if cached and cached[1] == token:
+        return cached[0]
+
+    kubeconfig = {
+        'apiVersion': 'v1',
+        'kind': 'Config',
+        'clusters': [{'name': ctx, 'cluster': {'server': info['endpoint'], 'certificate-authority-data': info['ca_data']}}],
+        'users': [{'name': ctx, 'user': {'token': token}}],
+        'contexts': [{'name': ctx, 'context': {'cluster': ctx, 'user': ctx}}],
+        'current-context': ctx,
+    }
+    # kubectl reads JSON kubeconfigs as well as YAML
+    path = _write_private_file(f"{_file_name(key)}.kubeconfig", json.dumps(kubeconfig).encode('utf-8'))
+    with _lock:
+        _kubeconfigs[key] = (path, token)
+    return path
+
+
+def kubectl_env(aws_session, cluster_name):
+    """credentials.kube_env() pointed at the cluster's private kubeconfig."""
+    env = credentials.kube_env(aws_session)
+    env['KUBECONFIG'] = write_kubeconfig(aws_session, cluster_name)
+    return env
+
+
+def _file_name(key):
+    # One file per access key as well as per context, so two identities never overwrite each other's
+    ctx = key[-1]
+    identity = hashlib.blake2b(repr(key[:-1]).encode('utf-8'), digest_size=4).hexdigest()
+    return f"{ctx.replace(':', '_').replace('/', '_')}-{identity}"
+
+
+def _write_private_file(name, data):
+    global _kubeconfig_dir
+    with _lock:
+        if _kubeconfig_dir is None:
+            _kubeconfig_dir = tempfile.mkdtemp(prefix='eksauth-')
+    # Write then rename so a concurrent kubectl never reads a half-written file
+    path = os.path.join(_kubeconfig_dir, name)
+    fd, tmp_path = tempfile.mkstemp(dir=_kubeconfig_dir)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
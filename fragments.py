@@ -0,0 +1,74 @@
+"""
+Size-bounded LRU cache of rendered HTML fragments.
+
+A multi-cluster report is mostly per-cluster sections, and between two
+renders usually only a few clusters changed. Each section is cached under a
+key built from a hash of exactly the data the section renders (e.g.
+Replica._section_hash), the section template's version and any other
+render options, so an unchanged cluster is pasted back in as is and only
+the dirty ones are rendered again. Anything a section shows that differs
+per request (the selected environment, say) belongs in the page around it,
+not in the section.
+
+The cache holds at most FRAGMENT_CACHE_BYTES characters of HTML; the least
+recently used fragments are evicted first, and a fragment larger than the
+whole budget is not cached. FRAGMENT_CACHE_BYTES=0 disables it. Cached
+fragments stay in memory for the life of the process, so the bound is what
+a process holds on top of its current render; raise it for dashboards
+whose clusters outnumber it.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+# About four sections of a 5000-pod cluster with the full pod table
+FRAGMENT_CACHE_BYTES = int(os.getenv('FRAGMENT_CACHE_BYTES', str(16 * 1024 * 1024)))
+
+
+class FragmentCache:
+    def __init__(self, max_bytes=FRAGMENT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> fragment, least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+    def put(self, key, fragment):
+        if len(fragment) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = fragment
+            self.size += len(fragment)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get_or_render(self, key, render):
+        """The cached fragment for key, or render() it and cache the result."""
+        fragment = self.get(key)
+        if fragment is None:
+            fragment = render()
+            self.put(key, fragment)
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
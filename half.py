@@ -5,6 +5,11 @@ import subprocess
 from jinja2 import Template
 from datetime import datetime
 
+import credentials
+import kubequantity
+import kubetop
+import nsgroups
+
 # Define the different AWS accounts/clusters
 accounts = [
     {'name': 'dev', 'region': 'us-east-1'},
@@ -42,7 +47,8 @@ def get_clusters(aws_session):
 
 def get_nodes_and_metrics(cluster_name, aws_session):
     nodes = []
-    cmd = f"kubectl get nodes --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} -o jsonpath='{{range .items[*]}}{{.metadata.name}}|{{.status.capacity.cpu}}|{{.status.capacity.memory}} {{end}}'"
+    ctx = credentials.kube_context(aws_session, cluster_name)
+    cmd = f"kubectl get nodes --context={ctx} -o jsonpath='{{range .items[*]}}{{.metadata.name}}|{{.status.capacity.cpu}}|{{.status.capacity.memory}} {{end}}'"
 
     try:
         node_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
@@ -50,6 +56,8 @@ def get_nodes_and_metrics(cluster_name, aws_session):
         print(f"Error executing kubectl command: {e}")
         return nodes
 
+    node_usage = kubetop.get_node_usage(ctx)
+
     for node in node_info:
         node_details = node.split('|')
         if len(node_details) != 3:
@@ -58,31 +66,16 @@ def get_nodes_and_metrics(cluster_name, aws_session):
 
         node_name, cpu_capacity, memory_capacity = node_details
         try:
-            memory_capacity_gb = int(memory_capacity[:-2]) / 1024  # Convert MiB to GB
+            memory_capacity_gb = kubequantity.to_gib(memory_capacity)
         except ValueError:
             memory_capacity_gb = 0
 
         # Get CPU utilization
-        cpu_cmd = f"kubectl top node {node_name} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $2}}'"
-        try:
-            cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
-            if cpu_utilization_raw.endswith('m'):
-                cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000  # Convert millicores to cores
-            else:
-                cpu_utilization = float(cpu_utilization_raw) if cpu_utilization_raw.replace('.', '', 1).isdigit() else 0
-        except subprocess.CalledProcessError:
-            cpu_utilization = 0
+        cpu_utilization_raw, memory_utilization = node_usage.get(node_name, ('', ''))
+        cpu_utilization = kubequantity.to_float(cpu_utilization_raw)
 
         # Get Memory utilization
-        memory_cmd = f"kubectl top node {node_name} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $4}}'"
-        try:
-            memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
-            if memory_utilization.endswith('Mi'):
-                memory_utilization_gb = int(memory_utilization[:-2]) / 1024  # Convert MiB to GB
-            else:
-                memory_utilization_gb = float(memory_utilization[:-2]) / 1024 if memory_utilization[:-2].isdigit() else 0
-        except subprocess.CalledProcessError:
-            memory_utilization_gb = 0
+        memory_utilization_gb = kubequantity.to_gib(memory_utilization)
 
         memory_utilization_percentage = (memory_utilization_gb / memory_capacity_gb) * 100 if memory_capacity_gb > 0 else 0
 
@@ -100,7 +93,7 @@ def get_nodes_and_metrics(cluster_name, aws_session):
 def get_pods_and_metrics(cluster_name, aws_session, environment):
     pods = []
     namespace_counts = {}
-    cmd = f"kubectl get pods --all-namespaces --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
+    cmd = f"kubectl get pods --all-namespaces --context={credentials.kube_context(aws_session, cluster_name)} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
 
     try:
         pod_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
@@ -121,24 +114,18 @@ def get_pods_and_metrics(cluster_name, aws_session, environment):
             namespace_counts[namespace] += 1
 
             # Get CPU utilization for the pod
-            cpu_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $2}}'"
+            cpu_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context={credentials.kube_context(aws_session, cluster_name)} --no-headers | awk '{{print $2}}'"
             try:
                 cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
-                if cpu_utilization_raw.endswith('m'):
-                    cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000  # Convert millicores to cores
-                else:
-                    cpu_utilization = float(cpu_utilization_raw) if cpu_utilization_raw.replace('.', '', 1).isdigit() else 0
+                cpu_utilization = kubequantity.to_float(cpu_utilization_raw)
             except subprocess.CalledProcessError:
                 cpu_utilization = 0
 
             # Get memory utilization for the pod
-            memory_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $3}}'"
+            memory_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context={credentials.kube_context(aws_session, cluster_name)} --no-headers | awk '{{print $3}}'"
             try:
                 memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
-                if memory_utilization.endswith('Mi'):
-                    memory_utilization_gb = int(memory_utilization[:-2]) / 1024  # Convert MiB to GB
-                else:
-                    memory_utilization_gb = float(memory_utilization[:-2]) / 1024 if memory_utilization[:-2].isdigit() else 0
+                memory_utilization_gb = kubequantity.to_gib(memory_utilization)
             except subprocess.CalledProcessError:
                 memory_utilization_gb = 0
 
@@ -161,71 +148,18 @@ def get_namespace_group(namespace, environment):
     """
     Determine the namespace group based on the suffix and environment.
     """
-    suffixes = {
-        'dev': ['dev', 'devb', 'devc'],
-        'intg': ['intgb', 'intgc'],
-        'prod': ['proda', 'prodp'],
-        'accp': ['accp', 'accpb', 'accpc'],
-        'idev': []  # No suffix
-    }
-    env_suffixes = suffixes.get(environment, [])
-    for suffix in env_suffixes:
-        if namespace.endswith(suffix):
-            return suffix
-    if environment == 'idev':
-        return 'idev'  # Single group for idev
-    return 'other'  # Fallback group
+    return _classifier(environment).classify(namespace)
 
 def group_namespaces_by_suffix(namespaces, env):
     """
     Group namespaces by common suffix based on the environment.
-    Handles different suffixes for intg, prod, accp, and dev environments.
+    Suffixes per environment come from nsgroups.SUFFIXES_MAP.
     """
-    grouped_namespaces = {
-        'dev': [], 'devb': [], 'devc': [], 'intgb': [], 'intgc': [],
-        'proda': [], 'prodp': [], 'accp': [], 'accpb': [], 'accpc': [],
-        'idev': [], 'other': []
-    }
-
-    for ns in namespaces:
-        if env == 'dev':
-            if ns.endswith('dev'):
-                grouped_namespaces['dev'].append(ns)
-            elif ns.endswith('devb'):
-                grouped_namespaces['devb'].append(ns)
-            elif ns.endswith('devc'):
-                grouped_namespaces['devc'].append(ns)
-            else:
-                grouped_namespaces['other'].append(ns)
-        elif env == 'intg':
-            if ns.endswith('intgb'):
-                grouped_namespaces['intgb'].append(ns)
-            elif ns.endswith('intgc'):
-                grouped_namespaces['intgc'].append(ns)
-            else:
-                grouped_namespaces['other'].append(ns)
-        elif env == 'prod':
-            if ns.endswith('proda'):
-                grouped_namespaces['proda'].append(ns)
-            elif ns.endswith('prodp'):
-                grouped_namespaces['prodp'].append(ns)
-            else:
-                grouped_namespaces['other'].append(ns)
-        elif env == 'accp':
-            if ns.endswith('accp'):
-                grouped_namespaces['accp'].append(ns)
-            elif ns.endswith('accpb'):
-                grouped_namespaces['accpb'].append(ns)
-            elif ns.endswith('accpc'):
-                grouped_namespaces['accpc'].append(ns)
-            else:
-                grouped_namespaces['other'].append(ns)
-        elif env == 'idev':
-            grouped_namespaces['idev'].append(ns)  # idev has no suffix, treat it separately
-        else:
-            grouped_namespaces['other'].append(ns)
-
-    return grouped_namespaces
+    return _classifier(env).group(namespaces)
+
+def _classifier(environment):
+    # idev has no suffix, so all of its namespaces form the 'idev' group
+    return nsgroups.get_classifier(environment, default='idev' if environment == 'idev' else 'other')
 
 # Modify the generate_html_report function to handle different environments and suffixes
 def generate_html_report(clusters_info, current_env):
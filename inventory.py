@@ -0,0 +1,357 @@
+"""
+Live, watch-driven inventory of a cluster's nodes, pods and deployments.
+
+A ClusterInventory does one paged list per resource kind and then follows a
+watch stream from the list's resourceVersion (with bookmarks, so reconnects
+resume where they left off instead of re-listing). Events are applied to an
+in-memory model indexed by pod key, node and namespace, so the collectors
+read the current state of even a large cluster without touching the API
+server. Only usage still comes from metrics.k8s.io on each read, as metrics
+cannot be watched.
+
+Each kind records when it last heard from the API server (a list, a watch
+event or a watch that ended cleanly) and the last error since. While the
+watch keeps failing the model silently ages, so once a failing kind has not
+synced for STALE_AFTER seconds its reads raise instead of serving old data;
+sync_warning() lets a report flag the cluster before that.
+
+A ClusterInventory is an ApiBackend, so it drops into get_nodes_and_metrics
+and friends unchanged (KUBE_BACKEND=inventory). It is meant for long-running
+processes such as dashboard.py or a warm Lambda container; the first read
+blocks until the initial list has completed, and raises at once if it failed.
+"""
+import json
+import os
+import threading
+import time
+
+import credentials
+import eksauth
+import kubebackend
+import kubetop
+import podstream
+
+# Server-side watch timeout; the stream is resumed from the last
+# resourceVersion when it ends, so this only bounds how long a dead
+# connection can go unnoticed.
+WATCH_TIMEOUT = int(os.getenv('INVENTORY_WATCH_TIMEOUT', '300'))
+SYNC_TIMEOUT = int(os.getenv('INVENTORY_SYNC_TIMEOUT', '120'))
+STALE_AFTER = int(os.getenv('INVENTORY_STALE_AFTER', str(SYNC_TIMEOUT)))
+RETRY_DELAY = 5
+
+
+class _Expired(Exception):
+    """The watch resourceVersion is too old (410 Gone); re-list."""
+
+
+def _node_entry(item):
+    capacity = item.get('status', {}).get('capacity', {})
+    name = item['metadata']['name']
+    return name, (name, capacity.get('cpu', ''), capacity.get('memory', ''))
+
+
+def _pod_entry(item):
+    record = podstream.to_record(item)
+    return (record.namespace, record.name), record
+
+
+def _deployment_entry(item):
+    metadata = item['metadata']
+    return (metadata['namespace'], metadata['name']), (
+        metadata['namespace'],
+        metadata['name'],
+        item.get('spec', {}).get('replicas') or 0,
+        item.get('status', {}).get('readyReplicas') or 0,
+    )
+
+
+class ClusterInventory(kubebackend.ApiBackend):
+    # kind -> (API method attribute path, entry builder)
+    KINDS = {
+        'nodes': (('core', 'list_node'), _node_entry),
+        'pods': (('core', 'list_pod_for_all_namespaces'), _pod_entry),
+        'deployments': (('apps', 'list_deployment_for_all_namespaces'), _deployment_entry),
+    }
+
+    def __init__(self, api_client, name=''):
+        super().__init__(api_client)
+        self.name = name
+        # Bumped on every applied change, so readers can tell if anything moved
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._threads = []
+        self._synced = {kind: threading.Event() for kind in self.KINDS}
+        self._errors = {}  # kind -> last exception since the last successful sync
+        self._synced_at = dict.fromkeys(self.KINDS)  # kind -> time.time() of the last successful sync
+        self._store = {kind: {} for kind in self.KINDS}
+        self._pods_by_node = {}
+        self._pods_by_namespace = {}
+
+    def start(self):
+        for kind in self.KINDS:
+            thread = threading.Thread(target=self._follow, args=(kind,), name=f"inventory-{kind}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def wait_ready(self, timeout=SYNC_TIMEOUT):
+        """Block until every kind's initial list has completed or failed; return False on timeout."""
+        return all(event.wait(timeout) for event in self._synced.values())
+
+    def status(self):
+        """{kind: {'synced_at': time of the last successful sync or None, 'error': last error since or None, 'stale': bool}}"""
+        now = time.time()
+        status = {}
+        for kind in self.KINDS:
+            error = self._errors.get(kind)
+            synced_at = self._synced_at[kind]
+            status[kind] = {
+                'synced_at': synced_at,
+                'error': str(error) if error is not None else None,
+                'stale': error is not None and (synced_at is None or now - synced_at > STALE_AFTER),
+            }
+        return status
+
+    def sync_warning(self):
+        """
+        None while every kind is in sync. Otherwise {'synced_at', 'error',
+        'stale'} for the failing kinds: the oldest last-sync time, their
+        errors, and whether reads of any of them already fail.
+        """
+        failing = {kind: s for kind, s in self.status().items() if s['error'] is not None}
+        if not failing:
+            return None
+        synced = [s['synced_at'] for s in failing.values()]
+        return {
+            'synced_at': None if None in synced else min(synced),
+            'error': '; '.join(f"{kind}: {s['error']}" for kind, s in failing.items()),
+            'stale': any(s['stale'] for s in failing.values()),
+        }
+
+    # Backend interface
+
+    def list_nodes(self):
+        return list(self._values('nodes'))
+
+    def list_pods(self):
+        return [(pod.namespace, pod.name, pod.node_name, pod.phase) for pod in self._values('pods')]
+
+    def list_deployments(self):
+        return list(self._values('deployments'))
+
+    # Indexed reads
+
+    def pod_records(self):
+        return list(self._values('pods'))
+
+    def pods_on_node(self, node_name):
+        self._wait('pods')
+        with self._lock:
+            return [self._store['pods'][key] for key in self._pods_by_node.get(node_name, ())]
+
+    def pods_in_namespace(self, namespace):
+        self._wait('pods')
+        with self._lock:
+            return [self._store['pods'][key] for key in self._pods_by_namespace.get(namespace, ())]
+
+    def namespace_counts(self):
+        self._wait('pods')
+        with self._lock:
+            return {ns: len(keys) for ns, keys in self._pods_by_namespace.items()}
+
+    def counts(self):
+        """(nodes, pods) without copying the model."""
+        self._wait('nodes')
+        self._wait('pods')
+        with self._lock:
+            return len(self._store['nodes']), len(self._store['pods'])
+
+    def _wait(self, kind):
+        if not self._synced[kind].wait(SYNC_TIMEOUT):
+            raise RuntimeError(f"{kind} inventory for {self.name} has not synced yet")
+        error = self._errors.get(kind)
+        if error is None:
+            return
+        synced_at = self._synced_at[kind]
+        if synced_at is None:
+            raise RuntimeError(f"{kind} inventory for {self.name} could not be listed: {error}") from error
+        if time.time() - synced_at > STALE_AFTER:
+            raise RuntimeError(
+                f"{kind} inventory for {self.name} is stale, last synced {time.time() - synced_at:.0f}s ago: {error}"
+            ) from error
+
+    def _values(self, kind):
+        self._wait(kind)
+        with self._lock:
+            return list(self._store[kind].values())
+
+    # Watch loop
+
+    def _api_method(self, kind):
+        (api, method), _ = self.KINDS[kind]
+        return getattr(getattr(self, api), method)
+
+    def _follow(self, kind):
+        resource_version = None
+        while not self._stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self._relist(kind)
+                    self._mark_synced(kind)
+                    self._synced[kind].set()
+                resource_version = self._watch(kind, resource_version)
+                self._mark_synced(kind)
+            except _Expired:
+                resource_version = None
+            except Exception as e:
+                if getattr(e, 'status', None) == 410:
+                    resource_version = None
+                    continue
+                print(f"Error watching {kind} for {self.name}: {e}")
+                # Kept until the next successful sync. If the initial list failed (RBAC,
+                # expired token, unreachable API), reads fail now rather than after
+                # SYNC_TIMEOUT; after that, once the data is older than STALE_AFTER.
+                self._errors[kind] = e
+                self._synced[kind].set()
+                self._stopped.wait(RETRY_DELAY)
+
+    def _mark_synced(self, kind):
+        self._synced_at[kind] = time.time()
+        self._errors.pop(kind, None)
+
+    def _relist(self, kind):
+        fn = self._api_method(kind)
+        _, make_entry = self.KINDS[kind]
+        entries = {}
+        token = None
+        while True:
+            kwargs = {'limit': kubebackend.PAGE_SIZE}
+            if token:
+                kwargs['_continue'] = token
+            body = self._get(fn, **kwargs)
+            for item in body.get('items', []):
+                key, value = make_entry(item)
+                entries[key] = value
+            metadata = body.get('metadata', {})
+            token = metadata.get('continue')
+            if not token:
+                break
+
+        with self._lock:
+            self._store[kind] = entries
+            if kind == 'pods':
+                self._pods_by_node = {}
+                self._pods_by_namespace = {}
+                for key, pod in entries.items():
+                    self._index_pod(key, pod)
+            self.generation += 1
+        return metadata.get('resourceVersion')
+
+    def _watch(self, kind, resource_version):
+        fn = self._api_method(kind)
+        kubetop.count_call()
+        resp = fn(
+            watch=True,
+            resource_version=resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=WATCH_TIMEOUT,
+            _request_timeout=WATCH_TIMEOUT + 30,
+            _preload_content=False,
+        )
+        try:
+            for line in _iter_lines(resp):
+                event = json.loads(line)
+                obj = event.get('object', {})
+                if event.get('type') == 'ERROR':
+                    if obj.get('code') == 410:
+                        raise _Expired()
+                    raise RuntimeError(obj.get('message', 'watch error'))
+                resource_version = obj['metadata']['resourceVersion']
+                if event['type'] != 'BOOKMARK':
+                    self._apply(kind, event['type'], obj)
+                self._mark_synced(kind)
+                if self._stopped.is_set():
+                    break
+        finally:
+            resp.release_conn()
+        return resource_version
+
+    def _apply(self, kind, event_type, obj):
+        _, make_entry = self.KINDS[kind]
+        key, value = make_entry(obj)
+        with self._lock:
+            store = self._store[kind]
+            old = store.pop(key, None)
+            if kind == 'pods' and old is not None:
+                self._unindex_pod(key, old)
+            if event_type != 'DELETED':
+                store[key] = value
+                if kind == 'pods':
+                    self._index_pod(key, value)
+            self.generation += 1
+
+    def _index_pod(self, key, pod):
+        if pod.node_name:
+            self._pods_by_node.setdefault(pod.node_name, set()).add(key)
+        self._pods_by_namespace.setdefault(pod.namespace, set()).add(key)
+
+    def _unindex_pod(self, key, pod):
+        for index, field in ((self._pods_by_node, pod.node_name), (self._pods_by_namespace, pod.namespace)):
+            keys = index.get(field)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[field]
+
+
+def _iter_lines(resp):
+    """Yield complete lines from a streamed watch response."""
+    buf = b''
+    for chunk in resp.stream(amt=None, decode_content=False):
+        buf += chunk
+        *lines, buf = buf.split(b'\n')
+        for line in lines:
+            if line.strip():
+                yield line
+    if buf.strip():
+        yield buf
+
+
+# One running inventory per cluster context, shared by every caller in the
+# process, with the credentials.cluster_key() it was started with
+_inventories = {}
+_inventories_lock = threading.Lock()
+
+
+def get_inventory(aws_session, cluster_name):
+    """
+    Return the running inventory for an EKS cluster, starting it on first
+    use. If the session's credentials changed since (a rotated key), the old
+    inventory, whose token hook holds the old session, is stopped and
+    replaced.
+    """
+    key = credentials.cluster_key(aws_session, cluster_name)
+    ctx = key[-1]
+    with _inventories_lock:
+        started_with, inventory = _inventories.get(ctx, (None, None))
+        if inventory is not None and started_with != key:
+            inventory.stop()
+            inventory = None
+        if inventory is None:
+            configuration = eksauth.client_configuration(aws_session, cluster_name)
+            # Each watch holds a connection open; leave room for list/metrics calls
+            configuration.connection_pool_maxsize = len(ClusterInventory.KINDS) + 2
+            inventory = ClusterInventory(kubebackend.client.ApiClient(configuration), name=ctx).start()
+            _inventories[ctx] = (key, inventory)
+        return inventory
+
+
+def stop_all():
+    with _inventories_lock:
+        for _, inventory in _inventories.values():
+            inventory.stop()
+        _inventories.clear()
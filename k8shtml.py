@@ -1,7 +1,9 @@
 import boto3
-from jinja2 import Template
 import os
 
+import credentials
+import reports
+
 # Define AWS credentials and regions for different accounts
 accounts = [
     {
@@ -32,63 +34,20 @@ def get_clusters(aws_session):
     return clusters
 
 def get_nodes_and_pods(cluster_name, aws_session):
-    cmd = f"kubectl get nodes --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | wc -l"
+    cmd = f"kubectl get nodes --context={credentials.kube_context(aws_session, cluster_name)} --no-headers | wc -l"
     nodes = int(os.popen(cmd).read().strip())
     
-    cmd = f"kubectl get pods --all-namespaces --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | wc -l"
+    cmd = f"kubectl get pods --all-namespaces --context={credentials.kube_context(aws_session, cluster_name)} --no-headers | wc -l"
     pods = int(os.popen(cmd).read().strip())
     
     return nodes, pods
 
 def generate_html_report(clusters_info):
-    template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>EKS Cluster Report</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 20px; }
-            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
-            th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-            th { background-color: #f2f2f2; }
-            h2 { margin-top: 50px; }
-            .download-link { margin-top: 20px; }
-        </style>
-    </head>
-    <body>
-        <h1>EKS Cluster Report</h1>
-        <p>Total Clusters: {{ total_clusters }}</p>
-        <p>Total Nodes: {{ total_nodes }}</p>
-        <p>Total Pods: {{ total_pods }}</p>
-
-        {% for cluster in clusters %}
-        <h2>{{ cluster.name }} ({{ cluster.account }} - {{ cluster.region }})</h2>
-        <table>
-            <tr>
-                <th>Metric</th>
-                <th>Count</th>
-            </tr>
-            <tr>
-                <td>Nodes</td>
-                <td>{{ cluster.nodes }}</td>
-            </tr>
-            <tr>
-                <td>Pods</td>
-                <td>{{ cluster.pods }}</td>
-            </tr>
-        </table>
-        {% endfor %}
-        <a href="eks_report.html" download="eks_report.html" class="download-link">Download Report</a>
-    </body>
-    </html>
-    """
     total_clusters = len(clusters_info)
     total_nodes = sum(cluster['nodes'] for cluster in clusters_info)
     total_pods = sum(cluster['pods'] for cluster in clusters_info)
     
-    html_template = Template(template)
+    html_template = reports.env.get_template('k8shtml.html')
     html_content = html_template.render(
         total_clusters=total_clusters,
         total_nodes=total_nodes,
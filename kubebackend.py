@@ -0,0 +1,230 @@
+"""
+Collector backends for the EKS dashboards.
+
+get_nodes_and_metrics / get_pods_and_metrics / get_deploy_replica_data only
+need five things from a cluster, so they talk to one of the backends below
+instead of building kubectl command strings themselves:
+
+    list_nodes()        -> [(name, cpu_capacity, memory_capacity), ...]
+    node_usage()        -> {name: (cpu, memory)}
+    list_pods()         -> [(namespace, name, node_name, phase), ...]
+    pod_usage()         -> {(namespace, name): (cpu, memory)}
+    list_deployments()  -> [(namespace, name, desired, ready), ...]
+
+plus pod_records(), an iterable of podstream.PodRecord (labels and owner
+references included) for analyses such as colocation.
+
+Usage values are in `kubectl top` form ("250m", "512Mi") for both backends.
+
+KubectlBackend keeps the original behaviour (fork kubectl per call).
+ApiBackend uses the kubernetes Python client against the API server and the
+metrics.k8s.io API, with one pooled keep-alive ApiClient per cluster context.
+inventory.ClusterInventory is an ApiBackend whose listings come from a
+watch-maintained in-memory model instead of a fresh list per call.
+"""
+import json
+import os
+import threading
+
+import credentials
+import eksauth
+import kubequantity
+import kubetop
+import podstream
+
+try:
+    from kubernetes import client, config
+except ImportError:  # only needed for KUBE_BACKEND=api
+    client = config = None
+
+PAGE_SIZE = 500
+
+
+class KubectlBackend:
+    def __init__(self, ctx, env=None):
+        self.ctx = ctx
+        self.env = env
+
+    def _jsonpath(self, resource, jsonpath):
+        cmd = ["kubectl", "get", *resource, f"--context={self.ctx}", "-o", f"jsonpath={jsonpath}"]
+        output = kubetop.check_output(cmd, env=self.env).decode('utf-8')
+        return [row.split('|') for row in output.strip().split()]
+
+    def list_nodes(self):
+        rows = self._jsonpath(
+            ["nodes"],
+            "{range .items[*]}{.metadata.name}|{.status.capacity.cpu}|{.status.capacity.memory} {end}",
+        )
+        return [tuple(r) for r in rows if len(r) == 3]
+
+    def node_usage(self):
+        return kubetop.get_node_usage(self.ctx, env=self.env)
+
+    def list_pods(self):
+        rows = self._jsonpath(
+            ["pods", "--all-namespaces"],
+            "{range .items[*]}{.metadata.namespace}|{.metadata.name}|{.spec.nodeName}|{.status.phase} {end}",
+        )
+        return [tuple(r) for r in rows if len(r) == 4]
+
+    def pod_usage(self):
+        return kubetop.get_pod_usage(self.ctx, env=self.env)
+
+    def pod_records(self):
+        return podstream.stream_pods(self.ctx, env=self.env)
+
+    def list_deployments(self):
+        rows = self._jsonpath(
+            ["deploy", "-A"],
+            "{range .items[*]}{.metadata.namespace}|{.metadata.name}|{.spec.replicas}|{.status.readyReplicas} {end}",
+        )
+        return [(ns, name, _to_int(desired), _to_int(ready))
+                for ns, name, desired, ready in (r for r in rows if len(r) == 4)]
+
+
+class ApiBackend:
+    def __init__(self, api_client):
+        if client is None:
+            raise RuntimeError("ApiBackend requires the 'kubernetes' package")
+        self.api_client = api_client
+        self.core = client.CoreV1Api(api_client)
+        self.apps = client.AppsV1Api(api_client)
+        self.custom = client.CustomObjectsApi(api_client)
+
+    @classmethod
+    def for_context(cls, ctx):
+        return cls(get_api_client(ctx))
+
+    def _get(self, fn, *args, **kwargs):
+        # Skip model deserialisation; raw JSON is several times faster for
+        # thousands of pods and we only read a handful of fields.
+        kubetop.count_call()
+        return json.loads(fn(*args, _preload_content=False, **kwargs).data)
+
+    def _list_all(self, fn):
+        token = None
+        while True:
+            kwargs = {'limit': PAGE_SIZE}
+            if token:
+                kwargs['_continue'] = token
+            body = self._get(fn, **kwargs)
+            yield from body.get('items', [])
+            token = body.get('metadata', {}).get('continue')
+            if not token:
+                return
+
+    def list_nodes(self):
+        return [
+            (item['metadata']['name'],
+             item['status']['capacity'].get('cpu', ''),
+             item['status']['capacity'].get('memory', ''))
+            for item in self._list_all(self.core.list_node)
+        ]
+
+    def _metrics(self, resource):
+        try:
+            return self._get(self.custom.list_cluster_custom_object, 'metrics.k8s.io', 'v1beta1', resource)
+        except Exception as e:
+            # Same as kubetop: no metrics-server means no usage, not a failed run
+            print(f"Error fetching {resource} metrics: {e}")
+            return {}
+
+    def node_usage(self):
+        body = self._metrics('nodes')
+        return {
+            item['metadata']['name']: (
+                _millicores(kubequantity.to_float(item['usage']['cpu'])),
+                _mebibytes(kubequantity.to_float(item['usage']['memory'])),
+            )
+            for item in body.get('items', [])
+        }
+
+    def list_pods(self):
+        return [
+            (item['metadata']['namespace'],
+             item['metadata']['name'],
+             item.get('spec', {}).get('nodeName', ''),
+             item.get('status', {}).get('phase', ''))
+            for item in self._list_all(self.core.list_pod_for_all_namespaces)
+        ]
+
+    def pod_records(self):
+        return (podstream.to_record(item) for item in self._list_all(self.core.list_pod_for_all_namespaces))
+
+    def pod_usage(self):
+        body = self._metrics('pods')
+        usage = {}
+        for item in body.get('items', []):
+            containers = item.get('containers', [])
+            cpu = sum(kubequantity.to_float(c['usage']['cpu']) for c in containers)
+            memory = sum(kubequantity.to_float(c['usage']['memory']) for c in containers)
+            usage[(item['metadata']['namespace'], item['metadata']['name'])] = (_millicores(cpu), _mebibytes(memory))
+        return usage
+
+    def list_deployments(self):
+        return [
+            (item['metadata']['namespace'],
+             item['metadata']['name'],
+             item.get('spec', {}).get('replicas') or 0,
+             item.get('status', {}).get('readyReplicas') or 0)
+            for item in self._list_all(self.apps.list_deployment_for_all_namespaces)
+        ]
+
+
+# One ApiClient (and so one urllib3 keep-alive pool) per cluster context, or
+# per credentials.cluster_key() for EKS clusters so a client whose token hook
+# holds one session is never reused for another; reused across calls and
+# across warm Lambda invocations.
+_api_clients = {}
+_api_clients_lock = threading.Lock()
+
+
+def get_api_client(ctx, make_configuration=None, key=None):
+    """
+    Return the pooled ApiClient for ctx (or for key, when given).
+    make_configuration builds its Configuration on first use; by default it
+    is loaded from kubeconfig.
+    """
+    key = ctx if key is None else key
+    with _api_clients_lock:
+        api_client = _api_clients.get(key)
+        if api_client is None:
+            if make_configuration is not None:
+                configuration = make_configuration()
+            else:
+                configuration = client.Configuration()
+                config.load_kube_config(context=ctx, client_configuration=configuration)
+            configuration.connection_pool_maxsize = 4
+            api_client = client.ApiClient(configuration)
+            _api_clients[key] = api_client
+        return api_client
+
+
+def get_backend(aws_session, cluster_name):
+    """
+    Pick the collector backend for an EKS cluster from KUBE_BACKEND
+    ('kubectl', 'api' or 'inventory'). All authenticate with an in-process
+    EKS token (see eksauth), so none forks the AWS CLI.
+    """
+    key = credentials.cluster_key(aws_session, cluster_name)
+    ctx = key[-1]
+    backend = os.getenv('KUBE_BACKEND', 'kubectl')
+    if backend == 'inventory':
+        import inventory  # imports this module
+        return inventory.get_inventory(aws_session, cluster_name)
+    if backend == 'api':
+        return ApiBackend(get_api_client(ctx, lambda: eksauth.client_configuration(aws_session, cluster_name), key))
+    return KubectlBackend(ctx, env=eksauth.kubectl_env(aws_session, cluster_name))
+
+
+def _to_int(value):
+    return int(value) if value and value.isdigit() else 0
+
+
+# Usage is returned in `kubectl top` form so both backends look the same
+def _millicores(cores):
+    return f"{int(cores * 1000)}m"
+
+
+def _mebibytes(memory_bytes):
+    return f"{int(memory_bytes / 2 ** 20)}Mi"
@@ -0,0 +1,68 @@
+"""
+Kubernetes resource quantity parsing ("250m", "1.5", "128974848", "129e6",
+"123Mi", "16Gi", "500u", "3920604Ki", ...).
+
+parse_quantity() turns a quantity into a plain float in base units: cores
+for CPU, bytes for memory. It understands every suffix the API server and
+metrics-server emit: binary Ki Mi Gi Ti Pi Ei, decimal n u m k M G T P E,
+and decimal exponents (e3, E-2), with optional sign and fraction. Clusters
+report the same few capacities and usages over and over, so results are
+memoized; parse_column() converts a whole column of strings in one call.
+That call is a loop, not a vectorized operation: each distinct string is
+parsed once per column and repeats are a dict lookup.
+"""
+import re
+from array import array
+from functools import lru_cache
+
+_BINARY = {'Ki': 2 ** 10, 'Mi': 2 ** 20, 'Gi': 2 ** 30, 'Ti': 2 ** 40, 'Pi': 2 ** 50, 'Ei': 2 ** 60}
+# Decimal suffixes as powers of ten
+_DECIMAL = {'n': -9, 'u': -6, 'm': -3, '': 0, 'k': 3, 'M': 6, 'G': 9, 'T': 12, 'P': 15, 'E': 18}
+
+# The exponent alternative comes first so "1E3" is 1000 while "1E" is one exa
+_QUANTITY = re.compile(
+    r'([+-]?(?:\d+(?:\.\d*)?|\.\d+))'
+    r'(?:[eE]([+-]?\d+)|(Ki|Mi|Gi|Ti|Pi|Ei|n|u|m|k|M|G|T|P|E)?)'
+)
+
+
+@lru_cache(maxsize=8192)
+def parse_quantity(quantity):
+    """Quantity string -> float in base units. Raises ValueError if malformed."""
+    match = _QUANTITY.fullmatch(quantity.strip())
+    if match is None:
+        raise ValueError(f"invalid quantity: {quantity!r}")
+    number, exponent, suffix = match.groups()
+    if suffix in _BINARY:
+        return float(number) * _BINARY[suffix]
+    power = int(exponent) if exponent is not None else _DECIMAL[suffix or '']
+    # Divide for negative powers so "100n" is exactly 1e-07
+    return float(number) * 10 ** power if power >= 0 else float(number) / 10 ** -power
+
+
+def to_float(quantity, default=0.0):
+    """parse_quantity() that returns `default` for empty or malformed values."""
+    if not quantity:
+        return default
+    try:
+        return parse_quantity(quantity)
+    except ValueError:
+        return default
+
+
+def to_gib(quantity, default=0.0):
+    """Memory quantity in GiB (what the dashboards label "GB")."""
+    return to_float(quantity, default) / 2 ** 30
+
+
+def parse_column(quantities, default=0.0):
+    """array('d') of base-unit values for a sequence of quantity strings."""
+    seen = {}
+    values = array('d')
+    append = values.append
+    for quantity in quantities:
+        value = seen.get(quantity)
+        if value is None:
+            value = seen[quantity] = to_float(quantity, default)
+        append(value)
+    return values
@@ -0,0 +1,86 @@
+import subprocess
+import threading
+
+# Every kubectl invocation made by the collectors goes through check_output()
+# below (API requests call count_call() directly) so a run can report how many
+# external calls it made.
+_call_count = 0
+_call_lock = threading.Lock()
+
+
+def count_call():
+    global _call_count
+    with _call_lock:
+        _call_count += 1
+
+
+def check_output(cmd, **kwargs):
+    """subprocess.check_output wrapper that counts external calls."""
+    count_call()
+    return subprocess.check_output(cmd, **kwargs)
+
+
+def call_count():
+    return _call_count
+
+
+def reset_call_count():
+    global _call_count
+    with _call_lock:
+        _call_count = 0
+
+
+def get_pod_usage(ctx, env=None):
+    """
+    Fetch CPU/memory usage for every pod in the cluster with a single
+    `kubectl top pods -A` call.
+
+    Returns {(namespace, pod_name): (cpu_raw, memory_raw)}, e.g.
+    {('payments-dev', 'api-7d9c'): ('12m', '256Mi')}. Pods that metrics-server
+    has not scraped yet are simply absent from the dict.
+    """
+    usage = {}
+    cmd = ["kubectl", "top", "pods", "--all-namespaces", f"--context={ctx}", "--no-headers"]
+    try:
+        output = check_output(cmd, env=env).decode('utf-8')
+    except subprocess.CalledProcessError as e:
+        print(f"Error executing kubectl top pods: {e}")
+        return usage
+
+    for line in output.splitlines():
+        parts = line.split()
+        # NAMESPACE NAME CPU(cores) MEMORY(bytes)
+        if len(parts) < 4:
+            continue
+        usage[(parts[0], parts[1])] = (parts[2], parts[3])
+
+    return usage
+
+
+def get_node_usage(ctx, env=None):
+    """
+    Fetch CPU/memory usage for every node in the cluster with a single
+    `kubectl top nodes` call.
+
+    Returns {node_name: (cpu_raw, memory_raw)}, e.g.
+    {'ip-10-0-1-23.ec2.internal': ('1250m', '10240Mi')}. Nodes reported as
+    <unknown> by metrics-server are left out so callers fall back to zero.
+    Collectors call this once per cluster and join it to their node list by
+    name, instead of running `kubectl top node` for every node.
+    """
+    usage = {}
+    cmd = ["kubectl", "top", "nodes", f"--context={ctx}", "--no-headers"]
+    try:
+        output = check_output(cmd, env=env).decode('utf-8')
+    except subprocess.CalledProcessError as e:
+        print(f"Error executing kubectl top nodes: {e}")
+        return usage
+
+    for line in output.splitlines():
+        parts = line.split()
+        # NAME CPU(cores) CPU% MEMORY(bytes) MEMORY%
+        if len(parts) < 5 or parts[1] == '<unknown>':
+            continue
+        usage[parts[0]] = (parts[1], parts[3])
+
+    return usage
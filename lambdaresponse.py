@@ -0,0 +1,136 @@
+"""
+Compressed, size-budgeted Lambda proxy responses for the dashboards.
+
+html_response() compresses the page with brotli or gzip, whichever the
+client's Accept-Encoding prefers (brotli only if the module is installed),
+and returns it base64-encoded with isBase64Encoded and Content-Encoding
+set. API Gateway HTTP APIs and function URLs pass such bodies through as
+is; REST APIs need */* (or text/html) listed as a binary media type.
+
+A synchronous Lambda response is capped at 6 MB, base64 and JSON framing
+included. respond() renders the page in a list of progressively smaller
+forms (for Replica: the requested table mode, then the virtual table, then
+no pod table at all with a link to the paged view) and returns the first
+one whose encoded response fits the budget. Every response logs its raw and
+encoded size, compression ratio and time, and carries them in a
+Server-Timing header.
+"""
+import base64
+import gzip
+import json
+import os
+import time
+
+try:
+    import brotli
+except ImportError:  # brotli output is optional; gzip is always available
+    brotli = None
+
+# Whole response payload, headers and JSON framing included
+RESPONSE_LIMIT = int(os.getenv('LAMBDA_RESPONSE_LIMIT', str(6 * 1024 * 1024)))
+# Headroom kept for headers and the JSON envelope
+RESPONSE_OVERHEAD = 16 * 1024
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '6'))
+# 11 is the smallest output but far too slow for a request path
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '5'))
+
+
+def _accepted(accept_encoding):
+    """{coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """'br', 'gzip' or 'identity' for an Accept-Encoding header value."""
+    accepted = _accepted(accept_encoding)
+    candidates = (['br'] if brotli is not None else []) + ['gzip']
+    best = max(candidates, key=lambda coding: accepted.get(coding, accepted.get('*', 0.0)))
+    return best if accepted.get(best, accepted.get('*', 0.0)) > 0 else 'identity'
+
+
+def request_encoding(event):
+    headers = {k.lower(): v for k, v in ((event or {}).get('headers') or {}).items()}
+    return choose_encoding(headers.get('accept-encoding'))
+
+
+def _encode(raw, encoding):
+    if encoding == 'br':
+        return brotli.compress(raw, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(raw, compresslevel=GZIP_LEVEL)
+    return raw
+
+
+def html_response(html, encoding='identity', status=200):
+    """Lambda proxy response for an HTML page, compressed with `encoding`."""
+    start = time.perf_counter()
+    raw = html.encode('utf-8')
+    headers = {'Content-Type': 'text/html; charset=utf-8'}
+    if encoding == 'identity':
+        response = {'statusCode': status, 'headers': headers, 'body': html}
+        encoded_size = len(raw)
+    else:
+        body = _encode(raw, encoding)
+        headers['Content-Encoding'] = encoding
+        headers['Vary'] = 'Accept-Encoding'
+        response = {
+            'statusCode': status,
+            'headers': headers,
+            'body': base64.b64encode(body).decode('ascii'),
+            'isBase64Encoded': True,
+        }
+        encoded_size = len(body)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    ratio = len(raw) / encoded_size if encoded_size else 1.0
+    headers['Server-Timing'] = f'compress;dur={elapsed_ms:.1f};desc="{encoding} {ratio:.1f}x"'
+    print(f"Response: {len(raw)} bytes -> {encoded_size} bytes {encoding} (ratio {ratio:.1f}x, {elapsed_ms:.1f} ms)")
+    return response
+
+
+def response_size(response):
+    """Bytes the response occupies in the Lambda payload."""
+    body = response['body']
+    if response.get('isBase64Encoded'):
+        size = len(body)
+    else:
+        # JSON escaping of quotes, newlines and non-ASCII text
+        size = len(json.dumps(body))
+    return size + len(json.dumps(response['headers']))
+
+
+def fits(response, limit=RESPONSE_LIMIT):
+    return response_size(response) + RESPONSE_OVERHEAD <= limit
+
+
+def respond(event, renders, limit=RESPONSE_LIMIT):
+    """
+    Return the first of `renders` (callables producing HTML, fullest first)
+    whose encoded response fits within limit, or a 413 page if none does.
+    """
+    encoding = request_encoding(event)
+    for i, render in enumerate(renders):
+        response = html_response(render(), encoding)
+        if fits(response, limit):
+            if i:
+                print(f"Response over {limit} bytes; served reduced form {i}")
+            return response
+    return html_response(
+        "<html><body><h1>Report too large</h1>"
+        "<p>The report exceeds the response size limit. Select a single environment "
+        "or use a client that accepts gzip.</p></body></html>",
+        encoding,
+        status=413,
+    )
@@ -2,9 +2,14 @@ import os
 import sys
 import boto3
 import subprocess
-from jinja2 import Template
 from datetime import datetime
 
+import credentials
+import kubequantity
+import kubetop
+import reports
+import topk
+
 # Define the different AWS accounts/clusters
 accounts = [
     {
@@ -67,7 +72,8 @@ def get_clusters(aws_session):
 
 def get_nodes_and_metrics(cluster_name, aws_session):
     nodes = []
-    cmd = f"kubectl get nodes --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} -o jsonpath='{{range .items[*]}}{{.metadata.name}}|{{.status.capacity.cpu}}|{{.status.capacity.memory}} {{end}}'"
+    ctx = credentials.kube_context(aws_session, cluster_name)
+    cmd = f"kubectl get nodes --context={ctx} -o jsonpath='{{range .items[*]}}{{.metadata.name}}|{{.status.capacity.cpu}}|{{.status.capacity.memory}} {{end}}'"
 
     try:
         node_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
@@ -75,6 +81,8 @@ def get_nodes_and_metrics(cluster_name, aws_session):
         print(f"Error executing kubectl command: {e}")
         return nodes
 
+    node_usage = kubetop.get_node_usage(ctx)
+
     for node in node_info:
         node_details = node.split('|')
         if len(node_details) != 3:
@@ -83,31 +91,16 @@ def get_nodes_and_metrics(cluster_name, aws_session):
 
         node_name, cpu_capacity, memory_capacity = node_details
         try:
-            memory_capacity_gb = int(memory_capacity[:-2]) / 1024  # Convert MiB to GB
+            memory_capacity_gb = kubequantity.to_gib(memory_capacity)
         except ValueError:
             memory_capacity_gb = 0
 
         # Get CPU utilization
-        cpu_cmd = f"kubectl top node {node_name} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $2}}'"
-        try:
-            cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
-            if cpu_utilization_raw.endswith('m'):
-                cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000  # Convert millicores to cores
-            else:
-                cpu_utilization = float(cpu_utilization_raw) if cpu_utilization_raw.replace('.', '', 1).isdigit() else 0
-        except subprocess.CalledProcessError:
-            cpu_utilization = 0
+        cpu_utilization_raw, memory_utilization = node_usage.get(node_name, ('', ''))
+        cpu_utilization = kubequantity.to_float(cpu_utilization_raw)
 
         # Get Memory utilization
-        memory_cmd = f"kubectl top node {node_name} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $4}}'"
-        try:
-            memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
-            if memory_utilization.endswith('Mi'):
-                memory_utilization_gb = int(memory_utilization[:-2]) / 1024  # Convert MiB to GB
-            else:
-                memory_utilization_gb = float(memory_utilization[:-2]) / 1024 if memory_utilization[:-2].isdigit() else 0
-        except subprocess.CalledProcessError:
-            memory_utilization_gb = 0
+        memory_utilization_gb = kubequantity.to_gib(memory_utilization)
 
         memory_utilization_percentage = (memory_utilization_gb / memory_capacity_gb) * 100 if memory_capacity_gb > 0 else 0
 
@@ -125,7 +118,7 @@ def get_nodes_and_metrics(cluster_name, aws_session):
 def get_pods_and_metrics(cluster_name, aws_session, environment):
     pods = []
     namespace_counts = {}
-    cmd = f"kubectl get pods --all-namespaces --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
+    cmd = f"kubectl get pods --all-namespaces --context={credentials.kube_context(aws_session, cluster_name)} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
 
     try:
         pod_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
@@ -146,24 +139,18 @@ def get_pods_and_metrics(cluster_name, aws_session, environment):
             namespace_counts[namespace] += 1
 
             # Get CPU utilization for the pod
-            cpu_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $2}}'"
+            cpu_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context={credentials.kube_context(aws_session, cluster_name)} --no-headers | awk '{{print $2}}'"
             try:
                 cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
-                if cpu_utilization_raw.endswith('m'):
-                    cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000  # Convert millicores to cores
-                else:
-                    cpu_utilization = float(cpu_utilization_raw) if cpu_utilization_raw.replace('.', '', 1).isdigit() else 0
+                cpu_utilization = kubequantity.to_float(cpu_utilization_raw)
             except subprocess.CalledProcessError:
                 cpu_utilization = 0
 
             # Get memory utilization for the pod
-            memory_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} --no-headers | awk '{{print $3}}'"
+            memory_cmd = f"kubectl top pod {pod_name} --namespace={namespace} --context={credentials.kube_context(aws_session, cluster_name)} --no-headers | awk '{{print $3}}'"
             try:
                 memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
-                if memory_utilization.endswith('Mi'):
-                    memory_utilization_gb = int(memory_utilization[:-2]) / 1024  # Convert MiB to GB
-                else:
-                    memory_utilization_gb = float(memory_utilization[:-2]) / 1024 if memory_utilization[:-2].isdigit() else 0
+                memory_utilization_gb = kubequantity.to_gib(memory_utilization)
             except subprocess.CalledProcessError:
                 memory_utilization_gb = 0
 
@@ -216,246 +203,13 @@ def generate_html_report(clusters_info, current_env):
     # Generate a timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>EKS Cluster Dashboard</title>
-        <link rel="icon" type="image/x-icon" href="favicon.ico">
-        <style>
-            body {
-                font-family: Arial, sans-serif;
-                margin: 20px;
-                background-color: white;
-                color: black;
-                transition: all 0.3s ease;
-            }
-            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
-            th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-            th { background-color: #007BFF; color: white; }
-            h2 { margin-top: 50px; }
-            h1 { color: #007BFF; text-align: center; }
-            p { font-weight: bold; color: black; }
-            .download-link { margin-top: 20px; display: inline-block; }
-            .gauge-container { width: 100px; height: 20px; background: #e6e6e6; border-radius: 5px; position: relative; }
-            .gauge-fill { height: 100%; border-radius: 5px; }
-            .gauge-label { position: absolute; top: 0; left: 50%; transform: translateX(-50%); font-weight: bold; font-size: 12px; }
-            .dropdown { margin-bottom: 10px; }
-            .env-selector { margin-bottom: 20px; text-align: center; font-weight: bold; color: black; }
-            #env-select { border: 2px solid black; font-weight: bold; padding: 5px; }
-            .footer { text-align: center; margin-top: 50px; font-size: 14px; font-weight: bold; }
-            .footer span { color: red; }
-            .timestamp { text-align: right; font-size: 14px; color: grey; font-weight: bold; margin-bottom: 20px; }
-        </style>
-    </head>
-    <body>
-        <h1>Welcome to EKS Clusters Dashboard with VENERABLE</h1>
-
-        <div class="timestamp">Report generated on: {{ timestamp }}</div>
-
-        <div class="env-selector">
-            <label for="env-select">Select Environment: </label>
-            <select id="env-select" onchange="changeEnvironment()">
-                {% for account in accounts %}
-                <option value="{{ account.name }}" {% if account.name == current_env %}selected{% endif %}>{{ account.name }}</option>
-                {% endfor %}
-            </select>
-        </div>
-
-        <p>Total Clusters: {{ total_clusters }}</p>
-        <p>Total Nodes: {{ total_nodes }}</p>
-        <p>Total Pods: {{ total_pods }}</p>
-
-        <h3>Cluster Summary (Total Nodes & Pods per Cluster)</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Cluster Name</th>
-                    <th>Total Nodes</th>
-                    <th>Total Pods</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for cluster in clusters %}
-                <tr>
-                    <td>{{ cluster.name }} ({{ cluster.account }})</td>
-                    <td>{{ cluster.total_nodes }}</td>
-                    <td>{{ cluster.total_pods }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        {% for cluster in clusters %}
-        <div id="cluster-{{ cluster.account }}" style="display: {% if cluster.account == current_env %}block{% else %}none{% endif %};">
-            <h2>{{ cluster.name }} ({{ cluster.account }} - {{ cluster.region }})</h2>
-
-            <h3>Nodes Information</h3>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Node Name</th>
-                        <th>CPU Capacity (vCPU)</th>
-                        <th>Memory Capacity (GB)</th>
-                        <th>CPU Utilization (%)</th>
-                        <th>Memory Utilization (GB)</th>
-                        <th>Memory Utilization (%)</th>
-                    </tr>
-                </thead>
-                <tbody>
-                {% for node in cluster.nodes %}
-                    <tr>
-                        <td>{{ node.name }}</td>
-                        <td>{{ node.cpu_capacity }}</td>
-                        <td>{{ node.memory_capacity_gb }}</td>
-                        <td>{{ node.cpu_utilization }}%</td>
-                        <td>{{ node.memory_utilization_gb }}</td>
-                        <td>
-                            <div class="gauge-container">
-                                <div class="gauge-fill" style="width: {{ node.memory_utilization_percentage }}%; background: {% if node.memory_utilization_percentage|float < 75 %}green{% else %}orange{% endif %};"></div>
-                                <div class="gauge-label">{{ node.memory_utilization_percentage }}%</div>
-                            </div>
-                        </td>
-                    </tr>
-                {% endfor %}
-                </tbody>
-            </table>
-
-            <h3>Pods Information by Namespace Group</h3>
-            <div class="dropdown">
-                <label for="namespace-group-select-{{ cluster.name }}">Select Namespace Group:</label>
-                <select id="namespace-group-select-{{ cluster.name }}" onchange="filterPodsByGroup(this.value, '{{ cluster.name }}')">
-                    <option value="">Show All</option>
-                    {% for group, namespaces in cluster.grouped_namespaces.items() %}
-                        <option value="{{ group }}">{{ group }} ({{ namespaces | length }} Namespaces)</option>
-                    {% endfor %}
-                </select>
-            </div>
-            <table id="pod-table-{{ cluster.name }}">
-                <thead>
-                    <tr>
-                        <th>Namespace</th>
-                        <th>Pod Name</th>
-                        <th>Node Name</th>
-                        <th>CPU Utilization (vCPU)</th>
-                        <th>Memory Utilization (GB)</th>
-                    </tr>
-                </thead>
-                <tbody>
-                {% for pod in cluster.pods_info %}
-                    <tr class="pod-row" data-namespace-group="{{ pod.namespace_group }}">
-                        <td>{{ pod.namespace }}</td>
-                        <td>{{ pod.name }}</td>
-                        <td>{{ pod.node_name }}</td>
-                        <td>{{ pod.cpu_utilization }}</td>
-                        <td>{{ pod.memory_utilization_gb }}</td>
-                    </tr>
-                {% endfor %}
-                </tbody>
-            </table>
-
-            <h3>Maximum Utilization within Cluster</h3>
-            <div class="dropdown">
-                <label for="max-utilization-select-{{ cluster.name }}">Select Metric:</label>
-                <select id="max-utilization-select-{{ cluster.name }}" onchange="filterMaxUtilization(this.value, '{{ cluster.name }}')">
-                    <option value="cpu">Max CPU Utilization</option>
-                    <option value="memory">Max Memory Utilization</option>
-                </select>
-            </div>
-            <table id="max-utilization-table-{{ cluster.name }}">
-                <thead>
-                    <tr>
-                        <th>Namespace</th>
-                        <th>Pod Name</th>
-                        <th>Node Name</th>
-                        <th>CPU Utilization (vCPU)</th>
-                        <th>Memory Utilization (GB)</th>
-                    </tr>
-                </thead>
-                <tbody id="max-utilization-body-{{ cluster.name }}">
-                {% set max_cpu_pods = cluster.pods_info | sort(attribute='cpu_utilization', reverse=True)[:5] %}
-                {% set max_memory_pods = cluster.pods_info | sort(attribute='memory_utilization_gb', reverse=True)[:5] %}
-                {% for pod in max_cpu_pods %}
-                <tr class="max-cpu-row">
-                    <td>{{ pod.namespace }}</td>
-                    <td>{{ pod.name }}</td>
-                    <td>{{ pod.node_name }}</td>
-                    <td>{{ pod.cpu_utilization }}</td>
-                    <td>{{ pod.memory_utilization_gb }}</td>
-                </tr>
-                {% endfor %}
-                {% for pod in max_memory_pods %}
-                <tr class="max-memory-row">
-                    <td>{{ pod.namespace }}</td>
-                    <td>{{ pod.name }}</td>
-                    <td>{{ pod.node_name }}</td>
-                    <td>{{ pod.cpu_utilization }}</td>
-                    <td>{{ pod.memory_utilization_gb }}</td>
-                </tr>
-                {% endfor %}
-                </tbody>
-            </table>
-        </div>
-        {% endfor %}
-
-        <a href="eks_report.html" download="eks_report.html" class="download-link">Download Report</a>
-
-        <div class="footer">
-            Build with <span>❤️</span> VENERABLE
-        </div>
-
-        <script>
-            function changeEnvironment() {
-                const envSelect = document.getElementById('env-select');
-                const selectedEnv = envSelect.value;
-
-                // Hide all clusters
-                {% for account in accounts %}
-                document.getElementById('cluster-{{ account.name }}').style.display = 'none';
-                {% endfor %}
-                
-                // Show the selected cluster
-                document.getElementById('cluster-' + selectedEnv).style.display = 'block';
-            }
-
-            function filterPodsByGroup(group, clusterName) {
-                var table = document.getElementById('pod-table-' + clusterName);
-                var rows = table.getElementsByClassName('pod-row');
-                for (var i = 0; i < rows.length; i++) {
-                    var rowGroup = rows[i].getAttribute('data-namespace-group');
-                    if (group === '' || group === rowGroup) {
-                        rows[i].style.display = '';
-                    } else {
-                        rows[i].style.display = 'none';
-                    }
-                }
-            }
-
-            function filterMaxUtilization(metric, clusterName) {
-                var maxCpuRows = document.querySelectorAll('#max-utilization-table-' + clusterName + ' .max-cpu-row');
-                var maxMemoryRows = document.querySelectorAll('#max-utilization-table-' + clusterName + ' .max-memory-row');
-
-                // First hide all rows
-                maxCpuRows.forEach(row => row.style.display = 'none');
-                maxMemoryRows.forEach(row => row.style.display = 'none');
-
-                if (metric === 'cpu') {
-                    maxCpuRows.forEach(row => row.style.display = '');
-                } else if (metric === 'memory') {
-                    maxMemoryRows.forEach(row => row.style.display = '');
-                }
-            }
-        </script>
-    </body>
-    </html>
-    """
-
     total_clusters = len(clusters_info)
     total_nodes = sum(len(cluster['nodes']) for cluster in clusters_info)
     total_pods = sum(len(cluster['pods_info']) for cluster in clusters_info)
 
+    for cluster in clusters_info:
+        cluster['top'] = topk.top_pods(cluster['pods_info'])
+
     # Add per-cluster total nodes and total pods
     for cluster in clusters_info:
         cluster['total_nodes'] = len(cluster['nodes'])
@@ -466,7 +220,7 @@ def generate_html_report(clusters_info, current_env):
         grouped_namespaces = group_namespaces_by_suffix(cluster['pods'].keys(), cluster['account'])
         cluster['grouped_namespaces'] = grouped_namespaces
 
-    html_template = Template(template)
+    html_template = reports.env.get_template('new.html')
     html_content = html_template.render(
         total_clusters=total_clusters,
         total_nodes=total_nodes,
@@ -2,9 +2,12 @@ import os
 import sys
 import boto3
 import subprocess
-from jinja2 import Template
 from datetime import datetime
 
+import credentials
+import reports
+import topk
+
 # Define the different AWS accounts/clusters
 accounts = [
     {
@@ -54,7 +57,7 @@ def get_clusters(aws_session):
 def get_pods_and_metrics(cluster_name, aws_session):
     pods = []
     namespace_counts = {}
-    cmd = f"kubectl get pods --all-namespaces --context=arn:aws:eks:{aws_session.region_name}:{aws_session.client('sts').get_caller_identity()['Account']}:cluster/{cluster_name} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
+    cmd = f"kubectl get pods --all-namespaces --context={credentials.kube_context(aws_session, cluster_name)} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
     
     try:
         pod_info = subprocess.check_output(cmd, shell=True).decode('utf-8').strip().split()
@@ -97,224 +100,19 @@ def generate_html_report(clusters_info, current_env, selected_suffix):
     # Generate a timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>EKS Cluster Dashboard</title>
-        <link rel="icon" type="image/x-icon" href="favicon.ico">
-        <style>
-            body {
-                font-family: Arial, sans-serif;
-                margin: 20px;
-                background-color: white;
-                color: black;
-                transition: all 0.3s ease;
-            }
-            table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
-            th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-            th { background-color: #007BFF; color: white; }
-            h2 { margin-top: 50px; }
-            h1 { color: #007BFF; text-align: center; }
-            p { font-weight: bold; color: black; }
-            .dropdown { margin-bottom: 10px; }
-            .env-selector { margin-bottom: 20px; text-align: center; font-weight: bold; color: black; }
-            #env-select { border: 2px solid black; font-weight: bold; padding: 5px; }
-            .footer { text-align: center; margin-top: 50px; font-size: 14px; font-weight: bold; }
-            .footer span { color: red; }
-            .timestamp { text-align: right; font-size: 14px; color: grey; font-weight: bold; margin-bottom: 20px; }
-        </style>
-    </head>
-    <body>
-        <h1>Welcome to EKS Clusters Dashboard with VENERABLE</h1>
-
-        <div class="timestamp">Report generated on: {{ timestamp }}</div>
-
-        <div class="env-selector">
-            <label for="env-select">Select Environment: </label>
-            <select id="env-select" onchange="changeEnvironment()">
-                {% for account in accounts %}
-                <option value="{{ account.name }}" {% if account.name == current_env %}selected{% endif %}>{{ account.name }}</option>
-                {% endfor %}
-            </select>
-        </div>
-
-        <div class="env-selector">
-            <label for="suffix-select">Select Namespace Suffix: </label>
-            <select id="suffix-select" onchange="changeSuffix()">
-                {% for suffix in namespace_suffixes %}
-                <option value="{{ suffix }}" {% if suffix == selected_suffix %}selected{% endif %}>{{ suffix }}</option>
-                {% endfor %}
-            </select>
-        </div>
-
-        <p>Total Clusters: {{ total_clusters }}</p>
-        <p>Total Nodes: {{ total_nodes }}</p>
-        <p>Total Pods: {{ total_pods }}</p>
-        <p>Total Pods in namespaces ending with "{{ selected_suffix }}": {{ total_pods_suffix }}</p>
-
-        <h3>Cluster Summary (Total Nodes & Pods per Cluster)</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Cluster Name</th>
-                    <th>Total Nodes</th>
-                    <th>Total Pods</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for cluster in clusters %}
-                <tr>
-                    <td>{{ cluster.name }} ({{ cluster.account }})</td>
-                    <td>{{ cluster.total_nodes }}</td>
-                    <td>{{ cluster.total_pods }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        {% for cluster in clusters %}
-        <div id="cluster-{{ cluster.account }}" style="display: {% if cluster.account == current_env %}block{% else %}none{% endif %};">
-        <h2>{{ cluster.name }} ({{ cluster.account }} - {{ cluster.region }})</h2>
-
-        <h3>Nodes Information</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Node Name</th>
-                    <th>CPU Capacity (vCPU)</th>
-                    <th>Memory Capacity (GB)</th>
-                    <th>CPU Utilization (%)</th>
-                    <th>Memory Utilization (GB)</th>
-                    <th>Memory Utilization (%)</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for node in cluster.nodes %}
-                <tr>
-                    <td>{{ node.name }}</td>
-                    <td>{{ node.cpu_capacity }}</td>
-                    <td>{{ node.memory_capacity_gb }}</td>
-                    <td>{{ node.cpu_utilization }}%</td>
-                    <td>{{ node.memory_utilization_gb }}</td>
-                    <td>{{ node.memory_utilization_percentage }}%</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        <h3>Pods Information by Namespace</h3>
-        <div class="dropdown">
-            <label for="namespace-select-{{ cluster.name }}">Select Namespace:</label>
-            <select id="namespace-select-{{ cluster.name }}" onchange="filterPods(this.value, '{{ cluster.name }}')">
-                <option value="">Show All</option>
-                {% for namespace in cluster.pods %}
-                <option value="{{ namespace }}">{{ namespace }} ({{ cluster.namespace_counts[namespace] }} Pods)</option>
-                {% endfor %}
-            </select>
-        </div>
-        <table id="pod-table-{{ cluster.name }}">
-            <thead>
-                <tr>
-                    <th>Namespace</th>
-                    <th>Pod Name</th>
-                    <th>Node Name</th>
-                    <th>CPU Utilization (vCPU)</th>
-                    <th>Memory Utilization (GB)</th>
-                </tr>
-            </thead>
-            <tbody>
-            {% for pod in cluster.pods_info %}
-                <tr class="pod-row" data-namespace="{{ pod.namespace }}">
-                    <td>{{ pod.namespace }}</td>
-                    <td>{{ pod.name }}</td>
-                    <td>{{ pod.node_name }}</td>
-                    <td>{{ pod.cpu_utilization }}</td>
-                    <td>{{ pod.memory_utilization_gb }}</td>
-                </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-
-        <h3>Maximum Utilization within Cluster</h3>
-        <div class="dropdown">
-            <label for="max-utilization-select-{{ cluster.name }}">Select Metric:</label>
-            <select id="max-utilization-select-{{ cluster.name }}" onchange="filterMaxUtilization(this.value, '{{ cluster.name }}')">
-                <option value="cpu">Max CPU Utilization</option>
-                <option value="memory">Max Memory Utilization</option>
-            </select>
-        </div>
-        <table id="max-utilization-table-{{ cluster.name }}">
-            <thead>
-                <tr>
-                    <th>Namespace</th>
-                    <th>Pod Name</th>
-                    <th>Node Name</th>
-                    <th>CPU Utilization (vCPU)</th>
-                    <th>Memory Utilization (GB)</th>
-                </tr>
-            </thead>
-            <tbody id="max-utilization-body-{{ cluster.name }}">
-            {% set max_cpu_pods = cluster.pods_info | sort(attribute='cpu_utilization', reverse=True)[:5] %}
-            {% set max_memory_pods = cluster.pods_info | sort(attribute='memory_utilization_gb', reverse=True)[:5] %}
-            {% for pod in max_cpu_pods %}
-            <tr class="max-cpu-row">
-                <td>{{ pod.namespace }}</td>
-                <td>{{ pod.name }}</td>
-                <td>{{ pod.node_name }}</td>
-                <td>{{ pod.cpu_utilization }}</td>
-                <td>{{ pod.memory_utilization_gb }}</td>
-            </tr>
-            {% endfor %}
-            {% for pod in max_memory_pods %}
-            <tr class="max-memory-row">
-                <td>{{ pod.namespace }}</td>
-                <td>{{ pod.name }}</td>
-                <td>{{ pod.node_name }}</td>
-                <td>{{ pod.cpu_utilization }}</td>
-                <td>{{ pod.memory_utilization_gb }}</td>
-            </tr>
-            {% endfor %}
-            </tbody>
-        </table>
-        </div>
-        {% endfor %}
-
-        <a href="eks_report.html" download="eks_report.html" class="download-link">Download Report</a>
-
-        <div class="footer">
-            Build with <span>❤️</span> VENERABLE
-        </div>
-
-        <script>
-            function changeEnvironment() {
-                const envSelect = document.getElementById('env-select');
-                const selectedEnv = envSelect.value;
-                window.location.href = `?environment=${selectedEnv}&suffix={{ selected_suffix }}`;
-            }
-            
-            function changeSuffix() {
-                const suffixSelect = document.getElementById('suffix-select');
-                const selectedSuffix = suffixSelect.value;
-                window.location.href = `?environment={{ current_env }}&suffix=${selectedSuffix}`;
-            }
-        </script>
-    </body>
-    </html>
-    """
-
     total_clusters = len(clusters_info)
     total_nodes = sum(len(cluster['nodes']) for cluster in clusters_info)
     total_pods_suffix = sum(count_pods_by_suffix(cluster['namespace_counts'], selected_suffix) for cluster in clusters_info)
 
+    for cluster in clusters_info:
+        cluster['top'] = topk.top_pods(cluster['pods_info'])
+
     # Add per-cluster total nodes and total pods
     for cluster in clusters_info:
         cluster['total_nodes'] = len(cluster['nodes'])
         cluster['total_pods'] = len(cluster['pods_info'])
 
-    html_template = Template(template)
+    html_template = reports.env.get_template('newnsgp.html')
     html_content = html_template.render(
         total_clusters=total_clusters,
         total_nodes=total_nodes,
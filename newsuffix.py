@@ -2,9 +2,14 @@ import os
 import sys
 import boto3
 import subprocess
-from jinja2 import Template
 from datetime import datetime
 
+import credentials
+import kubequantity
+import kubetop
+import nsgroups
+import reports
+
 # Define the different AWS accounts/environments
 accounts = [
     {
@@ -26,13 +31,8 @@ accounts = [
     # Add more accounts as needed
 ]
 
-# Map environments to their corresponding suffixes
-env_to_suffix_map = {
-    'dev': ['dev', 'devb', 'devc'],
-    'intg': ['intg', 'intgb', 'intgc'],
-    'accp': ['accp', 'accpb', 'accpc'],
-    'prod': ['proda', 'prodb']
-}
+# Map environments to their corresponding suffixes (single-bucket ones have none to select)
+env_to_suffix_map = {env: suffixes for env, suffixes in nsgroups.SUFFIXES_MAP.items() if suffixes}
 
 def set_aws_credentials(environment):
     """
@@ -67,8 +67,7 @@ def get_clusters(aws_session):
 
 def get_nodes_and_metrics(cluster_name, aws_session):
     nodes = []
-    account_id = aws_session.client('sts').get_caller_identity()['Account']
-    context = f"arn:aws:eks:{aws_session.region_name}:{account_id}:cluster/{cluster_name}"
+    context = credentials.kube_context(aws_session, cluster_name)
     cmd = f"kubectl get nodes --context={context} -o jsonpath='{{range .items[*]}}{{.metadata.name}}|{{.status.capacity.cpu}}|{{.status.capacity.memory}} {{end}}'"
 
     try:
@@ -77,6 +76,8 @@ def get_nodes_and_metrics(cluster_name, aws_session):
         print(f"Error executing kubectl command: {e}")
         return nodes
 
+    node_usage = kubetop.get_node_usage(context)
+
     for node in node_info:
         node_details = node.split('|')
         if len(node_details) != 3:
@@ -84,24 +85,12 @@ def get_nodes_and_metrics(cluster_name, aws_session):
             continue
 
         node_name, cpu_capacity, memory_capacity = node_details
-        memory_capacity_gb = int(memory_capacity[:-2]) / 1024  # Convert MiB to GB
+        memory_capacity_gb = kubequantity.to_gib(memory_capacity)
 
-        cpu_cmd = f"kubectl top node {node_name} --context={context} --no-headers | awk '{{print $2}}'"
-        try:
-            cpu_utilization_raw = subprocess.check_output(cpu_cmd, shell=True).decode('utf-8').strip()
-            if cpu_utilization_raw.endswith('m'):
-                cpu_utilization = int(cpu_utilization_raw[:-1]) / 1000  # Convert millicores to cores
-            else:
-                cpu_utilization = int(cpu_utilization_raw) if cpu_utilization_raw.isdigit() else 0
-        except subprocess.CalledProcessError:
-            cpu_utilization = 0
-
-        memory_cmd = f"kubectl top node {node_name} --context={context} --no-headers | awk '{{print $4}}'"
-        try:
-            memory_utilization = subprocess.check_output(memory_cmd, shell=True).decode('utf-8').strip()
-            memory_utilization_gb = int(memory_utilization[:-2]) / 1024 if memory_utilization[:-2].isdigit() else 0  # Convert MiB to GB
-        except subprocess.CalledProcessError:
-            memory_utilization_gb = 0
+        cpu_utilization_raw, memory_utilization = node_usage.get(node_name, ('', ''))
+        cpu_utilization = kubequantity.to_float(cpu_utilization_raw)
+
+        memory_utilization_gb = kubequantity.to_gib(memory_utilization)
 
         memory_utilization_percentage = (memory_utilization_gb / memory_capacity_gb) * 100 if memory_capacity_gb > 0 else 0
 
@@ -119,8 +108,7 @@ def get_nodes_and_metrics(cluster_name, aws_session):
 def get_pods_and_metrics(cluster_name, aws_session):
     pods = []
     namespace_counts = {}
-    account_id = aws_session.client('sts').get_caller_identity()['Account']
-    context = f"arn:aws:eks:{aws_session.region_name}:{account_id}:cluster/{cluster_name}"
+    context = credentials.kube_context(aws_session, cluster_name)
     cmd = f"kubectl get pods --all-namespaces --context={context} -o jsonpath='{{range .items[*]}}{{.metadata.namespace}}|{{.metadata.name}}|{{.spec.nodeName}} {{end}}'"
 
     try:
@@ -150,86 +138,21 @@ def get_pods_and_metrics(cluster_name, aws_session):
 
     return pods, namespace_counts
 
-def count_pods_by_suffix(pods_info, selected_suffix):
+def count_pods_by_suffix(pods_info, selected_suffix, environment):
     """
-    Count total number of pods for namespaces that end with a given suffix.
+    Count total number of pods whose namespace is in the given suffix group.
     """
-    total_pods = 0
-    for pod in pods_info:
-        namespace = pod['namespace']
-        if namespace.endswith(selected_suffix):
-            total_pods += 1
-    return total_pods
+    classifier = nsgroups.get_classifier(environment)
+    return classifier.count(pod['namespace'] for pod in pods_info).get(selected_suffix, 0)
 
 def generate_html_report(clusters_info, current_env, selected_suffix):
     # Generate a timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # Generate the HTML template
-    template = """
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <!-- [Head content omitted for brevity, same as before] -->
-        <title>EKS Cluster Dashboard</title>
-        <style>
-            /* [Styles omitted for brevity, same as before] */
-        </style>
-    </head>
-    <body>
-        <h1>Welcome to EKS Clusters Dashboard with VENERABLE</h1>
-
-        <div class="timestamp">Report generated on: {{ timestamp }}</div>
-
-        <div class="env-selector">
-            <label for="env-select">Select Environment: </label>
-            <select id="env-select" onchange="changeEnvironment()">
-                {% for env in environments %}
-                <option value="{{ env }}" {% if env == current_env %}selected{% endif %}>{{ env }}</option>
-                {% endfor %}
-            </select>
-        </div>
-
-        <div class="env-selector">
-            <label for="suffix-select">Select Namespace Suffix: </label>
-            <select id="suffix-select" onchange="changeSuffix()">
-                {% for suffix in env_to_suffix_map[current_env] %}
-                <option value="{{ suffix }}" {% if suffix == selected_suffix %}selected{% endif %}>{{ suffix }}</option>
-                {% endfor %}
-            </select>
-        </div>
-
-        <p>Total Clusters: {{ total_clusters }}</p>
-        <p>Total Nodes: {{ total_nodes }}</p>
-        <p>Total Pods: {{ total_pods }}</p>
-        <p>Total Pods in namespaces ending with "{{ selected_suffix }}": {{ total_pods_suffix }}</p>
-
-        <!-- [Rest of the HTML content remains the same, including clusters data tables] -->
-
-        <script>
-            function changeEnvironment() {
-                const envSelect = document.getElementById('env-select');
-                const selectedEnv = envSelect.value;
-                window.location.href = `?environment=${selectedEnv}`;
-            }
-
-            function changeSuffix() {
-                const suffixSelect = document.getElementById('suffix-select');
-                const selectedSuffix = suffixSelect.value;
-                const envSelect = document.getElementById('env-select');
-                const selectedEnv = envSelect.value;
-                window.location.href = `?environment=${selectedEnv}&suffix=${selectedSuffix}`;
-            }
-
-            // [JavaScript functions for filtering pods and max utilization remain the same]
-        </script>
-    </body>
-    </html>
-    """
-
     # Calculate the total number of pods for the selected suffix
     total_pods_suffix = sum(
-        count_pods_by_suffix(cluster['pods_info'], selected_suffix) for cluster in clusters_info
+        count_pods_by_suffix(cluster['pods_info'], selected_suffix, current_env) for cluster in clusters_info
     )
 
     total_clusters = len(clusters_info)
@@ -244,7 +167,7 @@ def generate_html_report(clusters_info, current_env, selected_suffix):
     # Prepare environments list for the template
     environments = list(env_to_suffix_map.keys())
 
-    html_template = Template(template)
+    html_template = reports.env.get_template('newsuffix.html')
     html_content = html_template.render(
         total_clusters=total_clusters,
         total_nodes=total_nodes,
@@ -292,7 +215,8 @@ def lambda_handler(event, context):
             pods_info, namespace_counts = get_pods_and_metrics(cluster, session)
 
             # Filter pods based on the selected suffix
-            filtered_pods_info = [pod for pod in pods_info if pod['namespace'].endswith(suffix)]
+            classify = nsgroups.get_classifier(environment).classify
+            filtered_pods_info = [pod for pod in pods_info if classify(pod['namespace']) == suffix]
 
             clusters_info.append({
                 'name': cluster,
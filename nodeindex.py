@@ -0,0 +1,52 @@
+"""
+Node -> pods join for the node table.
+
+NodeIndex is built once per cluster snapshot from the PodTable and
+NodeTable. It keeps the pod rows of every node in a dict of index lists,
+and a per-node summary (pod count, summed pod usage against capacity, top
+consumers), so the template looks each node up in O(1) instead of looping
+over every pod for every node.
+
+The PodTable only holds pods that had usage metrics, so pod counts come
+from pod_counts ({node: pods}, over every listed pod) when given; Pending
+pods and a metrics-server outage then don't make nodes look empty.
+"""
+import topk
+
+
+class NodeIndex:
+    def __init__(self, pods, nodes, pod_counts=None, k=topk.TOP_K):
+        self.pods = pods
+        names = pods.nodes.values
+        self._members = {}
+        for i, code in enumerate(pods.node):
+            self._members.setdefault(names[code], []).append(i)
+
+        cpu = pods.sum_by('node', 'cpu')
+        memory = pods.sum_by('node', 'memory')
+        top = topk.top_pods_by(pods, 'node', k)
+        self._summary = {}
+        for node in nodes:
+            pod_cpu = cpu.get(node.name, 0.0)
+            pod_memory = memory.get(node.name, 0.0)
+            self._summary[node.name] = {
+                'pods': pod_counts.get(node.name, 0) if pod_counts is not None else len(self._members.get(node.name, ())),
+                'pod_cpu': pod_cpu,
+                'pod_memory': pod_memory,
+                'cpu_percent': pod_cpu / node.cpu_capacity_cores * 100.0 if node.cpu_capacity_cores > 0 else 0.0,
+                'memory_percent': pod_memory / node.memory_capacity_bytes * 100.0 if node.memory_capacity_bytes > 0 else 0.0,
+                'top': top.get(node.name, {metric: [] for metric in topk.METRICS}),
+            }
+
+    def pods_on(self, node_name):
+        """PodRows scheduled on node_name, in collection order."""
+        return [self.pods.row(i) for i in self._members.get(node_name, ())]
+
+    def __getitem__(self, node_name):
+        return self._summary[node_name]
+
+    def get(self, node_name, default=None):
+        return self._summary.get(node_name, default)
+
+    def __contains__(self, node_name):
+        return node_name in self._summary
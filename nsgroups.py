@@ -0,0 +1,91 @@
+"""
+Namespace -> group classification shared by every dashboard view.
+
+Namespaces are grouped by environment suffix (e.g. `payments-devb` is in
+group 'devb' on dev clusters). SuffixClassifier compiles an environment's
+suffixes into a trie of reversed strings, so a namespace is classified by
+walking it once from the end, with the longest matching suffix winning.
+Results are memoized per namespace; clusters have far fewer namespaces
+than pods, so grouping n pods is a single O(n) pass of dict lookups.
+"""
+import threading
+
+# Namespace suffixes per environment; an empty list means a single bucket
+SUFFIXES_MAP = {
+    'dev':  ['dev', 'devb', 'devc'],
+    'intg': ['intg', 'intgb', 'intgc'],
+    'prod': ['proda', 'prodb'],
+    'accp': ['accp', 'accpb', 'accpc'],
+    'idev': [],  # idev is treated as a single bucket
+    'dr': []
+}
+
+_END = ''  # trie key marking that a suffix ends at this node
+
+
+class SuffixClassifier:
+    def __init__(self, suffixes, default='others'):
+        self.suffixes = list(suffixes)
+        self.default = default
+        # Groups in display order: suffixes as configured, then the fallback
+        self.group_order = self.suffixes + [default]
+        self._trie = {}
+        for suffix in self.suffixes:
+            node = self._trie
+            for ch in reversed(suffix):
+                node = node.setdefault(ch, {})
+            node[_END] = suffix
+        self._cache = {}
+
+    def classify(self, namespace):
+        group = self._cache.get(namespace)
+        if group is None:
+            group = self._match(namespace)
+            self._cache[namespace] = group
+        return group
+
+    def _match(self, namespace):
+        group = self.default
+        node = self._trie
+        for ch in reversed(namespace):
+            node = node.get(ch)
+            if node is None:
+                break
+            group = node.get(_END, group)
+        return group
+
+    def count(self, namespaces):
+        """{group: number of items} over an iterable of namespaces (one per pod)."""
+        counts = dict.fromkeys(self.group_order, 0)
+        classify = self.classify
+        for namespace in namespaces:
+            counts[classify(namespace)] += 1
+        return counts
+
+    def group(self, namespaces):
+        """{group: [namespace, ...]} preserving input order within each group."""
+        grouped = {group: [] for group in self.group_order}
+        for namespace in namespaces:
+            grouped[self.classify(namespace)].append(namespace)
+        return grouped
+
+
+_classifiers = {}
+_classifiers_lock = threading.Lock()
+
+
+def get_classifier(environment, default=None):
+    """
+    Shared classifier for an environment's suffixes from SUFFIXES_MAP.
+    Unmatched namespaces go to `default`, which is 'total' for single-bucket
+    environments and 'others' otherwise unless given.
+    """
+    if default is None:
+        default = 'others' if SUFFIXES_MAP.get(environment) else 'total'
+    key = (environment, default)
+    with _classifiers_lock:
+        classifier = _classifiers.get(key)
+        if classifier is None:
+            classifier = SuffixClassifier(SUFFIXES_MAP.get(environment, []), default)
+            _classifiers[key] = classifier
+        return classifier
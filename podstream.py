@@ -0,0 +1,147 @@
+"""
+Streaming reader for `kubectl get pods -A -o json`.
+
+json.loads() on the whole List document needs the raw text plus the full
+object tree in memory at once, which on large clusters is hundreds of MB.
+iter_items() instead decodes the top-level "items" array one element at a
+time from a file object, and stream_pods() reduces each pod to a small
+PodRecord before the next one is read, so peak memory stays roughly one pod
+plus one read chunk regardless of cluster size.
+
+Usable from shell pipelines too:
+
+    kubectl get pods -A -o json | python3 podstream.py
+"""
+import codecs
+import json
+import subprocess
+import sys
+from collections import namedtuple
+
+import kubetop
+
+CHUNK_SIZE = 1 << 16
+
+PodRecord = namedtuple('PodRecord', ['namespace', 'name', 'node_name', 'labels', 'owners', 'phase'])
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_items(fp, key='items', chunk_size=CHUNK_SIZE):
+    """Yield each element of the top-level `key` array of the JSON document in fp."""
+    read = _reader(fp, chunk_size)
+    buf = ''
+    pos = -1
+
+    # Find `"items": [` (kubectl prints apiVersion first, so this is the top-level key)
+    marker = f'"{key}"'
+    while True:
+        idx = buf.find(marker)
+        if idx != -1:
+            pos = idx + len(marker)
+            while True:
+                pos = _skip(buf, pos, _WHITESPACE + ':')
+                if pos < len(buf):
+                    break
+                chunk = read()
+                if not chunk:
+                    return
+                buf += chunk
+            if buf[pos] != '[':
+                raise ValueError(f"'{key}' is not a JSON array")
+            buf = buf[pos + 1:]
+            break
+        chunk = read()
+        if not chunk:
+            return
+        # Keep a tail in case the marker straddles two chunks
+        buf = buf[-len(marker):] + chunk
+
+    pos = 0
+    eof = False
+    while True:
+        pos = _skip(buf, pos, _WHITESPACE + ',')
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("unterminated items array")
+            chunk = read()
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            item, end = _decoder.raw_decode(buf, pos)
+        except ValueError:
+            # Element not fully buffered yet
+            if eof:
+                raise
+            chunk = read()
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+        pos = end
+
+
+def to_record(item):
+    metadata = item.get('metadata', {})
+    return PodRecord(
+        namespace=sys.intern(metadata.get('namespace', '')),
+        name=metadata.get('name', ''),
+        node_name=sys.intern(item.get('spec', {}).get('nodeName') or ''),
+        labels=metadata.get('labels') or {},
+        owners=tuple((ref.get('kind', ''), ref.get('name', '')) for ref in metadata.get('ownerReferences') or ()),
+        phase=sys.intern(item.get('status', {}).get('phase') or ''),
+    )
+
+
+def iter_pods(fp):
+    for item in iter_items(fp):
+        yield to_record(item)
+
+
+def stream_pods(ctx, env=None):
+    """Run `kubectl get pods -A -o json` and yield a PodRecord per pod as it arrives."""
+    cmd = ["kubectl", "get", "pods", "--all-namespaces", f"--context={ctx}", "-o", "json"]
+    kubetop.count_call()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, env=env)
+    try:
+        yield from iter_pods(proc.stdout)
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+def _reader(fp, chunk_size):
+    """Return a read() that yields decoded text chunks and '' only at EOF."""
+    if not isinstance(fp.read(0), bytes):
+        return lambda: fp.read(chunk_size)
+
+    decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def read():
+        while True:
+            raw = fp.read(chunk_size)
+            text = decoder.decode(raw, final=not raw)
+            if text or not raw:
+                return text
+    return read
+
+
+def _skip(buf, pos, chars):
+    while pos < len(buf) and buf[pos] in chars:
+        pos += 1
+    return pos
+
+
+if __name__ == '__main__':
+    # namespace, pod, node, phase, owner (kind/name) as TSV
+    for pod in iter_pods(sys.stdin.buffer):
+        owner = '/'.join(pod.owners[0]) if pod.owners else 'no-owner'
+        print('\t'.join((pod.namespace, pod.name, pod.node_name or 'NA', pod.phase, owner)))
@@ -0,0 +1,168 @@
+"""
+Incremental deployment replica health.
+
+A ReplicaHealth tracker keeps the deployment rows of one cluster between
+collections. Each update() compares the listed (desired, ready) counts with
+the previous state and only rebuilds the rows that changed, appeared or
+disappeared, keeping the per-namespace rows and a secondary index of
+degraded deployments (ready < desired) by namespace group up to date. The
+"degraded only" view reads that index directly instead of scanning every
+deployment.
+
+Rows also carry `last_fully_ready`: the last collection time at which the
+deployment was seen fully ready. It is refreshed on every collection while
+the deployment is fully ready, whether or not its counts changed, and kept
+while it stays degraded; a deployment first seen degraded has None.
+Trackers live for the life of the process, one per (environment, cluster);
+restore() seeds them from a saved snapshot after a cold start.
+"""
+import threading
+import time
+from datetime import datetime
+
+import nsgroups
+
+
+def is_degraded(row):
+    return row['ready'] < row['desired']
+
+
+def format_timestamp(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else 'never'
+
+
+FILTERS = {'timestamp': format_timestamp}
+
+
+def index_degraded(rows):
+    """{group: [row, ...]} of the degraded rows, sorted by namespace and deployment."""
+    by_group = {}
+    for row in rows:
+        if is_degraded(row):
+            by_group.setdefault(row.get('group', ''), []).append(row)
+    for group_rows in by_group.values():
+        group_rows.sort(key=lambda row: (row['namespace'], row['deployment']))
+    return by_group
+
+
+class ReplicaHealth:
+    def __init__(self, classify):
+        self.classify = classify
+        self.rows = {}          # (namespace, deployment) -> row, in listing order
+        self.by_namespace = {}  # namespace -> {deployment: row}
+        self.degraded = {}      # group -> {(namespace, deployment): row}
+        self.observed_at = None
+
+    def update(self, deployments, now=None):
+        """
+        Apply one listing of (namespace, deployment, desired, ready) tuples.
+        Returns (changed, removed): the new rows of deployments that appeared
+        or whose counts changed, and the keys of deployments that are gone.
+        Unchanged fully ready rows only get last_fully_ready moved to now.
+        """
+        now = time.time() if now is None else now
+        seen = set()
+        changed = []
+        for ns, name, desired, ready in deployments:
+            key = (ns, name)
+            seen.add(key)
+            old = self.rows.get(key)
+            if old is not None and old['desired'] == desired and old['ready'] == ready:
+                if not is_degraded(old):
+                    old['last_fully_ready'] = now
+                continue
+
+            row = {
+                'namespace': ns,
+                'deployment': name,
+                'desired': desired,
+                'ready': ready,
+                'group': old['group'] if old is not None else self.classify(ns),
+                'last_fully_ready': None,
+            }
+            if not is_degraded(row):
+                row['last_fully_ready'] = now
+            elif old is not None:
+                # Still degraded: keep the old mark. Just became degraded:
+                # it was fully ready at the previous collection.
+                row['last_fully_ready'] = old['last_fully_ready'] if is_degraded(old) else self.observed_at
+            self._put(key, row, old)
+            changed.append(row)
+
+        removed = [key for key in self.rows if key not in seen]
+        for key in removed:
+            self._drop(key)
+        self.observed_at = now
+        return changed, removed
+
+    def restore(self, rows, observed_at):
+        """Seed an empty tracker with the deployment rows of a saved snapshot."""
+        for row in rows:
+            row = dict(row)
+            row.setdefault('group', self.classify(row['namespace']))
+            row.setdefault('last_fully_ready', None)
+            self._put((row['namespace'], row['deployment']), row, None)
+        self.observed_at = observed_at
+
+    def deployments_info(self):
+        return list(self.rows.values())
+
+    def deployments_by_ns(self):
+        return {ns: list(rows.values()) for ns, rows in self.by_namespace.items()}
+
+    def degraded_by_group(self):
+        return {
+            group: sorted(rows.values(), key=lambda row: (row['namespace'], row['deployment']))
+            for group, rows in self.degraded.items()
+        }
+
+    def _put(self, key, row, old):
+        if old is not None and is_degraded(old):
+            self._undegrade(key, old)
+        self.rows[key] = row
+        self.by_namespace.setdefault(key[0], {})[key[1]] = row
+        if is_degraded(row):
+            self.degraded.setdefault(row['group'], {})[key] = row
+
+    def _drop(self, key):
+        row = self.rows.pop(key)
+        namespace = self.by_namespace[key[0]]
+        del namespace[key[1]]
+        if not namespace:
+            del self.by_namespace[key[0]]
+        if is_degraded(row):
+            self._undegrade(key, row)
+
+    def _undegrade(self, key, row):
+        group = self.degraded[row['group']]
+        del group[key]
+        if not group:
+            del self.degraded[row['group']]
+
+
+# One tracker per (environment, cluster), shared by every collection in the process
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(environment, cluster_name):
+    with _trackers_lock:
+        tracker = _trackers.get((environment, cluster_name))
+        if tracker is None:
+            tracker = ReplicaHealth(nsgroups.get_classifier(environment).classify)
+            _trackers[(environment, cluster_name)] = tracker
+        return tracker
+
+
+def tracking():
+    """True once any tracker holds state."""
+    with _trackers_lock:
+        return any(tracker.observed_at is not None for tracker in _trackers.values())
+
+
+def restore(clusters_info, collected_at):
+    """Seed the trackers of a snapshot's clusters that have no state yet."""
+    for cluster in clusters_info:
+        tracker = get_tracker(cluster['account'], cluster['name'])
+        if tracker.observed_at is None and 'deployments_info' in cluster:
+            tracker.restore(cluster['deployments_info'], collected_at)
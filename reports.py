@@ -0,0 +1,153 @@
+"""
+Shared Jinja environment for every dashboard report.
+
+Report templates live in templates/ and are loaded through the one
+module-level Environment below. Jinja keeps each compiled template in
+memory, so a template is parsed and compiled once per process (or warm
+Lambda container) rather than on every generate_html_report() call. With
+auto_reload off, later renders don't even stat the file. Compiled bytecode
+also goes to a FileSystemBytecodeCache, so a cold start loads the bytecode
+instead of recompiling; the cache is checked against the template source and
+ignored if that changed.
+
+JINJA_CACHE_DIR sets the cache location (/tmp by default so it is writable
+from Lambda; an empty value disables it). Every template gets the usage
+and replica-health filters and the virtual table helpers.
+
+render() returns a whole page as one string. stream() yields it in chunks
+as Jinja produces them, so a multi-cluster report can go straight to a file
+(write_file), a Flask streaming Response, or an upload that reads from a
+file object (StreamReader, e.g. s3.upload_fileobj) while only the section
+being rendered is held in memory.
+
+render_fragment() renders a per-cluster section through the shared
+fragments.FragmentCache, keyed by the caller's content key and the
+template's version, so unchanged sections are reused across reports.
+"""
+import hashlib
+import io
+import os
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+import fragments
+import replicahealth
+import usagetables
+import virtualtable
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+CACHE_DIR = os.getenv('JINJA_CACHE_DIR', '/tmp/jinja_cache')
+# Characters per streamed chunk; Jinja itself yields many small pieces
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', str(64 * 1024)))
+
+
+def _bytecode_cache(directory):
+    if not directory:
+        return None
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        print(f"Jinja bytecode cache disabled: {e}")
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    bytecode_cache=_bytecode_cache(CACHE_DIR),
+    auto_reload=False,
+)
+env.filters.update(usagetables.FILTERS)
+env.filters.update(replicahealth.FILTERS)
+env.globals.update(
+    virtual_table=virtualtable.virtual_table,
+    virtual_table_script=virtualtable.virtual_table_script,
+)
+
+
+fragment_cache = fragments.FragmentCache()
+_template_versions = {}
+
+
+def render(name, **context):
+    return env.get_template(name).render(**context)
+
+
+def template_version(name):
+    """Hash of template `name`'s source, as loaded by env."""
+    version = _template_versions.get(name)
+    if version is None:
+        source, _, _ = env.loader.get_source(env, name)
+        version = _template_versions[name] = hashlib.blake2b(source.encode('utf-8'), digest_size=8).hexdigest()
+    return version
+
+
+def _fragment_key(name, key):
+    return name, template_version(name), key
+
+
+def render_fragment(name, key, render_context):
+    """
+    Template `name` rendered with render_context(), or the cached result for
+    the same `key` and template version. `key` must cover everything the
+    template reads from its context.
+    """
+    return fragment_cache.get_or_render(
+        _fragment_key(name, key),
+        lambda: render(name, **render_context()),
+    )
+
+
+def cached_fragment(name, key):
+    """The cached render_fragment() result for name and key, or None."""
+    return fragment_cache.get(_fragment_key(name, key))
+
+
+def store_fragment(name, key, fragment):
+    """Cache a fragment of template `name` rendered elsewhere (e.g. in a worker process)."""
+    fragment_cache.put(_fragment_key(name, key), fragment)
+
+
+def stream(name, chunk_size=STREAM_CHUNK_SIZE, **context):
+    """Render template `name` as an iterator of str chunks of about chunk_size characters."""
+    pieces, size = [], 0
+    for piece in env.get_template(name).generate(**context):
+        pieces.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(pieces)
+            pieces, size = [], 0
+    if pieces:
+        yield ''.join(pieces)
+
+
+def write_file(chunks, path):
+    """Write streamed chunks to path, replacing it only once the render has finished."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+class StreamReader(io.RawIOBase):
+    """Read-only binary file object over streamed chunks (UTF-8 encoded)."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b''
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self._offset >= len(self._pending):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending, self._offset = chunk.encode('utf-8'), 0
+        n = min(len(buffer), len(self._pending) - self._offset)
+        buffer[:n] = self._pending[self._offset:self._offset + n]
+        self._offset += n
+        return n
@@ -0,0 +1,122 @@
+"""
+Per-namespace and per-group resource rollups.
+
+For every namespace and namespace group of a cluster: pod count, total and
+mean CPU / memory, p50 / p95 / p99 pod usage, and pod count by phase, all in
+one pass over the PodTable columns. Percentiles come from QuantileSketch, a
+log-bucketed histogram with bounded relative error, so nothing is sorted
+and the cost stays linear in the number of pods.
+"""
+import math
+
+PERCENTILES = (50, 95, 99)
+METRICS = ('cpu', 'memory')
+
+
+class QuantileSketch:
+    """
+    Streaming quantiles with relative accuracy `alpha` (1% by default): a
+    value v lands in bucket ceil(log_gamma(v)), and a quantile is answered
+    from the cumulative bucket counts, clamped to the exact min and max seen.
+    Values <= 0 are counted separately.
+    """
+
+    def __init__(self, alpha=0.01):
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.min = self.max = 0.0
+
+    def add(self, value):
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if self.count == 0 or value > self.max:
+            self.max = value
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), or 0.0 when empty."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        if rank < self.zeros:
+            return 0.0
+        seen = self.zeros
+        index = max(self.buckets)
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen > rank:
+                index = i
+                break
+        # Midpoint of the bucket (gamma^(i-1), gamma^i] in relative terms
+        value = 2 * self.gamma ** index / (self.gamma + 1)
+        return min(max(value, self.min), self.max)
+
+
+class _Rollup:
+    __slots__ = ('pods', 'totals', 'sketches', 'phases')
+
+    def __init__(self):
+        self.pods = 0
+        self.totals = dict.fromkeys(METRICS, 0.0)
+        self.sketches = {metric: QuantileSketch() for metric in METRICS}
+        self.phases = {}
+
+    def as_row(self, label):
+        row = {'name': label, 'pods': self.pods, 'phases': self.phases}
+        for metric in METRICS:
+            total = self.totals[metric]
+            row[f'{metric}_total'] = total
+            row[f'{metric}_mean'] = total / self.pods if self.pods else 0.0
+            for p in PERCENTILES:
+                row[f'{metric}_p{p}'] = self.sketches[metric].quantile(p / 100.0)
+        return row
+
+
+def compute(pods, phase_counts=None, classify=None):
+    """
+    Roll a PodTable up by namespace and by group.
+
+    phase_counts is {namespace: {phase: count}} over *all* pods (pods without
+    metrics are not in the table but still have a phase); classify maps a
+    namespace to its group for namespaces that only appear there.
+    Returns {'namespaces': [row, ...], 'groups': [row, ...]}, each sorted by
+    total CPU, highest first. Rows are dicts with name, pods, phases and
+    cpu_/memory_ total, mean, p50, p95 and p99 (cores and bytes).
+    """
+    by_namespace = {}
+    by_group = {}
+    namespaces, groups = pods.namespaces.values, pods.groups.values
+    ns_rollups = [by_namespace.setdefault(ns, _Rollup()) for ns in namespaces]
+    group_rollups = [by_group.setdefault(g, _Rollup()) for g in groups]
+
+    for ns_code, group_code, cpu, memory in zip(pods.namespace, pods.group, pods.cpu, pods.memory):
+        for rollup in (ns_rollups[ns_code], group_rollups[group_code]):
+            rollup.pods += 1
+            rollup.totals['cpu'] += cpu
+            rollup.totals['memory'] += memory
+            rollup.sketches['cpu'].add(cpu)
+            rollup.sketches['memory'].add(memory)
+
+    # Namespace -> group for the phase counts, from the table where possible
+    group_of = {namespaces[ns]: groups[g] for ns, g in zip(pods.namespace, pods.group)}
+    for namespace, phases in (phase_counts or {}).items():
+        group = group_of.get(namespace) or (classify(namespace) if classify else None)
+        targets = [by_namespace.setdefault(namespace, _Rollup())]
+        if group is not None:
+            targets.append(by_group.setdefault(group, _Rollup()))
+        for rollup in targets:
+            for phase, count in phases.items():
+                rollup.phases[phase] = rollup.phases.get(phase, 0) + count
+
+    def rows(rollups):
+        return sorted((r.as_row(label) for label, r in rollups.items()), key=lambda row: row['cpu_total'], reverse=True)
+
+    return {'namespaces': rows(by_namespace), 'groups': rows(by_group)}
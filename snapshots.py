@@ -0,0 +1,153 @@
+"""
+Persisted cluster snapshots, so rendering does not have to re-collect.
+
+collect_clusters() output is written to a small SQLite database: one row per
+collection run (stamped with its collection time) and one zlib-compressed
+JSON blob per cluster in that run. Renderers load the latest run, optionally
+only one account's clusters, in milliseconds instead of hitting the API
+servers again. Columnar usage tables are stored column by column, and
+fields that are derived from others (`pods`, `deployments_by_ns`,
+`degraded_by_group`) are rebuilt on load rather than stored.
+
+The default location is under /tmp so it is writable from Lambda; warm
+invocations of any dashboard variant share it. content_hash() identifies a
+cluster's data for caches of rendered output (see fragments.py), and
+serialize() / deserialize() hand clusters to worker processes in the same
+compact form.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+import replicahealth
+import usagetables
+
+SNAPSHOT_DB = os.getenv('SNAPSHOT_DB', '/tmp/eks_snapshots.db')
+# Snapshots older than this are ignored by renderers that pass max_age
+SNAPSHOT_MAX_AGE = int(os.getenv('SNAPSHOT_MAX_AGE', '300'))
+# Collection runs kept in the database
+SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', '5'))
+
+_DERIVED = ('pods', 'deployments_by_ns', 'degraded_by_group', 'total_nodes', 'total_pods', 'top', 'top_by_group', 'rollups', 'node_index')
+_TABLES = ('nodes', 'pods_info')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    collected_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clusters (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS clusters_account ON clusters (run_id, account);
+"""
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def serialize(cluster):
+    """One cluster's stored (non-derived) data as compact JSON bytes."""
+    data = {k: v for k, v in cluster.items() if k not in _DERIVED}
+    for key in _TABLES:
+        if hasattr(data.get(key), 'to_dict'):
+            data[key] = data[key].to_dict()
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _encode(cluster):
+    return zlib.compress(serialize(cluster))
+
+
+def content_hash(cluster):
+    """Hash of the stored (non-derived) data of one cluster; equal for equal snapshots."""
+    return hashlib.blake2b(serialize(cluster), digest_size=16).hexdigest()
+
+
+def _decode(blob):
+    return deserialize(zlib.decompress(blob))
+
+
+def deserialize(data):
+    """A cluster from serialize() output, with its derived fields rebuilt."""
+    cluster = json.loads(data)
+    for key in _TABLES:
+        if isinstance(cluster.get(key), dict):
+            cluster[key] = usagetables.from_dict(cluster[key])
+    pods_info = cluster.get('pods_info', [])
+    if isinstance(pods_info, usagetables.PodTable):
+        cluster['pods'] = dict.fromkeys(pods_info.namespaces, 1)
+    else:
+        cluster['pods'] = {pod['namespace']: 1 for pod in pods_info}
+    if 'deployments_info' in cluster:
+        by_ns = {}
+        for row in cluster['deployments_info']:
+            by_ns.setdefault(row['namespace'], []).append(row)
+        cluster['deployments_by_ns'] = by_ns
+        cluster['degraded_by_group'] = replicahealth.index_degraded(cluster['deployments_info'])
+    return cluster
+
+
+def save_snapshot(clusters_info, collected_at=None, path=SNAPSHOT_DB, keep=SNAPSHOT_KEEP):
+    """Store one collection run and return its id. Older runs beyond `keep` are pruned."""
+    if collected_at is None:
+        collected_at = time.time()
+    rows = [(i, cluster['account'], cluster['name'], _encode(cluster)) for i, cluster in enumerate(clusters_info)]
+
+    conn = _connect(path)
+    try:
+        with conn:
+            run_id = conn.execute("INSERT INTO runs (collected_at) VALUES (?)", (collected_at,)).lastrowid
+            conn.executemany(
+                "INSERT INTO clusters (run_id, position, account, name, data) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in rows],
+            )
+            conn.execute(
+                "DELETE FROM runs WHERE id NOT IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)",
+                (keep,),
+            )
+        return run_id
+    finally:
+        conn.close()
+
+
+def load_latest(account=None, max_age=None, path=SNAPSHOT_DB):
+    """
+    Return (clusters_info, collected_at) for the most recent run, in the same
+    shape and order collect_clusters() produced. Only `account`'s clusters
+    are decoded if given. Returns ([], None) if there is no snapshot, or if it
+    is older than max_age seconds.
+    """
+    if not os.path.exists(path):
+        return [], None
+    conn = _connect(path)
+    try:
+        run = conn.execute("SELECT id, collected_at FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        if run is None:
+            return [], None
+        run_id, collected_at = run
+        if max_age is not None and time.time() - collected_at > max_age:
+            return [], None
+
+        query = "SELECT data FROM clusters WHERE run_id = ?"
+        params = [run_id]
+        if account is not None:
+            query += " AND account = ?"
+            params.append(account)
+        rows = conn.execute(query + " ORDER BY position", params).fetchall()
+        return [_decode(data) for (data,) in rows], collected_at
+    finally:
+        conn.close()
@@ -0,0 +1,76 @@
+"""
+Top-K pod selection for the "Maximum Utilization" tables.
+
+Templates used to do `pods_info | sort(attribute='cpu_utilization')`, which
+sorts every pod on each render and, on the old string fields, compares
+"9.00" above "10.00". These helpers pick the K heaviest pods with a bounded
+heap over numeric usage (O(n log K)) before rendering, for a whole cluster
+or per namespace group / node, and hand the template ready-made lists.
+"""
+import heapq
+import os
+
+import usagetables
+
+# Pods listed per "top" table; TOP_K=10 etc. to show more
+TOP_K = int(os.getenv('TOP_K', '5'))
+
+METRICS = ('cpu', 'memory')
+
+
+def _leading_float(value):
+    # Legacy rows hold "0.25" / "1.50 GB"; rows without usage count as 0
+    try:
+        return float(str(value).split()[0])
+    except (ValueError, IndexError):
+        return 0.0
+
+
+_LEGACY_KEYS = {
+    'cpu': lambda pod: _leading_float(pod.get('cpu_utilization')),
+    'memory': lambda pod: _leading_float(pod.get('memory_utilization_gb')),
+}
+
+
+def top_pods(pods, k=TOP_K):
+    """
+    {'cpu': [pod, ...], 'memory': [pod, ...]}, each holding the k pods with
+    the highest usage, highest first (ties keep collection order). `pods` is
+    a usagetables.PodTable, or a list of the older per-pod dicts.
+    Collectors store the result as cluster['top'] before rendering, so
+    templates loop over it instead of sorting every pod on the usage strings.
+    """
+    if isinstance(pods, usagetables.PodTable):
+        indexes = range(len(pods))
+        return {
+            metric: [pods.row(i) for i in heapq.nlargest(k, indexes, key=getattr(pods, metric).__getitem__)]
+            for metric in METRICS
+        }
+    return {metric: heapq.nlargest(k, pods, key=_LEGACY_KEYS[metric]) for metric in METRICS}
+
+
+def top_pods_by(pods, by, k=TOP_K):
+    """
+    {label: {'cpu': [...], 'memory': [...]}} with the top k pods of every
+    'group', 'namespace' or 'node' of a PodTable, using one bounded heap per
+    label in a single pass per metric.
+    """
+    codes, categories = pods.column(by)
+    result = {label: {} for label in categories}
+    if k <= 0:
+        for label in categories:
+            result[label] = {metric: [] for metric in METRICS}
+        return result
+
+    for metric in METRICS:
+        heaps = [[] for _ in categories]
+        # (value, -index) so that on equal usage the earlier pod wins
+        for i, (code, value) in enumerate(zip(codes, getattr(pods, metric))):
+            heap = heaps[code]
+            if len(heap) < k:
+                heapq.heappush(heap, (value, -i))
+            elif value > heap[0][0]:
+                heapq.heapreplace(heap, (value, -i))
+        for label, heap in zip(categories, heaps):
+            result[label][metric] = [pods.row(-i) for _, i in sorted(heap, reverse=True)]
+    return result
@@ -0,0 +1,267 @@
+"""
+Columnar pod and node usage tables.
+
+Collectors used to keep one dict per pod with usage preformatted as strings
+("0.25", "1.50 GB"), which every later aggregation had to parse back. The
+tables below store usage as numeric arrays in base units (CPU cores, memory
+bytes) and namespace / node / group as small integer codes into interned
+category lists, so a pod costs a few dozen bytes and totals or per-group
+sums are a single pass over flat arrays. Nothing is formatted until a
+template renders it, through FILTERS or the legacy row properties.
+
+The columns are stdlib array('d') / array('i'), as numpy is not a
+dependency of these scripts. Totals use sum() over an array; sum_by(),
+count_by() and memory_percent() are plain Python loops over the columns.
+They are not vectorized. They are cheap because each is one pass over
+unboxed numbers, not a re-parse of formatted strings. Replica's
+collectors are the only ones that fill these tables; the other dashboard
+variants render from their own dicts.
+"""
+import sys
+from array import array
+from collections import namedtuple
+
+GIB = 1024 ** 3
+
+
+def format_cores(value):
+    return f"{value:.2f}"
+
+
+def format_gb(value):
+    # Dashboards have always shown GiB labelled "GB"
+    return f"{value / GIB:.2f} GB"
+
+
+def format_whole_gb(value):
+    return f"{int(value / GIB)} GB"
+
+
+def format_percent(value):
+    return f"{value:.2f}"
+
+
+def format_number(value):
+    return f"{value:g}"
+
+
+# Jinja filters: {{ pod.cpu | cores }}, {{ pod.memory | gb }}, ...
+FILTERS = {
+    'cores': format_cores,
+    'gb': format_gb,
+    'whole_gb': format_whole_gb,
+    'pct': format_percent,
+    'num': format_number,
+}
+
+
+class Categories:
+    """Interned string values and their integer codes, in first-seen order."""
+
+    def __init__(self, values=()):
+        self.values = []
+        self._codes = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+
+class PodRow(namedtuple('PodRow', ['namespace', 'name', 'node_name', 'group', 'cpu', 'memory'])):
+    """One pod as read from a PodTable; cpu in cores, memory in bytes."""
+    __slots__ = ()
+
+    # Preformatted fields the older templates expect
+    @property
+    def cpu_utilization(self):
+        return format_cores(self.cpu)
+
+    @property
+    def memory_utilization_gb(self):
+        return format_gb(self.memory)
+
+
+class NodeRow(namedtuple('NodeRow', ['name', 'cpu_capacity_cores', 'memory_capacity_bytes', 'cpu', 'memory'])):
+    """One node as read from a NodeTable; cpu in cores, memory in bytes."""
+    __slots__ = ()
+
+    @property
+    def memory_percent(self):
+        return self.memory / self.memory_capacity_bytes * 100.0 if self.memory_capacity_bytes > 0 else 0.0
+
+    # Preformatted fields the older templates expect
+    @property
+    def cpu_capacity(self):
+        cores = self.cpu_capacity_cores
+        return int(cores) if cores == int(cores) else cores
+
+    @property
+    def memory_capacity_gb(self):
+        return format_whole_gb(self.memory_capacity_bytes)
+
+    @property
+    def cpu_utilization(self):
+        return format_cores(self.cpu)
+
+    @property
+    def memory_utilization_gb(self):
+        return format_gb(self.memory)
+
+    @property
+    def memory_utilization_percentage(self):
+        return format_percent(self.memory_percent)
+
+
+class PodTable:
+    def __init__(self):
+        self.namespaces = Categories()
+        self.nodes = Categories()
+        self.groups = Categories()
+        self.namespace = array('i')
+        self.node = array('i')
+        self.group = array('i')
+        self.name = []
+        self.cpu = array('d')
+        self.memory = array('d')
+
+    def append(self, namespace, name, node_name, group, cpu, memory):
+        self.namespace.append(self.namespaces.code(namespace))
+        self.node.append(self.nodes.code(node_name or ''))
+        self.group.append(self.groups.code(group))
+        self.name.append(name)
+        self.cpu.append(cpu)
+        self.memory.append(memory)
+
+    def __len__(self):
+        return len(self.name)
+
+    def row(self, i):
+        return PodRow(
+            self.namespaces[self.namespace[i]], self.name[i], self.nodes[self.node[i]],
+            self.groups[self.group[i]], self.cpu[i], self.memory[i],
+        )
+
+    def __iter__(self):
+        namespaces, nodes, groups = self.namespaces.values, self.nodes.values, self.groups.values
+        for ns, name, node, group, cpu, memory in zip(self.namespace, self.name, self.node, self.group, self.cpu, self.memory):
+            yield PodRow(namespaces[ns], name, nodes[node], groups[group], cpu, memory)
+
+    def total_cpu(self):
+        return sum(self.cpu)
+
+    def total_memory(self):
+        return sum(self.memory)
+
+    def column(self, by):
+        """(codes, categories) for 'namespace', 'node' or 'group'."""
+        return {'namespace': (self.namespace, self.namespaces),
+                'node': (self.node, self.nodes),
+                'group': (self.group, self.groups)}[by]
+
+    def sum_by(self, by, values):
+        """{label: sum of `values` ('cpu' or 'memory')} grouped by 'namespace', 'node' or 'group'."""
+        codes, categories = self.column(by)
+        sums = [0.0] * len(categories)
+        for code, value in zip(codes, getattr(self, values)):
+            sums[code] += value
+        return dict(zip(categories.values, sums))
+
+    def count_by(self, by):
+        codes, categories = self.column(by)
+        counts = [0] * len(categories)
+        for code in codes:
+            counts[code] += 1
+        return dict(zip(categories.values, counts))
+
+    def to_dict(self):
+        return {
+            'kind': 'pods',
+            'namespaces': self.namespaces.values,
+            'nodes': self.nodes.values,
+            'groups': self.groups.values,
+            'namespace': self.namespace.tolist(),
+            'node': self.node.tolist(),
+            'group': self.group.tolist(),
+            'name': self.name,
+            'cpu': self.cpu.tolist(),
+            'memory': self.memory.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        table = cls()
+        table.namespaces = Categories(data['namespaces'])
+        table.nodes = Categories(data['nodes'])
+        table.groups = Categories(data['groups'])
+        for column in ('namespace', 'node', 'group'):
+            setattr(table, column, array('i', data[column]))
+        table.name = list(data['name'])
+        table.cpu = array('d', data['cpu'])
+        table.memory = array('d', data['memory'])
+        return table
+
+
+class NodeTable:
+    def __init__(self):
+        self.name = []
+        self.cpu_capacity = array('d')
+        self.memory_capacity = array('d')
+        self.cpu = array('d')
+        self.memory = array('d')
+
+    def append(self, name, cpu_capacity, memory_capacity, cpu, memory):
+        self.name.append(name)
+        self.cpu_capacity.append(cpu_capacity)
+        self.memory_capacity.append(memory_capacity)
+        self.cpu.append(cpu)
+        self.memory.append(memory)
+
+    def __len__(self):
+        return len(self.name)
+
+    def row(self, i):
+        return NodeRow(self.name[i], self.cpu_capacity[i], self.memory_capacity[i], self.cpu[i], self.memory[i])
+
+    def __iter__(self):
+        for values in zip(self.name, self.cpu_capacity, self.memory_capacity, self.cpu, self.memory):
+            yield NodeRow(*values)
+
+    def memory_percent(self):
+        return array('d', (used / cap * 100.0 if cap > 0 else 0.0 for used, cap in zip(self.memory, self.memory_capacity)))
+
+    def to_dict(self):
+        return {
+            'kind': 'nodes',
+            'name': self.name,
+            'cpu_capacity': self.cpu_capacity.tolist(),
+            'memory_capacity': self.memory_capacity.tolist(),
+            'cpu': self.cpu.tolist(),
+            'memory': self.memory.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        table = cls()
+        table.name = list(data['name'])
+        for column in ('cpu_capacity', 'memory_capacity', 'cpu', 'memory'):
+            setattr(table, column, array('d', data[column]))
+        return table
+
+
+def from_dict(data):
+    """Rebuild a PodTable or NodeTable from its to_dict() form."""
+    return {'pods': PodTable, 'nodes': NodeTable}[data['kind']].from_dict(data)
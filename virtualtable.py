@@ -0,0 +1,185 @@
+"""
+Virtualized pod tables.
+
+Rendering one <tr> per pod makes the dashboard several MB on big clusters,
+and the namespace filters then walk every row. In "virtual" mode a cluster's
+pods are embedded once as a compact JSON payload (namespace, node and group
+names dictionary-coded, usage as rounded numbers) and a small script draws
+only the rows scrolled into view. Namespace and group indexes are built once
+when the page loads, so a filter change only swaps the list of row numbers.
+
+Pick the mode with POD_TABLE_MODE=virtual (default "html") or ?table=virtual
+on the dashboards that support it. In a template:
+
+    {{ virtual_table_script }}                      (once per page)
+    {{ virtual_table(cluster.name, cluster.pods_info) }}
+
+and forward filters to podTables[clusterName].filter('namespace', value).
+"""
+import json
+import os
+
+from markupsafe import Markup
+
+import usagetables
+
+TABLE_MODE = os.getenv('POD_TABLE_MODE', 'html')
+TABLE_MODES = ('html', 'virtual')
+# Visible height of a virtual table
+VIEWPORT_HEIGHT = int(os.getenv('POD_TABLE_HEIGHT', '480'))
+
+
+def table_mode(params=None):
+    """Table mode for a request: ?table=... if valid, else POD_TABLE_MODE."""
+    mode = (params or {}).get('table') or TABLE_MODE
+    return mode if mode in TABLE_MODES else 'html'
+
+
+def _leading_float(value):
+    try:
+        return float(str(value).split()[0])
+    except (ValueError, IndexError):
+        return 0.0
+
+
+def as_pod_table(pods, classify=None):
+    """A PodTable as is; legacy per-pod dicts ("0.25", "1.50 GB") converted to one."""
+    if isinstance(pods, usagetables.PodTable):
+        return pods
+    table = usagetables.PodTable()
+    for pod in pods:
+        table.append(
+            pod['namespace'], pod['name'], pod.get('node_name', ''),
+            classify(pod['namespace']) if classify else '',
+            _leading_float(pod.get('cpu_utilization')),
+            _leading_float(pod.get('memory_utilization_gb')) * usagetables.GIB,
+        )
+    return table
+
+
+def pod_payload(pods, classify=None):
+    """
+    {namespaces, nodes, groups, rows} where each row is
+    [namespace code, pod name, node code, group code, vCPU, memory GiB].
+    """
+    table = as_pod_table(pods, classify)
+    gib = usagetables.GIB
+    return {
+        'namespaces': table.namespaces.values,
+        'nodes': table.nodes.values,
+        'groups': table.groups.values,
+        'rows': [
+            [ns, name, node, group, round(cpu, 4), round(memory / gib, 3)]
+            for ns, name, node, group, cpu, memory in zip(
+                table.namespace, table.name, table.node, table.group, table.cpu, table.memory)
+        ],
+    }
+
+
+def payload_json(payload):
+    """Compact JSON that is safe inside a <script> element."""
+    text = json.dumps(payload, separators=(',', ':'))
+    return text.replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026')
+
+
+def virtual_table(table_id, pods, classify=None):
+    """Markup for one virtualized pod table; filter it via podTables[table_id]."""
+    table_id = str(table_id)
+    data_id = f"pod-data-{table_id}"
+    return Markup(
+        '<div class="vt" id="pod-table-{id}" style="height: {height}px;"></div>\n'
+        '<script type="application/json" id="{data_id}">{payload}</script>\n'
+        '<script>podTables[{key}] = new VirtualTable(\'pod-table-{id}\', \'{data_id}\');</script>'
+    ).format(
+        id=table_id,
+        height=VIEWPORT_HEIGHT,
+        data_id=data_id,
+        payload=Markup(payload_json(pod_payload(pods, classify))),
+        key=Markup(payload_json(table_id)),
+    )
+
+
+virtual_table_script = Markup("""
+<style>
+    .vt { overflow-y: auto; margin-bottom: 20px; border: 1px solid #ddd; }
+    .vt table { margin-bottom: 0; }
+    .vt thead th { position: sticky; top: 0; }
+    .vt td { white-space: nowrap; }
+    .vt-count { color: #555; font-weight: normal; font-size: 14px; margin: 4px 0; }
+</style>
+<script>
+    var podTables = {};
+
+    function VirtualTable(containerId, dataId) {
+        var data = JSON.parse(document.getElementById(dataId).textContent);
+        this.data = data;
+        this.container = document.getElementById(containerId);
+        this.rowHeight = 0;
+        this.view = null;  // null = every row
+
+        // Row numbers per namespace and per group, built once
+        this.index = {namespace: {}, group: {}};
+        for (var i = 0; i < data.rows.length; i++) {
+            var ns = data.namespaces[data.rows[i][0]];
+            var group = data.groups[data.rows[i][3]];
+            (this.index.namespace[ns] = this.index.namespace[ns] || []).push(i);
+            (this.index.group[group] = this.index.group[group] || []).push(i);
+        }
+
+        this.count = document.createElement('div');
+        this.count.className = 'vt-count';
+        this.container.parentNode.insertBefore(this.count, this.container);
+        this.container.innerHTML =
+            '<table><thead><tr><th>Namespace</th><th>Pod Name</th><th>Node Name</th>' +
+            '<th>CPU Utilization (vCPU)</th><th>Memory Utilization (GB)</th></tr></thead><tbody></tbody></table>';
+        this.body = this.container.getElementsByTagName('tbody')[0];
+
+        var self = this, pending = false;
+        this.container.addEventListener('scroll', function () {
+            if (pending) return;
+            pending = true;
+            window.requestAnimationFrame(function () { pending = false; self.render(); });
+        });
+        this.render();
+    }
+
+    VirtualTable.prototype.filter = function (by, value) {
+        this.view = value ? (this.index[by][value] || []) : null;
+        this.container.scrollTop = 0;
+        this.render();
+    };
+
+    VirtualTable.prototype.render = function () {
+        var rows = this.data.rows, view = this.view;
+        var total = view ? view.length : rows.length;
+        this.count.textContent = total + ' of ' + rows.length + ' pods';
+
+        var height = this.rowHeight || 36;
+        var overscan = 10;
+        var first = Math.max(0, Math.floor(this.container.scrollTop / height) - overscan);
+        var last = Math.min(total, first + Math.ceil(this.container.clientHeight / height) + 2 * overscan);
+
+        var html = '<tr style="height: ' + (first * height) + 'px"></tr>';
+        for (var i = first; i < last; i++) {
+            var row = rows[view ? view[i] : i];
+            html += '<tr class="pod-row"><td>' + escapeHtml(this.data.namespaces[row[0]]) +
+                '</td><td>' + escapeHtml(row[1]) +
+                '</td><td>' + escapeHtml(this.data.nodes[row[2]]) +
+                '</td><td>' + row[4].toFixed(2) +
+                '</td><td>' + row[5].toFixed(2) + ' GB</td></tr>';
+        }
+        html += '<tr style="height: ' + ((total - last) * height) + 'px"></tr>';
+        this.body.innerHTML = html;
+
+        if (!this.rowHeight && last > first) {
+            // Measure once, then redraw with the real row height
+            this.rowHeight = this.body.rows[1].offsetHeight || height;
+            if (this.rowHeight !== height) this.render();
+        }
+    };
+
+    function escapeHtml(text) {
+        return String(text).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+    }
+</script>
+""")